@@ -3,17 +3,38 @@ This file contains celery tasks for contentstore views
 """
 
 from celery.task import task
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousOperation
+from django.core.files import File
+from django.core.files.storage import DefaultStorage
+from django.utils.translation import ugettext as _
 import json
 import logging
+import os
+import shutil
+import tarfile
+from path import path
+from tempfile import mkdtemp
+from xmodule.contentstore.django import contentstore
+from xmodule.exceptions import SerializationError
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_importer import import_from_xml
+from xmodule.modulestore.xml_exporter import export_to_xml
 from xmodule.course_module import CourseFields
 
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
 from course_action_state.models import CourseRerunState
-from contentstore.utils import initialize_permissions
+from contentstore.utils import initialize_permissions, reverse_usage_url
+from extract_tar import safetar_extractall
 from opaque_keys.edx.keys import CourseKey
 
+LOGGER = logging.getLogger(__name__)
+
+# How long import and export progress is kept for the status endpoints to report
+IMPORT_EXPORT_STATUS_TIMEOUT = 60 * 60 * 24
+
 
 @task()
 def rerun_course(source_course_key_string, destination_course_key_string, user_id, fields=None):
@@ -66,3 +87,231 @@ def deserialize_fields(json_fields):
     for field_name, value in fields.iteritems():
         fields[field_name] = getattr(CourseFields, field_name).from_json(value)
     return fields
+
+
+def _course_subdir(course_key):
+    """
+    Returns the directory name used for course_key's import and export files.
+    """
+    return u"{0}-{1}-{2}".format(course_key.org, course_key.course, course_key.run)
+
+
+def course_import_dir(course_key):
+    """
+    Returns the local directory that the chunks of archives uploaded for course_key are
+    assembled in.
+    """
+    return path(settings.GITHUB_REPO_ROOT) / _course_subdir(course_key)
+
+
+def archive_storage_name(action, course_key, filename):
+    """
+    Returns the name an archive imported into or exported from course_key is saved under
+    in the default file storage, which the Studio servers and the celery workers share.
+    """
+    return u'course_import_export/{0}/{1}/{2}'.format(action, _course_subdir(course_key), filename)
+
+
+def _status_cache_key(action, course_key_string, name=u''):
+    """
+    Returns the cache key the progress of an import or export is stored under.
+    """
+    return u'contentstore.{0}_status.{1}.{2}'.format(action, course_key_string, name)
+
+
+def set_import_status(course_key_string, filename, stage, message=None):
+    """
+    Record the stage an import of filename into the course has reached. Negative stages
+    mean the import failed at that stage; message describes the failure.
+    """
+    cache.set(
+        _status_cache_key('import', course_key_string, filename),
+        {'ImportStatus': stage, 'ErrMsg': message},
+        IMPORT_EXPORT_STATUS_TIMEOUT
+    )
+
+
+def get_import_status(course_key_string, filename):
+    """
+    Returns the last status recorded by set_import_status, or None.
+    """
+    return cache.get(_status_cache_key('import', course_key_string, filename))
+
+
+def set_export_status(course_key_string, stage, **kwargs):
+    """
+    Record the stage an export of the course has reached, along with any extra information
+    (such as the error message, or the archive name once the export is done).
+    """
+    status = {'ExportStatus': stage}
+    status.update(kwargs)
+    cache.set(_status_cache_key('export', course_key_string), status, IMPORT_EXPORT_STATUS_TIMEOUT)
+
+
+def get_export_status(course_key_string):
+    """
+    Returns the last status recorded by set_export_status, or None.
+    """
+    return cache.get(_status_cache_key('export', course_key_string))
+
+
+def _get_dir_for_fname(directory, filename):
+    """
+    Returns the dirpath for the first file found in the directory with the given name.
+    If there is no file in the directory with the specified name, return None.
+    """
+    for dirpath, _dirnames, filenames in os.walk(directory):
+        if filename in filenames:
+            return dirpath
+    return None
+
+
+@task()
+def import_olx(user_id, course_key_string, storage_name, archive_name):
+    """
+    Extract and import an uploaded course archive, saved in the default file storage as
+    storage_name, recording each stage with set_import_status.
+
+    Stages are:
+        1 : Extracting file
+        2 : Validating
+        3 : Importing to mongo
+        4 : Import successful
+    and the negated stage is recorded if the import fails.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    storage = DefaultStorage()
+    data_root = path(mkdtemp())
+    course_dir = data_root / _course_subdir(course_key)
+    stage = 1
+
+    def fail(message):
+        """
+        Record that the import failed at the current stage.
+        """
+        set_import_status(course_key_string, archive_name, -stage, message)
+        return "failed"
+
+    try:
+        set_import_status(course_key_string, archive_name, stage)
+        archive_path = data_root / os.path.basename(archive_name)
+        with storage.open(storage_name) as stored_archive:
+            with open(archive_path, 'wb') as local_archive:
+                shutil.copyfileobj(stored_archive, local_archive)
+
+        tar_file = tarfile.open(archive_path)
+        try:
+            safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
+        except SuspiciousOperation as exc:
+            return fail(u'Unsafe tar file. Aborting import. SuspiciousFileOperation: {0}'.format(exc.args[0]))
+        finally:
+            tar_file.close()
+
+        LOGGER.info(u"Course import %s: Uploaded file extracted", course_key)
+        stage = 2
+        set_import_status(course_key_string, archive_name, stage)
+
+        dirpath = _get_dir_for_fname(course_dir, "course.xml")
+        if not dirpath:
+            return fail(_('Could not find the course.xml file in the package.'))
+
+        dirpath = os.path.relpath(dirpath, data_root)
+        LOGGER.debug(u'found course.xml at %s', dirpath)
+
+        LOGGER.info(u"Course import %s: Extracted file verified", course_key)
+        stage = 3
+        set_import_status(course_key_string, archive_name, stage)
+
+        import_from_xml(
+            modulestore(),
+            user_id,
+            data_root,
+            [dirpath],
+            load_error_modules=False,
+            static_content_store=contentstore(),
+            target_course_id=course_key,
+        )
+
+        LOGGER.info(u"Course import %s: Course import successful", course_key)
+        stage = 4
+        set_import_status(course_key_string, archive_name, stage)
+        return "succeeded"
+
+    # catch all exceptions so the failed stage is reported to the client
+    except Exception as exc:  # pylint: disable=broad-except
+        LOGGER.exception(u"error importing course %s", course_key)
+        return fail(unicode(exc))
+
+    finally:
+        shutil.rmtree(data_root)
+        storage.delete(storage_name)
+        LOGGER.info(u"Course import %s: Temp data cleared", course_key)
+
+
+@task()
+def export_olx(user_id, course_key_string):
+    """
+    Export the course to a .tar.gz archive in the default file storage, recording each stage
+    with set_export_status.
+
+    Stages are:
+        1 : Exporting to xml
+        2 : Compressing
+        3 : Export successful; `ExportOutput` is the archive's name in the storage
+    and the negated stage is recorded if the export fails, along with `ErrMsg` and, when the
+    failing component can be found, `EditUnitUrl`.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    course_module = modulestore().get_course(course_key)
+    name = course_module.url_name
+    storage = DefaultStorage()
+    root_dir = path(mkdtemp())
+    stage = 1
+
+    try:
+        set_export_status(course_key_string, stage)
+        export_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+
+        stage = 2
+        set_export_status(course_key_string, stage)
+        archive_name = name + '.tar.gz'
+        archive_path = root_dir / archive_name
+        with tarfile.open(name=archive_path, mode='w:gz') as tar_file:
+            tar_file.add(root_dir / name, arcname=name)
+        with open(archive_path, 'rb') as archive:
+            storage_name = storage.save(archive_storage_name('export', course_key, archive_name), File(archive))
+
+        stage = 3
+        set_export_status(course_key_string, stage, ExportOutput=storage_name)
+        # drop the archives left by earlier exports of the course
+        export_dir = os.path.dirname(storage_name)
+        for filename in storage.listdir(export_dir)[1]:
+            if os.path.join(export_dir, filename) != storage_name:
+                storage.delete(os.path.join(export_dir, filename))
+        LOGGER.info(u"Course export %s: archive written for user %s", course_key, user_id)
+        return "succeeded"
+
+    except SerializationError as exc:
+        LOGGER.exception(u'There was an error exporting course %s', course_key)
+        edit_unit_url = None
+        try:
+            failed_item = modulestore().get_item(exc.location)
+            parent_loc = modulestore().get_parent_location(failed_item.location)
+            if parent_loc is not None:
+                parent = modulestore().get_item(parent_loc)
+                if parent.location.category == 'vertical':
+                    edit_unit_url = reverse_usage_url("container_handler", parent.location)
+        except:  # pylint: disable=bare-except
+            # if we have a nested exception, then we'll show the more generic error message
+            pass
+        set_export_status(course_key_string, -stage, ErrMsg=unicode(exc), EditUnitUrl=edit_unit_url)
+        return "failed"
+
+    # catch all exceptions so the failure is reported to the client
+    except Exception as exc:  # pylint: disable=broad-except
+        LOGGER.exception(u'There was an error exporting course %s', course_key)
+        set_export_status(course_key_string, -stage, ErrMsg=unicode(exc), EditUnitUrl=None)
+        return "failed"
+
+    finally:
+        shutil.rmtree(root_dir)
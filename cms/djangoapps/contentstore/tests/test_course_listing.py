@@ -296,3 +296,26 @@ class TestCourseListing(ModuleStoreTestCase):
             self.assertSetEqual(
                 set_of_course_keys(courses_in_progress), set_of_course_keys(unsucceeded_course_actions, 'course_key')
             )
+
+    def test_course_listing_from_summaries(self):
+        """
+        Test that listing all courses checks access against the course summaries rather
+        than loading every course, and reads the user's roles with a single query.
+        """
+        courses = [
+            self._create_course_with_access_groups(CourseLocator('Org', 'Course' + str(num), 'Run'), self.user)
+            for num in range(3)
+        ]
+        self._create_course_with_access_groups(CourseLocator('Org', 'OtherCourse', 'Run'))
+
+        with patch('xmodule.modulestore.mixed.MixedModuleStore.get_courses') as mock_get_courses:
+            with patch('xmodule.modulestore.mixed.MixedModuleStore.get_course') as mock_get_course:
+                # one query for the user's roles and one for the course reruns in progress
+                with self.assertNumQueries(2):
+                    courses_list, __ = _accessible_courses_list(self.request)
+        self.assertFalse(mock_get_courses.called)
+        self.assertFalse(mock_get_course.called)
+        self.assertEqual(
+            sorted((course.id, course.display_name) for course in courses_list),
+            sorted((course.id, course.display_name) for course in courses)
+        )
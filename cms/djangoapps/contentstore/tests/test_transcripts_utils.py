@@ -532,6 +532,55 @@ class TestTranscript(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             transcripts_utils.Transcript.convert(self.srt_transcript, 'srt', 'sjson')
 
+    def test_convert_is_cached(self):
+        transcripts_utils.CONVERTED_TRANSCRIPT_CACHE.clear()
+        shared_cache = Mock()
+        shared_cache.get.return_value = None
+        with patch('xmodule.video_module.transcripts_utils.generate_srt_from_sjson') as mock_generate:
+            mock_generate.return_value = self.srt_transcript
+            for __ in range(3):
+                actual = transcripts_utils.Transcript.convert(self.sjson_transcript, 'sjson', 'srt', cache=shared_cache)
+                self.assertEqual(actual, self.srt_transcript)
+        self.assertEqual(mock_generate.call_count, 1)
+        self.assertEqual(shared_cache.set.call_count, 1)
+
+    def test_convert_uses_shared_cache(self):
+        transcripts_utils.CONVERTED_TRANSCRIPT_CACHE.clear()
+        shared_cache = Mock()
+        shared_cache.get.return_value = self.txt_transcript
+        with patch('xmodule.video_module.transcripts_utils.SubRipFile') as mock_subrip:
+            actual = transcripts_utils.Transcript.convert(self.srt_transcript, 'srt', 'txt', cache=shared_cache)
+        self.assertEqual(actual, self.txt_transcript)
+        self.assertFalse(mock_subrip.from_string.called)
+
+
+class TestConvertedTranscriptCache(unittest.TestCase):
+    """
+    Tests for the in-process tier of ConvertedTranscriptCache.
+    """
+    def test_key_depends_on_content_formats_and_speed(self):
+        key = transcripts_utils.ConvertedTranscriptCache.key
+        self.assertEqual(key(u'subs', 'sjson', 'srt'), key('subs', 'sjson', 'srt', 1))
+        self.assertNotEqual(key('subs', 'sjson', 'srt'), key('other subs', 'sjson', 'srt'))
+        self.assertNotEqual(key('subs', 'sjson', 'srt'), key('subs', 'sjson', 'txt'))
+        self.assertNotEqual(key('subs', 'sjson', 'srt'), key('subs', 'sjson', 'srt', 1.5))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = transcripts_utils.ConvertedTranscriptCache(max_bytes=10)
+        cache.set('a', '1234')
+        cache.set('b', '1234')
+        # reading 'a' makes 'b' the least recently used entry
+        self.assertEqual(cache.get('a'), '1234')
+        cache.set('c', '1234')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), '1234')
+        self.assertEqual(cache.get('c'), '1234')
+
+    def test_oversized_entry_is_not_kept(self):
+        cache = transcripts_utils.ConvertedTranscriptCache(max_bytes=10)
+        cache.set('a', '12345678901')
+        self.assertIsNone(cache.get('a'))
+
 
 class TestSubsFilename(unittest.TestCase):
     """
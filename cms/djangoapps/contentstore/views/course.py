@@ -26,7 +26,7 @@ from xmodule.modulestore.courseware_index import CoursewareSearchIndexer, Search
 from xmodule.contentstore.content import StaticContent
 from xmodule.tabs import PDFTextbookTabs
 from xmodule.partitions.partitions import UserPartition
-from xmodule.modulestore import EdxJSONEncoder
+from xmodule.modulestore import CourseSummary, EdxJSONEncoder
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locations import Location
@@ -330,23 +330,24 @@ def _course_outline_json(request, course_module):
 
 def _accessible_courses_list(request):
     """
-    List all courses available to the logged in user by iterating through all the courses
+    List all courses available to the logged in user by iterating through the summaries of all the courses
+
+    The summaries are read without loading the courses; the modulestore leaves out the courses which it
+    has failed to load. The user's roles are read once and cached on the user, so filtering the courses
+    makes a single role query.
     """
-    def course_filter(course):
+    def course_filter(course_summary):
         """
         Filter out unusable and inaccessible courses
         """
-        if isinstance(course, ErrorDescriptor):
-            return False
-
         # pylint: disable=fixme
         # TODO remove this condition when templates purged from db
-        if course.location.course == 'templates':
+        if course_summary.location.course == 'templates':
             return False
 
-        return has_studio_read_access(request.user, course.id)
+        return has_studio_read_access(request.user, course_summary.id)
 
-    courses = filter(course_filter, modulestore().get_courses())
+    courses = filter(course_filter, modulestore().get_course_summaries())
     in_process_course_actions = [
         course for course in
         CourseRerunState.objects.find_all(
@@ -360,37 +361,41 @@ def _accessible_courses_list(request):
 def _accessible_courses_list_from_groups(request):
     """
     List all courses available to the logged in user by reversing access group names
+
+    Returns the summaries of the courses, like `_accessible_courses_list`.
     """
     courses_list = {}
-    in_process_course_actions = []
 
     instructor_courses = UserBasedRole(request.user, CourseInstructorRole.ROLE).courses_with_role()
     staff_courses = UserBasedRole(request.user, CourseStaffRole.ROLE).courses_with_role()
     all_courses = instructor_courses | staff_courses
 
+    course_keys = set()
     for course_access in all_courses:
-        course_key = course_access.course_id
-        if course_key is None:
+        if course_access.course_id is None:
             # If the course_access does not have a course_id, it's an org-based role, so we fall back
             raise AccessListFallback
-        if course_key not in courses_list:
-            # check for any course action state for this course
-            in_process_course_actions.extend(
-                CourseRerunState.objects.find_all(
-                    exclude_args={'state': CourseRerunUIStateManager.State.SUCCEEDED},
-                    should_display=True,
-                    course_key=course_key,
-                )
-            )
-            # check for the course itself
-            try:
-                course = modulestore().get_course(course_key)
-            except ItemNotFoundError:
-                # If a user has access to a course that doesn't exist, don't do anything with that course
-                pass
-            if course is not None and not isinstance(course, ErrorDescriptor):
-                # ignore deleted or errored courses
-                courses_list[course_key] = course
+        course_keys.add(course_access.course_id)
+
+    # check for any course action state for these courses
+    in_process_course_actions = list(
+        CourseRerunState.objects.find_all(
+            exclude_args={'state': CourseRerunUIStateManager.State.SUCCEEDED},
+            should_display=True,
+            course_key__in=course_keys,
+        )
+    ) if course_keys else []
+
+    for course_key in course_keys:
+        # check for the course itself
+        try:
+            course = modulestore().get_course(course_key)
+        except ItemNotFoundError:
+            # If a user has access to a course that doesn't exist, don't do anything with that course
+            course = None
+        if course is not None and not isinstance(course, ErrorDescriptor):
+            # ignore deleted or errored courses
+            courses_list[course_key] = CourseSummary.from_course(course)
 
     return courses_list.values(), in_process_course_actions
 
@@ -543,7 +548,7 @@ def _remove_in_process_courses(courses, in_process_course_actions):
         Return a dict of the data which the view requires for each course
         """
         return {
-            'display_name': course.display_name,
+            'display_name': course.display_name_with_default,
             'course_key': unicode(course.location.course_key),
             'url': reverse_course_url('course_handler', course.id),
             'lms_link': get_lms_link_for_item(course.location),
@@ -10,9 +10,10 @@ import tarfile
 from path import path
 from tempfile import mkdtemp
 
-from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import SuspiciousOperation, PermissionDenied
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.core.files.storage import DefaultStorage
 from django.core.files.temp import NamedTemporaryFile
 from django.core.servers.basehttp import FileWrapper
 from django.http import HttpResponse, HttpResponseNotFound
@@ -25,19 +26,24 @@ from xmodule.contentstore.django import contentstore
 from xmodule.exceptions import SerializationError
 from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.keys import CourseKey
-from xmodule.modulestore.xml_importer import import_from_xml
 from xmodule.modulestore.xml_exporter import export_to_xml
 
 from student.auth import has_course_author_access
 
-from extract_tar import safetar_extractall
 from util.json_request import JsonResponse
 from util.views import ensure_valid_course_key
 
+from contentstore.tasks import (
+    archive_storage_name, course_import_dir, export_olx, get_export_status, get_import_status, import_olx,
+    set_export_status, set_import_status,
+)
 from contentstore.utils import reverse_course_url, reverse_usage_url
 
 
-__all__ = ['import_handler', 'import_status_handler', 'export_handler']
+__all__ = [
+    'import_handler', 'import_status_handler',
+    'export_handler', 'export_status_handler', 'export_output_handler',
+]
 
 
 log = logging.getLogger(__name__)
@@ -58,9 +64,12 @@ def import_handler(request, course_key_string):
 
     GET
         html: return html page for import page
-        json: not supported
+        json: return how much of the file named by the `filename` parameter, `size` bytes long,
+            the user has uploaded, so that an interrupted upload can be resumed
     POST or PUT
-        json: import a course via the .tar.gz file specified in request.FILES
+        json: upload a chunk of the .tar.gz file specified in request.FILES; once the last chunk
+            arrives the course is imported in the background, and import_status_handler reports
+            its progress
     """
     course_key = CourseKey.from_string(course_key_string)
     if not has_course_author_access(request.user, course_key):
@@ -68,210 +77,9 @@ def import_handler(request, course_key_string):
 
     if 'application/json' in request.META.get('HTTP_ACCEPT', 'application/json'):
         if request.method == 'GET':
-            raise NotImplementedError('coming soon')
+            return _upload_progress(request, course_key)
         else:
-            # Do everything in a try-except block to make sure everything is properly cleaned up.
-            try:
-                data_root = path(settings.GITHUB_REPO_ROOT)
-                course_subdir = "{0}-{1}-{2}".format(course_key.org, course_key.course, course_key.run)
-                course_dir = data_root / course_subdir
-                filename = request.FILES['course-data'].name
-
-                # Use sessions to keep info about import progress
-                session_status = request.session.setdefault("import_status", {})
-                key = unicode(course_key) + filename
-                _save_request_status(request, key, 0)
-                if not filename.endswith('.tar.gz'):
-                    _save_request_status(request, key, -1)
-                    return JsonResponse(
-                        {
-                            'ErrMsg': _('We only support uploading a .tar.gz file.'),
-                            'Stage': -1
-                        },
-                        status=415
-                    )
-
-                temp_filepath = course_dir / filename
-                if not course_dir.isdir():
-                    os.mkdir(course_dir)
-
-                logging.debug('importing course to {0}'.format(temp_filepath))
-
-                # Get upload chunks byte ranges
-                try:
-                    matches = CONTENT_RE.search(request.META["HTTP_CONTENT_RANGE"])
-                    content_range = matches.groupdict()
-                except KeyError:    # Single chunk
-                    # no Content-Range header, so make one that will work
-                    content_range = {'start': 0, 'stop': 1, 'end': 2}
-
-                # stream out the uploaded files in chunks to disk
-                if int(content_range['start']) == 0:
-                    mode = "wb+"
-                else:
-                    mode = "ab+"
-                    size = os.path.getsize(temp_filepath)
-                    # Check to make sure we haven't missed a chunk
-                    # This shouldn't happen, even if different instances are handling
-                    # the same session, but it's always better to catch errors earlier.
-                    if size < int(content_range['start']):
-                        _save_request_status(request, key, -1)
-                        log.warning(
-                            "Reported range %s does not match size downloaded so far %s",
-                            content_range['start'],
-                            size
-                        )
-                        return JsonResponse(
-                            {
-                                'ErrMsg': _('File upload corrupted. Please try again'),
-                                'Stage': -1
-                            },
-                            status=409
-                        )
-                    # The last request sometimes comes twice. This happens because
-                    # nginx sends a 499 error code when the response takes too long.
-                    elif size > int(content_range['stop']) and size == int(content_range['end']):
-                        return JsonResponse({'ImportStatus': 1})
-
-                with open(temp_filepath, mode) as temp_file:
-                    for chunk in request.FILES['course-data'].chunks():
-                        temp_file.write(chunk)
-
-                size = os.path.getsize(temp_filepath)
-
-                if int(content_range['stop']) != int(content_range['end']) - 1:
-                    # More chunks coming
-                    return JsonResponse({
-                        "files": [{
-                            "name": filename,
-                            "size": size,
-                            "deleteUrl": "",
-                            "deleteType": "",
-                            "url": reverse_course_url('import_handler', course_key),
-                            "thumbnailUrl": ""
-                        }]
-                    })
-            # Send errors to client with stage at which error occurred.
-            except Exception as exception:   # pylint: disable=broad-except
-                _save_request_status(request, key, -1)
-                if course_dir.isdir():
-                    shutil.rmtree(course_dir)
-                    log.info("Course import {0}: Temp data cleared".format(course_key))
-
-                log.exception(
-                    "error importing course"
-                )
-                return JsonResponse(
-                    {
-                        'ErrMsg': str(exception),
-                        'Stage': -1
-                    },
-                    status=400
-                )
-
-            # try-finally block for proper clean up after receiving last chunk.
-            try:
-                # This was the last chunk.
-                log.info("Course import {0}: Upload complete".format(course_key))
-                _save_request_status(request, key, 1)
-
-                tar_file = tarfile.open(temp_filepath)
-                try:
-                    safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
-                except SuspiciousOperation as exc:
-                    _save_request_status(request, key, -1)
-                    return JsonResponse(
-                        {
-                            'ErrMsg': 'Unsafe tar file. Aborting import.',
-                            'SuspiciousFileOperationMsg': exc.args[0],
-                            'Stage': -1
-                        },
-                        status=400
-                    )
-                finally:
-                    tar_file.close()
-
-                log.info("Course import {0}: Uploaded file extracted".format(course_key))
-                _save_request_status(request, key, 2)
-
-                # find the 'course.xml' file
-                def get_all_files(directory):
-                    """
-                    For each file in the directory, yield a 2-tuple of (file-name,
-                    directory-path)
-                    """
-                    for dirpath, _dirnames, filenames in os.walk(directory):
-                        for filename in filenames:
-                            yield (filename, dirpath)
-
-                def get_dir_for_fname(directory, filename):
-                    """
-                    Returns the dirpath for the first file found in the directory
-                    with the given name.  If there is no file in the directory with
-                    the specified name, return None.
-                    """
-                    for fname, dirpath in get_all_files(directory):
-                        if fname == filename:
-                            return dirpath
-                    return None
-
-                fname = "course.xml"
-                dirpath = get_dir_for_fname(course_dir, fname)
-                if not dirpath:
-                    _save_request_status(request, key, -2)
-                    return JsonResponse(
-                        {
-
-                            'ErrMsg': _('Could not find the course.xml file in the package.'),
-                            'Stage': -2
-                        },
-                        status=415
-                    )
-
-                dirpath = os.path.relpath(dirpath, data_root)
-                logging.debug('found course.xml at {0}'.format(dirpath))
-
-                log.info("Course import {0}: Extracted file verified".format(course_key))
-                _save_request_status(request, key, 3)
-
-                course_items = import_from_xml(
-                    modulestore(),
-                    request.user.id,
-                    settings.GITHUB_REPO_ROOT,
-                    [dirpath],
-                    load_error_modules=False,
-                    static_content_store=contentstore(),
-                    target_course_id=course_key,
-                )
-
-                new_location = course_items[0].location
-                logging.debug('new course at {0}'.format(new_location))
-
-                log.info("Course import {0}: Course import successful".format(course_key))
-                _save_request_status(request, key, 4)
-
-            # Send errors to client with stage at which error occurred.
-            except Exception as exception:   # pylint: disable=broad-except
-                log.exception(
-                    "error importing course"
-                )
-                return JsonResponse(
-                    {
-                        'ErrMsg': str(exception),
-                        'Stage': -session_status[key]
-                    },
-                    status=400
-                )
-
-            finally:
-                if course_dir.isdir():
-                    shutil.rmtree(course_dir)
-                    log.info("Course import {0}: Temp data cleared".format(course_key))
-                # set failed stage number with negative sign in case of unsuccessful import
-                if session_status[key] != 4:
-                    _save_request_status(request, key, -abs(session_status[key]))
-
-            return JsonResponse({'Status': 'OK'})
+            return _write_chunk(request, course_key)
     elif request.method == 'GET':  # assume html
         course_module = modulestore().get_course(course_key)
         return render_to_response('import.html', {
@@ -283,16 +91,158 @@ def import_handler(request, course_key_string):
         return HttpResponseNotFound()
 
 
-def _save_request_status(request, key, status):
+def _upload_path(request, course_key, filename, total_size):
+    """
+    Returns the local path that the user's upload of filename, total_size bytes long, is
+    assembled at. Partial uploads of a file with the same name but a different size are
+    discarded, so that they can't be resumed by mistake.
+    """
+    upload_dir = course_import_dir(course_key) / unicode(request.user.id)
+    filename = os.path.basename(filename)
+    upload_path = upload_dir / u'{0}-{1}'.format(total_size, filename)
+    if upload_dir.isdir():
+        for partial_path in upload_dir.files():
+            if partial_path.name.split(u'-', 1)[-1] == filename and partial_path != upload_path:
+                partial_path.remove()
+    return upload_path
+
+
+def _upload_progress(request, course_key):
+    """
+    Returns how much of the file named by the `filename` parameter, `size` bytes long, the
+    user has uploaded so far, so that an interrupted chunked upload can be resumed from that point.
+    """
+    filename = request.GET.get('filename', '')
+    total_size = request.GET.get('size', '')
+    size = 0
+    if filename and total_size.isdigit():
+        upload_path = _upload_path(request, course_key, filename, int(total_size))
+        if upload_path.isfile():
+            size = os.path.getsize(upload_path)
+    return JsonResponse({
+        "files": [{
+            "name": filename,
+            "size": size,
+        }]
+    })
+
+
+def _write_chunk(request, course_key):
     """
-    Save import status for a course in request session
+    Write the uploaded chunk of a course archive to disk. Once the last chunk has arrived,
+    save the archive to the default file storage and queue the import; its progress is
+    reported by import_status_handler.
     """
-    session_status = request.session.get('import_status')
-    if session_status is None:
-        session_status = request.session.setdefault("import_status", {})
+    course_key_string = unicode(course_key)
+    upload = request.FILES['course-data']
+    filename = upload.name
+    temp_filepath = None
+
+    # Do everything in a try-except block to make sure everything is properly cleaned up.
+    try:
+        if not filename.endswith('.tar.gz'):
+            set_import_status(course_key_string, filename, -1)
+            return JsonResponse(
+                {
+                    'ErrMsg': _('We only support uploading a .tar.gz file.'),
+                    'Stage': -1
+                },
+                status=415
+            )
+
+        # Get upload chunks byte ranges
+        try:
+            matches = CONTENT_RE.search(request.META["HTTP_CONTENT_RANGE"])
+            content_range = matches.groupdict()
+        except KeyError:    # Single chunk
+            # no Content-Range header, so make one that will work
+            content_range = {'start': 0, 'stop': upload.size - 1, 'end': upload.size}
+
+        temp_filepath = _upload_path(request, course_key, filename, int(content_range['end']))
+        if not temp_filepath.parent.isdir():
+            os.makedirs(temp_filepath.parent)
+
+        log.debug(u'importing course to %s', temp_filepath)
+
+        # stream out the uploaded files in chunks to disk
+        if int(content_range['start']) == 0:
+            mode = "wb+"
+            set_import_status(course_key_string, filename, 0)
+        else:
+            mode = "ab+"
+            # The last request sometimes comes twice. This happens because
+            # nginx sends a 499 error code when the response takes too long.
+            # The first one has already handed the archive over to be imported.
+            if not temp_filepath.isfile() and int(content_range['stop']) == int(content_range['end']) - 1:
+                status = get_import_status(course_key_string, filename)
+                if status and status['ImportStatus'] > 0:
+                    return JsonResponse({'ImportStatus': 1})
+            size = os.path.getsize(temp_filepath) if temp_filepath.isfile() else 0
+            # Check to make sure we haven't missed a chunk
+            # This shouldn't happen, even if different instances are handling
+            # the same session, but it's always better to catch errors earlier.
+            if size < int(content_range['start']):
+                set_import_status(course_key_string, filename, -1)
+                log.warning(
+                    "Reported range %s does not match size downloaded so far %s",
+                    content_range['start'],
+                    size
+                )
+                return JsonResponse(
+                    {
+                        'ErrMsg': _('File upload corrupted. Please try again'),
+                        'Stage': -1
+                    },
+                    status=409
+                )
+
+        with open(temp_filepath, mode) as temp_file:
+            for chunk in upload.chunks():
+                temp_file.write(chunk)
+
+        size = os.path.getsize(temp_filepath)
+
+        if int(content_range['stop']) != int(content_range['end']) - 1:
+            # More chunks coming
+            return JsonResponse({
+                "files": [{
+                    "name": filename,
+                    "size": size,
+                    "deleteUrl": "",
+                    "deleteType": "",
+                    "url": reverse_course_url('import_handler', course_key),
+                    "thumbnailUrl": ""
+                }]
+            })
 
-    session_status[key] = status
-    request.session.save()
+        # This was the last chunk, so hand the archive over to the celery workers
+        log.info(u"Course import %s: Upload complete", course_key)
+        with open(temp_filepath, 'rb') as temp_file:
+            storage_name = DefaultStorage().save(
+                archive_storage_name('import', course_key, filename), File(temp_file)
+            )
+        temp_filepath.remove()
+    # Send errors to client with stage at which error occurred.
+    except Exception as exception:   # pylint: disable=broad-except
+        set_import_status(course_key_string, filename, -1, str(exception))
+        if temp_filepath is not None and temp_filepath.isfile():
+            temp_filepath.remove()
+            log.info(u"Course import %s: Temp data cleared", course_key)
+
+        log.exception(
+            "error importing course"
+        )
+        return JsonResponse(
+            {
+                'ErrMsg': str(exception),
+                'Stage': -1
+            },
+            status=400
+        )
+
+    set_import_status(course_key_string, filename, 1)
+    import_olx.delay(request.user.id, course_key_string, storage_name, filename)
+    return JsonResponse({'ImportStatus': 1})
 
 
 # pylint: disable=unused-argument
@@ -311,24 +261,20 @@ def import_status_handler(request, course_key_string, filename=None):
         3 : Importing to mongo
         4 : Import successful
 
+    If the import failed, ErrMsg describes the error.
     """
     course_key = CourseKey.from_string(course_key_string)
     if not has_course_author_access(request.user, course_key):
         raise PermissionDenied()
 
-    try:
-        session_status = request.session["import_status"]
-        status = session_status[course_key_string + filename]
-    except KeyError:
-        status = 0
-
-    return JsonResponse({"ImportStatus": status})
+    status = get_import_status(unicode(course_key), filename) or {"ImportStatus": 0}
+    return JsonResponse(status)
 
 
 # pylint: disable=unused-argument
 @ensure_csrf_cookie
 @login_required
-@require_http_methods(("GET",))
+@require_http_methods(("GET", "POST"))
 @ensure_valid_course_key
 def export_handler(request, course_key_string):
     """
@@ -338,6 +284,9 @@ def export_handler(request, course_key_string):
         html: return html page for import page
         application/x-tgz: return tar.gz file containing exported course
         json: not supported
+    POST
+        json: start exporting the course in the background; poll export_status_handler for
+            progress and fetch the archive from export_output_handler once it's done
 
     Note that there are 2 ways to request the tar.gz file. The request header can specify
     application/x-tgz via HTTP_ACCEPT, or a query parameter can be used (?_accept=application/x-tgz).
@@ -349,6 +298,11 @@ def export_handler(request, course_key_string):
     if not has_course_author_access(request.user, course_key):
         raise PermissionDenied()
 
+    if request.method == 'POST':
+        set_export_status(unicode(course_key), 0)
+        export_olx.delay(request.user.id, unicode(course_key))
+        return JsonResponse({'ExportStatus': 1})
+
     course_module = modulestore().get_course(course_key)
 
     # an _accept URL parameter will be preferred over HTTP_ACCEPT in the header.
@@ -415,9 +369,66 @@ def export_handler(request, course_key_string):
     elif 'text/html' in requested_format:
         return render_to_response('export.html', {
             'context_course': course_module,
-            'export_url': export_url
+            'export_url': export_url,
+            'export_handler_url': reverse_course_url('export_handler', course_key),
+            'export_status_url': reverse_course_url('export_status_handler', course_key),
+            'course_home_url': reverse_course_url("course_handler", course_key),
         })
 
     else:
         # Only HTML or x-tgz request formats are supported (no JSON).
         return HttpResponse(status=406)
+
+
+# pylint: disable=unused-argument
+@require_GET
+@ensure_csrf_cookie
+@login_required
+@ensure_valid_course_key
+def export_status_handler(request, course_key_string):
+    """
+    Returns the status of the course's latest background export. ExportStatus is one of:
+
+        -X : Export unsuccessful due to some error with X as stage [1-2]
+        0 : No status info found, or the export is waiting to start
+        1 : Exporting to xml
+        2 : Compressing
+        3 : Export successful; ExportOutput is the url to download the archive from
+
+    If the export failed, ErrMsg describes the error and EditUnitUrl, if set, is the unit
+    containing the component that couldn't be exported.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    if not has_course_author_access(request.user, course_key):
+        raise PermissionDenied()
+
+    status = get_export_status(unicode(course_key)) or {'ExportStatus': 0}
+    if status.get('ExportOutput'):
+        status['ExportOutput'] = reverse_course_url('export_output_handler', course_key)
+    return JsonResponse(status)
+
+
+# pylint: disable=unused-argument
+@require_GET
+@login_required
+@ensure_valid_course_key
+def export_output_handler(request, course_key_string):
+    """
+    Streams the archive written by the course's latest successful background export.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    if not has_course_author_access(request.user, course_key):
+        raise PermissionDenied()
+
+    status = get_export_status(unicode(course_key))
+    if not status or not status.get('ExportOutput'):
+        return HttpResponseNotFound()
+    storage = DefaultStorage()
+    storage_name = status['ExportOutput']
+    if not storage.exists(storage_name):
+        return HttpResponseNotFound()
+
+    response = HttpResponse(FileWrapper(storage.open(storage_name)), content_type='application/x-tgz')
+    response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(storage_name).encode('utf-8')
+    response['Content-Length'] = storage.size(storage_name)
+    return response
@@ -731,7 +731,8 @@ def _get_module_info(xblock, rewrite_static_links=True, include_ancestor_info=Fa
 
 
 def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=False, include_child_info=False,
-                       course_outline=False, include_children_predicate=NEVER, parent_xblock=None, graders=None):
+                       course_outline=False, include_children_predicate=NEVER, parent_xblock=None, graders=None,
+                       publish_states=None):
     """
     Creates the information needed for client-side XBlockInfo.
 
@@ -746,13 +747,23 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
 
     In addition, an optional include_children_predicate argument can be provided to define whether or
     not a particular xblock should have its children included.
+
+    publish_states, if given, is the result of modulestore().get_course_publish_states for the
+    xblock's course. It is computed here for course outlines and passed down to the children.
     """
     is_library_block = isinstance(xblock.location, LibraryUsageLocator)
     is_xblock_unit = is_unit(xblock, parent_xblock)
+    if publish_states is None and course_outline and not is_library_block:
+        course_key = xblock.location.course_key
+        if modulestore().check_supports(course_key, 'get_course_publish_states'):
+            publish_states = modulestore().get_course_publish_states(course_key)
+        else:
+            publish_states = {}
+    publish_state = _get_publish_state(xblock, publish_states)
     # this should not be calculated for Sections and Subsections on Unit page or for library blocks
     has_changes = None
     if (is_xblock_unit or course_outline) and not is_library_block:
-        has_changes = modulestore().has_changes(xblock)
+        has_changes = publish_state.has_changes if publish_state else modulestore().has_changes(xblock)
 
     if graders is None:
         if not is_library_block:
@@ -771,6 +782,7 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
             course_outline,
             graders,
             include_children_predicate=include_children_predicate,
+            publish_states=publish_states,
         )
     else:
         child_info = None
@@ -779,7 +791,12 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
         visibility_state = _compute_visibility_state(xblock, child_info, is_xblock_unit and has_changes)
     else:
         visibility_state = None
-    published = modulestore().has_published_version(xblock) if not is_library_block else None
+    if is_library_block:
+        published = None
+    elif publish_state:
+        published = publish_state.published
+    else:
+        published = modulestore().has_published_version(xblock)
 
     #instead of adding a new feature directly into xblock-info, we should add them into override_type.
     override_type = {}
@@ -812,7 +829,7 @@ def create_xblock_info(xblock, data=None, metadata=None, include_ancestor_info=F
     if metadata is not None:
         xblock_info["metadata"] = metadata
     if include_ancestor_info:
-        xblock_info['ancestor_info'] = _create_xblock_ancestor_info(xblock, course_outline)
+        xblock_info['ancestor_info'] = _create_xblock_ancestor_info(xblock, course_outline, publish_states)
     if child_info:
         xblock_info['child_info'] = child_info
     if visibility_state == VisibilityState.staff_only:
@@ -891,6 +908,15 @@ class VisibilityState(object):
     staff_only = 'staff_only'
 
 
+def _get_publish_state(xblock, publish_states):
+    """
+    Returns the BlockPublishState for the xblock from publish_states, or None if it isn't known
+    """
+    if not publish_states:
+        return None
+    return publish_states.get((xblock.location.block_type, xblock.location.block_id))
+
+
 def _compute_visibility_state(xblock, child_info, is_unit_with_changes):
     """
     Returns the current publish state for the specified xblock and its children
@@ -934,7 +960,7 @@ def _compute_visibility_state(xblock, child_info, is_unit_with_changes):
         return VisibilityState.ready
 
 
-def _create_xblock_ancestor_info(xblock, course_outline):
+def _create_xblock_ancestor_info(xblock, course_outline, publish_states=None):
     """
     Returns information about the ancestors of an xblock. Note that the direct parent will also return
     information about all of its children.
@@ -951,7 +977,8 @@ def _create_xblock_ancestor_info(xblock, course_outline):
                 ancestor,
                 include_child_info=include_child_info,
                 course_outline=course_outline,
-                include_children_predicate=direct_children_only
+                include_children_predicate=direct_children_only,
+                publish_states=publish_states,
             ))
             collect_ancestor_info(get_parent_xblock(ancestor))
     collect_ancestor_info(get_parent_xblock(xblock), include_child_info=True)
@@ -960,7 +987,8 @@ def _create_xblock_ancestor_info(xblock, course_outline):
     }
 
 
-def _create_xblock_child_info(xblock, course_outline, graders, include_children_predicate=NEVER):
+def _create_xblock_child_info(xblock, course_outline, graders, include_children_predicate=NEVER,
+                              publish_states=None):
     """
     Returns information about the children of an xblock, as well as about the primary category
     of xblock expected as children.
@@ -978,7 +1006,8 @@ def _create_xblock_child_info(xblock, course_outline, graders, include_children_
                 child, include_child_info=True, course_outline=course_outline,
                 include_children_predicate=include_children_predicate,
                 parent_xblock=xblock,
-                graders=graders
+                graders=graders,
+                publish_states=publish_states,
             ) for child in xblock.get_children()
         ]
     return child_info
@@ -82,7 +82,8 @@ class ImportTestCase(CourseTestCase):
                     "name": self.bad_tar,
                     "course-data": [btar]
                 })
-        self.assertEquals(resp.status_code, 415)
+        # The import itself happens in a celery task, so the upload succeeds
+        self.assertEquals(resp.status_code, 200)
         # Check that `import_status` returns the appropriate stage (i.e., the
         # stage at which import failed).
         resp_status = self.client.get(
@@ -95,6 +96,34 @@ class ImportTestCase(CourseTestCase):
 
         self.assertEquals(json.loads(resp_status.content)["ImportStatus"], -2)
 
+    def test_upload_progress(self):
+        """
+        Check that the size uploaded so far is reported, so uploads can be resumed.
+        """
+        resp = self.client.get(self.url, {'filename': 'good.tar.gz', 'size': 100}, HTTP_ACCEPT='application/json')
+        self.assertEquals(resp.status_code, 200)
+        self.assertEquals(json.loads(resp.content)['files'][0]['size'], 0)
+
+        # Upload the first chunk of a 100 byte file
+        with open(self.good_tar) as gtar:
+            self.client.post(
+                self.url,
+                {"name": self.good_tar, "course-data": [gtar]},
+                HTTP_CONTENT_RANGE='bytes 0-9/100',
+                HTTP_ACCEPT='application/json',
+            )
+        uploaded = os.path.getsize(self.good_tar)
+
+        def upload_progress(size):
+            """ Returns the size reported as uploaded for a good.tar.gz of `size` bytes """
+            resp = self.client.get(self.url, {'filename': 'good.tar.gz', 'size': size}, HTTP_ACCEPT='application/json')
+            return json.loads(resp.content)['files'][0]['size']
+
+        self.assertEquals(upload_progress(100), uploaded)
+        # A different file of the same name discards the partial upload
+        self.assertEquals(upload_progress(200), 0)
+        self.assertEquals(upload_progress(100), 0)
+
     def test_with_coursexml(self):
         """
         Check that the response for a tar.gz import with a course.xml is
@@ -221,8 +250,17 @@ class ImportTestCase(CourseTestCase):
             with open(tarpath) as tar:
                 args = {"name": tarpath, "course-data": [tar]}
                 resp = self.client.post(self.url, args)
-            self.assertEquals(resp.status_code, 400)
-            self.assertTrue("SuspiciousFileOperation" in resp.content)
+            self.assertEquals(resp.status_code, 200)
+            resp_status = self.client.get(
+                reverse_course_url(
+                    'import_status_handler',
+                    self.course.id,
+                    kwargs={'filename': os.path.split(tarpath)[1]}
+                )
+            )
+            status = json.loads(resp_status.content)
+            self.assertEquals(status["ImportStatus"], -1)
+            self.assertIn("SuspiciousFileOperation", status["ErrMsg"])
 
         try_tar(self._fifo_tar())
         try_tar(self._symlink_tar())
@@ -283,6 +321,37 @@ class ExportTestCase(CourseTestCase):
         resp = self.client.get(self.url + '?_accept=application/x-tgz')
         self._verify_export_succeeded(resp)
 
+    def test_export_async(self):
+        """
+        Export in the background, then fetch the archive.
+        """
+        resp = self.client.post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEquals(resp.status_code, 200)
+
+        resp_status = self.client.get(reverse_course_url('export_status_handler', self.course.id))
+        status = json.loads(resp_status.content)
+        self.assertEquals(status['ExportStatus'], 3)
+        self.assertEquals(status['ExportOutput'], reverse_course_url('export_output_handler', self.course.id))
+
+        self._verify_export_succeeded(self.client.get(status['ExportOutput']))
+
+    def test_export_async_failure(self):
+        """
+        A failed background export reports the error and where to fix it.
+        """
+        vertical = ItemFactory.create(parent_location=self.course.location, category='vertical', display_name='foo')
+        ItemFactory.create(parent_location=vertical.location, category='aawefawef')
+
+        self.client.post(self.url, HTTP_ACCEPT='application/json')
+        resp_status = self.client.get(reverse_course_url('export_status_handler', self.course.id))
+        status = json.loads(resp_status.content)
+        self.assertEquals(status['ExportStatus'], -1)
+        self.assertIn('Unable to create xml for module', status['ErrMsg'])
+        self.assertEquals(status['EditUnitUrl'], u'/container/{}'.format(vertical.location))
+
+        resp = self.client.get(reverse_course_url('export_output_handler', self.course.id))
+        self.assertEquals(resp.status_code, 404)
+
     def _verify_export_succeeded(self, resp):
         """ Export success helper method. """
         self.assertEquals(resp.status_code, 200)
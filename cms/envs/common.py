@@ -149,6 +149,10 @@ FEATURES = {
 
     # Enable the courseware search functionality
     'ENABLE_COURSEWARE_INDEX': False,
+
+    # Look up the store of every course when the process starts, rather than
+    # on the first request for each course
+    'WARM_MODULESTORE_MAPPINGS': False,
 }
 
 ENABLE_JASMINE = False
@@ -24,6 +24,21 @@ def run():
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_theme()
 
+    if settings.FEATURES.get('WARM_MODULESTORE_MAPPINGS', False):
+        warm_modulestore_mappings()
+
+
+def warm_modulestore_mappings():
+    """
+    Look up the store of every course up front, if the modulestore routes
+    courses between several stores.
+    """
+    from xmodule.modulestore.django import modulestore
+
+    store = modulestore()
+    if hasattr(store, 'warm_mappings'):
+        store.warm_mappings()
+
 
 def add_mimetypes():
     """
@@ -3,7 +3,8 @@ define([
 ], function(CourseImport, $, gettext) {
     'use strict';
     return function (feedbackUrl) {
-        var bar = $('.progress-bar'),
+        var uploadUrl = window.location.pathname,
+            bar = $('.progress-bar'),
             fill = $('.progress-fill'),
             submitBtn = $('.submit-button'),
             chooseBtn = $('.choose-file-button'),
@@ -37,29 +38,32 @@ define([
                         $.cookie('lastfileupload', file.name);
                         submitBtn.hide();
                         CourseImport.startUploadFeedback();
-                        data.submit().complete(function(result, textStatus, xhr) {
-                            window.onbeforeunload = null;
-                            if (xhr.status != 200) {
-                                var serverMsg, errMsg, stage;
-                                try{
-                                    serverMsg = $.parseJSON(result.responseText);
-                                } catch (e) {
-                                    return;
+                        // Resume from wherever an earlier, interrupted upload of this file got to
+                        $.getJSON(uploadUrl, {filename: file.name, size: file.size}, function(progress) {
+                            data.uploadedBytes = progress.files[0].size;
+                            data.submit().complete(function(result, textStatus, xhr) {
+                                window.onbeforeunload = null;
+                                if (xhr.status != 200) {
+                                    var serverMsg, errMsg, stage;
+                                    try{
+                                        serverMsg = $.parseJSON(result.responseText);
+                                    } catch (e) {
+                                        return;
+                                    }
+                                    errMsg = serverMsg.hasOwnProperty('ErrMsg') ?  serverMsg.ErrMsg : '' ;
+                                    if (serverMsg.hasOwnProperty('Stage')) {
+                                        stage = Math.abs(serverMsg.Stage);
+                                        CourseImport.stageError(stage, defaults[stage] + errMsg);
+                                    }
+                                    else {
+                                        alert(gettext('Your import has failed.') + '\n\n' + errMsg);
+                                    }
+                                    chooseBtn.html(gettext('Choose new file')).show();
+                                    bar.hide();
+                                    CourseImport.stopGetStatus = true;
                                 }
-                                errMsg = serverMsg.hasOwnProperty('ErrMsg') ?  serverMsg.ErrMsg : '' ;
-                                if (serverMsg.hasOwnProperty('Stage')) {
-                                    stage = Math.abs(serverMsg.Stage);
-                                    CourseImport.stageError(stage, defaults[stage] + errMsg);
-                                }
-                                else {
-                                    alert(gettext('Your import has failed.') + '\n\n' + errMsg);
-                                }
-                                chooseBtn.html(gettext('Choose new file')).show();
                                 bar.hide();
-                            }
-                            CourseImport.stopGetStatus = true;
-                            chooseBtn.html(gettext('Choose new file')).show();
-                            bar.hide();
+                            });
                         });
                     });
                 } else {
@@ -92,9 +96,10 @@ define([
                 }
             },
             done: function(event, data){
+                // The course is imported in the background; keep polling for its status.
                 bar.hide();
                 window.onbeforeunload = null;
-                CourseImport.displayFinishedImport();
+                CourseImport.okayToNavigateAway = true;
             },
             start: function(event) {
                 window.onbeforeunload = function() {
@@ -0,0 +1,64 @@
+/**
+ * Course export-related js.
+ */
+define(
+    ["jquery", "underscore", "gettext", "js/factories/export"],
+    function($, _, gettext, ExportFactory) {
+
+        "use strict";
+
+        /**
+         * Ask the server for the status of the background export every `timeout`
+         * milliseconds until it succeeds or fails.
+         * @param {string} statusUrl Url to call for status updates.
+         * @param {string} courseHomeUrl Url of the course outline, offered when the export fails.
+         * @param {jQuery} button The export button, re-enabled once the export has finished.
+         */
+        var pollStatus = function (statusUrl, courseHomeUrl, button) {
+            $.getJSON(statusUrl, function (data) {
+                if (data.ExportStatus === 3) {
+                    // Succeeded; fetch the archive
+                    button.removeClass('is-disabled');
+                    window.location = data.ExportOutput;
+                } else if (data.ExportStatus < 0) {
+                    // Failed
+                    button.removeClass('is-disabled');
+                    ExportFactory(
+                        Boolean(data.EditUnitUrl), data.EditUnitUrl || "", courseHomeUrl, _.escape(data.ErrMsg || "")
+                    );
+                } else {
+                    setTimeout(function () {
+                        pollStatus(statusUrl, courseHomeUrl, button);
+                    }, 1000);
+                }
+            });
+        };
+
+        return {
+            /**
+             * Start exporting the course in the background when the export button is clicked,
+             * and download the archive once it has been written.
+             * @param {string} exportUrl Url to POST to in order to start the export.
+             * @param {string} statusUrl Url to call for export status updates.
+             * @param {string} courseHomeUrl Url of the course outline.
+             */
+            initialize: function (exportUrl, statusUrl, courseHomeUrl) {
+                $('.action-export').click(function (event) {
+                    var button = $(this);
+                    event.preventDefault();
+                    if (button.hasClass('is-disabled')) { return; }
+                    button.addClass('is-disabled');
+                    $.ajax({
+                        type: 'POST',
+                        url: exportUrl,
+                        dataType: 'json'
+                    }).done(function () {
+                        pollStatus(statusUrl, courseHomeUrl, button);
+                    }).fail(function () {
+                        button.removeClass('is-disabled');
+                    });
+                });
+            }
+        };
+    }
+);
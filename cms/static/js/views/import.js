@@ -46,8 +46,9 @@ define(
          * @param {int} timeout Number of milliseconds to wait in between ajax calls
          *     for new updates.
          * @param {int} stage Starting stage.
+         * @param {string} errMsg Error message reported by the server, if the import failed.
          */
-        var getStatus = function (url, timeout, stage) {
+        var getStatus = function (url, timeout, stage, errMsg) {
             var currentStage = stage || 0;
             if (currentStage > 1) { CourseImport.okayToNavigateAway = true; }
             if (CourseImport.stopGetStatus) { return ;}
@@ -58,9 +59,10 @@ define(
                 $('.view-import .choose-file-button').html(gettext("Choose new file")).show();
             } else if (currentStage < 0) {
                 // Failed
-                var errMsg = gettext("Error importing course");
                 var failedStage = Math.abs(currentStage);
-                CourseImport.stageError(failedStage, errMsg);
+                CourseImport.stageError(
+                    failedStage, errMsg ? _.escape(errMsg) : gettext("Error importing course")
+                );
                 $('.view-import .choose-file-button').html(gettext("Choose new file")).show();
             } else {
                 // In progress
@@ -71,7 +73,7 @@ define(
             $.getJSON(url,
                 function (data) {
                     setTimeout(function () {
-                        getStatus(url, time, data.ImportStatus);
+                        getStatus(url, time, data.ImportStatus, data.ErrMsg);
                     }, time);
                 }
             );
@@ -162,7 +164,7 @@ define(
                                 $('.view-import .choose-file-button').hide();
                                 var time = 1000;
                                 setTimeout(function () {
-                                    getStatus(url, time, data.ImportStatus);
+                                    getStatus(url, time, data.ImportStatus, data.ErrMsg);
                                 }, time);
                             }
                         }
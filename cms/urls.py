@@ -95,6 +95,8 @@ urlpatterns += patterns(
     url(r'^import/{}$'.format(settings.COURSE_KEY_PATTERN), 'import_handler'),
     url(r'^import_status/{}/(?P<filename>.+)$'.format(settings.COURSE_KEY_PATTERN), 'import_status_handler'),
     url(r'^export/{}$'.format(settings.COURSE_KEY_PATTERN), 'export_handler'),
+    url(r'^export_status/{}$'.format(settings.COURSE_KEY_PATTERN), 'export_status_handler'),
+    url(r'^export_output/{}$'.format(settings.COURSE_KEY_PATTERN), 'export_output_handler'),
     url(r'^xblock/outline/{}$'.format(settings.USAGE_KEY_PATTERN), 'xblock_outline_handler'),
     url(r'^xblock/container/{}$'.format(settings.USAGE_KEY_PATTERN), 'xblock_container_handler'),
     url(r'^xblock/{}/(?P<view_name>[^/]+)$'.format(settings.USAGE_KEY_PATTERN), 'xblock_view_handler'),
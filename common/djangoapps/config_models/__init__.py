@@ -53,6 +53,12 @@ timeout in each ``ConfigurationModel`` by setting the ``cache_timeout`` property
 You can change the name of the cache key used by the ``ConfigurationModel`` by overriding
 the ``cache_key_name`` function.
 
+Each process also keeps its own copy of the current configuration, which it uses until
+saving a new entry changes the version stamp stored in the cache under ``version_key_name``.
+The stamp is read at most once per request, so unchanged configuration costs a single
+cache read per model and request. The copy is shared within the process, so code must
+not modify the entry returned by ``current``.
+
 Extension
 ---------
 
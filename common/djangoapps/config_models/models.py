@@ -1,16 +1,26 @@
 """
 Django Model baseclass for database-backed configuration.
 """
+from uuid import uuid4
+
+from crum import get_current_request
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.cache import get_cache, InvalidCacheBackendError
 
+from request_cache.middleware import RequestCache
+
 try:
     cache = get_cache('configuration')  # pylint: disable=invalid-name
 except InvalidCacheBackendError:
     from django.core.cache import cache
 
 
+# The current configuration of each model read by this process, keyed by
+# the model's cache key name, with the version it was read at
+_local_cache = {}  # pylint: disable=invalid-name
+
+
 class ConfigurationModel(models.Model):
     """
     Abstract base class for model-based configuration
@@ -18,6 +28,11 @@ class ConfigurationModel(models.Model):
     Properties:
         cache_timeout (int): The number of seconds that this configuration
             should be cached
+
+    Each process keeps its own copy of the current configuration, which it
+    uses for as long as the version stamp that `save` changes in the shared
+    cache stays the same. The stamp is read at most once per request, so
+    unchanged configuration costs a single cache read per model and request.
     """
 
     class Meta(object):  # pylint: disable=missing-docstring
@@ -36,16 +51,66 @@ class ConfigurationModel(models.Model):
         """
         super(ConfigurationModel, self).save(*args, **kwargs)
         cache.delete(self.cache_key_name())
+        cache.set(self.version_key_name(), uuid4().hex)
+        _local_cache.pop(self.cache_key_name(), None)
 
     @classmethod
     def cache_key_name(cls):
         """Return the name of the key to use to cache the current configuration"""
         return 'configuration/{}/current'.format(cls.__name__)
 
+    @classmethod
+    def version_key_name(cls):
+        """Return the name of the key to use to cache the version stamp of the current configuration"""
+        return 'configuration/{}/version'.format(cls.__name__)
+
     @classmethod
     def current(cls):
         """
-        Return the active configuration entry, either from cache,
+        Return the active configuration entry, either from the process or
+        shared cache, from the database, or by creating a new empty entry
+        (which is not persisted).
+
+        The entry is shared by every caller in the process, so it must not
+        be modified.
+        """
+        key_name = cls.cache_key_name()
+        request_cache = None
+        if get_current_request() is not None:
+            request_cache = RequestCache.get_request_cache().data
+            if key_name in request_cache:
+                return request_cache[key_name]
+
+        version = cls._current_version()
+        local = _local_cache.get(key_name)
+        if local is not None and local[0] == version:
+            current = local[1]
+        else:
+            current = cls._current_from_cache()
+            _local_cache[key_name] = (version, current)
+
+        if request_cache is not None:
+            request_cache[key_name] = current
+        return current
+
+    @classmethod
+    def _current_version(cls):
+        """
+        Return the version stamp of the current configuration, starting a
+        new one if it has been evicted from the shared cache.
+        """
+        version = cache.get(cls.version_key_name())
+        if version is None:
+            version = uuid4().hex
+            # if another process got there first, use its stamp
+            if not cache.add(cls.version_key_name(), version):
+                version = cache.get(cls.version_key_name()) or version
+        return version
+
+    @classmethod
+    def _current_from_cache(cls):
+        """
+        Return the active configuration entry, either from the shared cache,
         from the database, or by creating a new empty entry (which is not
         persisted).
         """
@@ -8,8 +8,10 @@ from django.test import TestCase
 
 from freezegun import freeze_time
 
-from mock import patch
+from mock import patch, sentinel
+from config_models import models as config_models
 from config_models.models import ConfigurationModel
+from request_cache.middleware import RequestCache
 
 
 class ExampleConfig(ConfigurationModel):
@@ -30,6 +32,7 @@ class ConfigurationModelTests(TestCase):
     def setUp(self):
         self.user = User()
         self.user.save()
+        config_models._local_cache.clear()  # pylint: disable=protected-access
 
     def test_cache_deleted_on_save(self, mock_cache):
         ExampleConfig(changed_by=self.user).save()
@@ -74,3 +77,35 @@ class ConfigurationModelTests(TestCase):
         ExampleConfig.current()
 
         mock_cache.set.assert_called_with(ExampleConfig.cache_key_name(), first, 300)
+
+    def test_version_changed_on_save(self, mock_cache):
+        ExampleConfig(changed_by=self.user).save()
+        self.assertEquals(mock_cache.set.call_args[0][0], ExampleConfig.version_key_name())
+
+    def test_process_cache_used(self, mock_cache):
+        cached = {
+            ExampleConfig.version_key_name(): 'version',
+            ExampleConfig.cache_key_name(): sentinel.current,
+        }
+        mock_cache.get.side_effect = cached.get
+
+        self.assertEquals(ExampleConfig.current(), sentinel.current)
+        self.assertEquals(ExampleConfig.current(), sentinel.current)
+        # The second call only reads the version
+        self.assertEquals(
+            [args[0][0] for args in mock_cache.get.call_args_list],
+            [ExampleConfig.version_key_name(), ExampleConfig.cache_key_name(), ExampleConfig.version_key_name()]
+        )
+
+        cached[ExampleConfig.version_key_name()] = 'new version'
+        cached[ExampleConfig.cache_key_name()] = sentinel.new_current
+        self.assertEquals(ExampleConfig.current(), sentinel.new_current)
+
+    @patch('config_models.models.get_current_request', return_value=sentinel.request)
+    def test_version_read_once_per_request(self, _mock_request, mock_cache):
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+
+        first = ExampleConfig.current()
+        self.assertEquals(ExampleConfig.current(), first)
+        self.assertEquals(mock_cache.get.call_count, 2)
@@ -65,15 +65,8 @@ class StaticContentServer(object):
             if getattr(content, "locked", False):
                 if not hasattr(request, "user") or not request.user.is_authenticated():
                     return HttpResponseForbidden('Unauthorized')
-                if not request.user.is_staff:
-                    if getattr(loc, 'deprecated', False) and not CourseEnrollment.is_enrolled_by_partial(
-                        request.user, loc.course_key
-                    ):
-                        return HttpResponseForbidden('Unauthorized')
-                    if not getattr(loc, 'deprecated', False) and not CourseEnrollment.is_enrolled(
-                        request.user, loc.course_key
-                    ):
-                        return HttpResponseForbidden('Unauthorized')
+                if not request.user.is_staff and not self._is_enrolled(request.user, loc):
+                    return HttpResponseForbidden('Unauthorized')
 
             # convert over the DB persistent last modified timestamp to a HTTP compatible
             # timestamp, so we can simply compare the strings
@@ -146,6 +139,22 @@ class StaticContentServer(object):
 
             return response
 
+    @staticmethod
+    def _is_enrolled(user, loc):
+        """
+        Returns whether the user is enrolled in the course of the asset at `loc`.
+
+        Pages can hold many locked assets, each fetched with its own request,
+        so this uses the user's enrolled course ids kept in the django cache
+        rather than querying for each asset.
+        """
+        enrolled_course_ids = CourseEnrollment.enrolled_course_ids(user)
+        if getattr(loc, 'deprecated', False):
+            # The run of deprecated asset locations is unknown, so any run of the course will do
+            prefix = u'{}/{}/'.format(loc.course_key.org, loc.course_key.course)
+            return any(course_id.startswith(prefix) for course_id in enrolled_course_ids)
+        return unicode(loc.course_key) in enrolled_course_ids
+
 
 def parse_range_header(header_value, content_length):
     """
@@ -32,7 +32,6 @@ EMBARGO_SITE_REDIRECT_URL = 'https://www.edx.org/'
 """
 from functools import partial
 import logging
-import pygeoip
 from lazy import lazy
 
 from django.core.exceptions import MiddlewareNotUsed
@@ -45,6 +44,7 @@ from util.request import course_id_from_url
 
 from student.models import unique_id_for_user
 from embargo.models import EmbargoedCourse, EmbargoedState, IPFilter
+from geoinfo.lookup import country_code_by_addr
 
 log = logging.getLogger(__name__)
 
@@ -193,10 +193,7 @@ class EmbargoMiddleware(object):
             str: A 2-letter country code.
 
         """
-        if ip_addr.find(':') >= 0:
-            return pygeoip.GeoIP(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
-        else:
-            return pygeoip.GeoIP(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+        return country_code_by_addr(ip_addr)
 
     @property
     def _embargo_redirect_response(self):
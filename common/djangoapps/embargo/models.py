@@ -234,10 +234,24 @@ class IPFilter(ConfigurationModel):
     class IPFilterList(object):
         """
         Represent a list of IP addresses with support of networks.
+
+        The networks are indexed by IP version and prefix length, so checking
+        an address takes one set lookup for each prefix length in the list.
         """
 
         def __init__(self, ips):
             self.networks = [ipaddr.IPNetwork(ip) for ip in ips]
+            self._index = {}
+            for network in self.networks:
+                prefixes = self._index.setdefault(network.version, {})
+                prefixes.setdefault(network.prefixlen, set()).add(self._prefix(network.network, network.prefixlen))
+
+        @staticmethod
+        def _prefix(ip, prefixlen):
+            """
+            Return the first `prefixlen` bits of the IPAddress `ip`, as an integer.
+            """
+            return int(ip) >> (ip.max_prefixlen - prefixlen)
 
         def __iter__(self):
             for network in self.networks:
@@ -249,12 +263,28 @@ class IPFilter(ConfigurationModel):
             except ValueError:
                 return False
 
-            for network in self.networks:
-                if network.Contains(ip):
+            for prefixlen, prefixes in self._index.get(ip.version, {}).iteritems():
+                if self._prefix(ip, prefixlen) in prefixes:
                     return True
 
             return False
 
+    # The most recently parsed list of each field, with the text it was parsed
+    # from. current() returns a new instance every time, so the lists are kept
+    # here and only parsed again when the configuration changes.
+    _ip_filter_lists = {}
+
+    def _ip_filter_list(self, field_name):
+        """
+        Return the IPFilterList of the comma-separated addresses in `field_name`.
+        """
+        ips = getattr(self, field_name)
+        parsed = self._ip_filter_lists.get(field_name)
+        if parsed is None or parsed[0] != ips:
+            parsed = (ips, self.IPFilterList([addr.strip() for addr in ips.split(',')]))  # pylint: disable=no-member
+            self._ip_filter_lists[field_name] = parsed
+        return parsed[1]
+
     @property
     def whitelist_ips(self):
         """
@@ -262,7 +292,7 @@ class IPFilter(ConfigurationModel):
         """
         if self.whitelist == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.whitelist.split(',')])  # pylint: disable=no-member
+        return self._ip_filter_list('whitelist')
 
     @property
     def blacklist_ips(self):
@@ -271,4 +301,4 @@ class IPFilter(ConfigurationModel):
         """
         if self.blacklist == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.blacklist.split(',')])  # pylint: disable=no-member
+        return self._ip_filter_list('blacklist')
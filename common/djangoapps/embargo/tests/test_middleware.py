@@ -22,6 +22,7 @@ from xmodule.modulestore.tests.django_utils import (
 # Explicitly import the cache from ConfigurationModel so we can reset it after each test
 from config_models.models import cache
 from embargo.models import EmbargoedCourse, EmbargoedState, IPFilter
+from geoinfo import lookup as geoip_lookup
 
 
 # Since we don't need any XML course fixtures, use a modulestore configuration
@@ -58,6 +59,8 @@ class EmbargoMiddlewareTests(ModuleStoreTestCase):
 
         self.patcher = mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr', self.mock_country_code_by_addr)
         self.patcher.start()
+        # Forget countries looked up by other tests
+        geoip_lookup.clear_cache()
 
     def tearDown(self):
         # Explicitly clear ConfigurationModel's cache so tests have a clear cache
@@ -95,3 +95,24 @@ class EmbargoModelsTest(TestCase):
         self.assertTrue('1.1.0.1' in cblacklist)
         self.assertTrue('1.1.1.0' in cblacklist)
         self.assertFalse('1.2.0.0' in cblacklist)
+
+    def test_ip_network_mixed_prefixes(self):
+        IPFilter(blacklist='10.0.0.0/8, 10.1.2.3, 0.0.0.0/0, 2001:db8::/32').save()
+
+        cblacklist = IPFilter.current().blacklist_ips
+        self.assertTrue('10.255.0.1' in cblacklist)
+        self.assertTrue('10.1.2.3' in cblacklist)
+        self.assertTrue('192.168.1.1' in cblacklist)
+        self.assertTrue('2001:db8::1' in cblacklist)
+        self.assertFalse('2001:db9::1' in cblacklist)
+        self.assertFalse('not an address' in cblacklist)
+
+    def test_ip_filter_list_reused(self):
+        IPFilter(whitelist='1.0.0.0/24', blacklist='1.1.0.0/16').save()
+        cwhitelist = IPFilter.current().whitelist_ips
+        self.assertIs(IPFilter.current().whitelist_ips, cwhitelist)
+
+        IPFilter(whitelist='2.0.0.0/24', blacklist='1.1.0.0/16').save()
+        cwhitelist = IPFilter.current().whitelist_ips
+        self.assertTrue('2.0.0.1' in cwhitelist)
+        self.assertFalse('1.0.0.1' in cwhitelist)
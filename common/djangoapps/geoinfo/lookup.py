@@ -0,0 +1,78 @@
+"""
+Look up the country an IP address is located in.
+
+Each process opens the GeoIP databases once, memory-mapped, and keeps the
+countries of recently seen addresses, so that a lookup on the request path
+usually does not touch the databases at all.
+
+Usage:
+
+    from geoinfo.lookup import country_code_by_addr
+
+    country_code = country_code_by_addr(ip_addr)
+
+"""
+import threading
+from collections import OrderedDict
+
+import pygeoip
+from django.conf import settings
+
+
+# Number of addresses whose country is kept in each process
+COUNTRY_CACHE_SIZE = 10000
+
+_READERS = {}
+_READERS_LOCK = threading.Lock()
+
+_COUNTRY_CACHE = OrderedDict()
+_COUNTRY_CACHE_LOCK = threading.Lock()
+
+
+def _reader(path):
+    """
+    Return the GeoIP reader of the database at `path`, opening it the first
+    time it is used in this process.
+    """
+    reader = _READERS.get(path)
+    if reader is None:
+        with _READERS_LOCK:
+            reader = _READERS.get(path)
+            if reader is None:
+                reader = pygeoip.GeoIP(path, flags=pygeoip.MMAP_CACHE)
+                _READERS[path] = reader
+    return reader
+
+
+def country_code_by_addr(ip_addr):
+    """
+    Return the 2-letter code of the country `ip_addr` is located in.
+    Handles both IPv4 and IPv6 addresses.
+    """
+    with _COUNTRY_CACHE_LOCK:
+        if ip_addr in _COUNTRY_CACHE:
+            # Re-insert to mark it as the most recently used.
+            country_code = _COUNTRY_CACHE.pop(ip_addr)
+            _COUNTRY_CACHE[ip_addr] = country_code
+            return country_code
+
+    if ip_addr.find(':') >= 0:
+        country_code = _reader(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
+    else:
+        country_code = _reader(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+
+    with _COUNTRY_CACHE_LOCK:
+        _COUNTRY_CACHE[ip_addr] = country_code
+        while len(_COUNTRY_CACHE) > COUNTRY_CACHE_SIZE:
+            _COUNTRY_CACHE.popitem(last=False)
+    return country_code
+
+
+def clear_cache():
+    """
+    Close the GeoIP databases and forget the countries of all addresses.
+    """
+    with _READERS_LOCK:
+        _READERS.clear()
+    with _COUNTRY_CACHE_LOCK:
+        _COUNTRY_CACHE.clear()
@@ -11,10 +11,10 @@ decorator `django.utils.decorators.decorator_from_middleware(middleware_class)`
 """
 
 import logging
-import pygeoip
 
 from ipware.ip import get_real_ip
-from django.conf import settings
+
+from geoinfo.lookup import country_code_by_addr
 
 log = logging.getLogger(__name__)
 
@@ -36,10 +36,7 @@ class CountryMiddleware(object):
             del request.session['ip_address']
             del request.session['country_code']
         elif new_ip_address != old_ip_address:
-            if new_ip_address.find(':') >= 0:
-                country_code = pygeoip.GeoIP(settings.GEOIPV6_PATH).country_code_by_addr(new_ip_address)
-            else:
-                country_code = pygeoip.GeoIP(settings.GEOIP_PATH).country_code_by_addr(new_ip_address)
+            country_code = country_code_by_addr(new_ip_address)
             request.session['country_code'] = country_code
             request.session['ip_address'] = new_ip_address
             log.debug('Country code for IP: %s is set to %s', new_ip_address, country_code)
@@ -0,0 +1,44 @@
+"""
+Tests for the GeoIP lookup.
+"""
+from mock import patch
+import pygeoip
+
+from django.test import TestCase
+
+from geoinfo import lookup
+
+
+class CountryCodeByAddrTests(TestCase):
+    """
+    Tests of country_code_by_addr.
+    """
+    def setUp(self):
+        lookup.clear_cache()
+        self.addCleanup(lookup.clear_cache)
+        patcher = patch.object(pygeoip.GeoIP, 'country_code_by_addr', side_effect=['CN', 'US', 'SD'])
+        self.mock_country_code_by_addr = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookup_cached(self):
+        self.assertEqual(lookup.country_code_by_addr('117.79.83.1'), 'CN')
+        self.assertEqual(lookup.country_code_by_addr('117.79.83.1'), 'CN')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 1)
+
+    def test_reader_reused(self):
+        lookup.country_code_by_addr('117.79.83.1')
+        lookup.country_code_by_addr('2001:da8:20f:1502:edcf:550b:4a9c:207d')
+        lookup.country_code_by_addr('4.0.0.0')
+        self.assertEqual(len(lookup._READERS), 2)  # pylint: disable=protected-access
+
+    @patch.object(lookup, 'COUNTRY_CACHE_SIZE', 2)
+    def test_least_recently_used_evicted(self):
+        lookup.country_code_by_addr('117.79.83.1')
+        lookup.country_code_by_addr('4.0.0.1')
+        lookup.country_code_by_addr('117.79.83.1')
+        lookup.country_code_by_addr('4.0.0.0')
+
+        # 117.79.83.1 was used more recently than 4.0.0.1, so it is still cached
+        self.assertEqual(lookup.country_code_by_addr('117.79.83.1'), 'CN')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 3)
+        self.assertNotIn('4.0.0.1', lookup._COUNTRY_CACHE)  # pylint: disable=protected-access
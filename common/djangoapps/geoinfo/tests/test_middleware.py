@@ -8,6 +8,7 @@ from django.contrib.sessions.middleware import SessionMiddleware
 from django.test import TestCase
 from django.test.utils import override_settings
 from django.test.client import RequestFactory
+from geoinfo import lookup as geoip_lookup
 from geoinfo.middleware import CountryMiddleware
 
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
@@ -27,6 +28,8 @@ class CountryMiddlewareTests(TestCase):
         self.request_factory = RequestFactory()
         self.patcher = patch.object(pygeoip.GeoIP, 'country_code_by_addr', self.mock_country_code_by_addr)
         self.patcher.start()
+        # Forget countries looked up by other tests
+        geoip_lookup.clear_cache()
 
     def tearDown(self):
         self.patcher.stop()
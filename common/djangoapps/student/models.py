@@ -26,8 +26,10 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.cache import cache
 from django.db import models, IntegrityError, transaction
 from django.db.models import Count
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver, Signal
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_noop
@@ -35,6 +37,7 @@ from django_countries.fields import CountryField
 from config_models.models import ConfigurationModel
 from track import contexts
 from eventtracking import tracker
+from crum import get_current_request
 from importlib import import_module
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -42,6 +45,7 @@ from xmodule.modulestore import Location
 from opaque_keys import InvalidKeyError
 
 import lms.lib.comment_client as cc
+from request_cache.middleware import RequestCache
 from util.query import use_read_replica_if_available
 from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -703,9 +707,20 @@ class CourseEnrollment(models.Model):
     more should be brought in (such as checking against CourseEnrollmentAllowed,
     checking course dates, user permissions, etc.) This logic is currently
     scattered across our views.
+
+    Within a request, the enrollment checks read all of a user's enrollments
+    with one query the first time one is needed, and keep them in the request
+    cache until one of the user's enrollments is saved or deleted.
     """
     MODEL_TAGS = ['course_id', 'is_active', 'mode']
 
+    # Key of the enrollments loaded during a request in the request cache
+    REQUEST_CACHE_KEY = 'student.course_enrollments'
+
+    # Key of the ids of the courses a user is enrolled in, in the django cache
+    ENROLLED_COURSE_IDS_CACHE_KEY = u'student.enrolled_course_ids.{user_id}'
+    ENROLLED_COURSE_IDS_CACHE_TIMEOUT = 300
+
     user = models.ForeignKey(User)
     course_id = CourseKeyField(max_length=255, db_index=True)
     created = models.DateTimeField(auto_now_add=True, null=True, db_index=True)
@@ -1061,6 +1076,11 @@ class CourseEnrollment(models.Model):
 
         `course_id` is our usual course_id string (e.g. "edX/Test101/2013_Fall)
         """
+        enrollments = cls._request_enrollments(user)
+        if enrollments is not None:
+            record = enrollments.get(unicode(course_key))
+            return record is not None and record.is_active
+
         try:
             record = CourseEnrollment.objects.get(user=user, course_id=course_key)
             return record.is_active
@@ -1086,6 +1106,14 @@ class CourseEnrollment(models.Model):
         assert not course_id_partial.run  # None or empty string
         course_key = SlashSeparatedCourseKey(course_id_partial.org, course_id_partial.course, '')
         querystring = unicode(course_key.to_deprecated_string())
+
+        enrollments = cls._request_enrollments(user)
+        if enrollments is not None:
+            return any(
+                record.is_active for course_id, record in enrollments.iteritems()
+                if course_id.startswith(querystring)
+            )
+
         try:
             return CourseEnrollment.objects.filter(
                 user=user,
@@ -1107,12 +1135,64 @@ class CourseEnrollment(models.Model):
             and is_active is whether the enrollment is active.
         Returns (None, None) if the courseenrollment record does not exist.
         """
+        enrollments = cls._request_enrollments(user)
+        if enrollments is not None:
+            record = enrollments.get(unicode(course_id))
+            if record is None:
+                return (None, None)
+            return (record.mode, record.is_active)
+
         try:
             record = CourseEnrollment.objects.get(user=user, course_id=course_id)
             return (record.mode, record.is_active)
         except cls.DoesNotExist:
             return (None, None)
 
+    @classmethod
+    def _request_enrollments(cls, user):
+        """
+        Returns a dict of all of the user's CourseEnrollments keyed by course id
+        (a unicode string), read with one query the first time it is needed in
+        the current request.
+
+        Returns None outside of a request, or for a user who has not been saved.
+        """
+        if user.id is None or get_current_request() is None:
+            return None
+
+        request_enrollments = RequestCache.get_request_cache().data.setdefault(cls.REQUEST_CACHE_KEY, {})
+        enrollments = request_enrollments.get(user.id)
+        if enrollments is None:
+            enrollments = dict(
+                (unicode(record.course_id), record)
+                for record in CourseEnrollment.objects.filter(user_id=user.id)
+            )
+            request_enrollments[user.id] = enrollments
+        return enrollments
+
+    @classmethod
+    def enrolled_course_ids(cls, user):
+        """
+        Returns the set of ids (unicode strings) of the courses the user is
+        enrolled in.
+
+        The set is kept in the django cache across requests, so that requests
+        that only check enrollment, such as those for locked assets, do not
+        each query for it.  It is dropped whenever one of the user's
+        enrollments is saved or deleted.
+        """
+        cache_key = cls.ENROLLED_COURSE_IDS_CACHE_KEY.format(user_id=user.id)
+        course_ids = cache.get(cache_key)
+        if course_ids is None:
+            course_ids = set(
+                unicode(course_id)
+                for course_id in CourseEnrollment.objects.filter(user_id=user.id, is_active=True).values_list(
+                    'course_id', flat=True
+                )
+            )
+            cache.set(cache_key, course_ids, cls.ENROLLED_COURSE_IDS_CACHE_TIMEOUT)
+        return course_ids
+
     @classmethod
     def enrollments_for_user(cls, user):
         return CourseEnrollment.objects.filter(user=user, is_active=1)
@@ -1200,6 +1280,18 @@ class CourseEnrollment(models.Model):
         return modulestore().get_course(self.course_id)
 
 
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def invalidate_cached_enrollments(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forget the enrollments of the user whose enrollment changed, so that they
+    are read again the next time they are checked.
+    """
+    cache.delete(CourseEnrollment.ENROLLED_COURSE_IDS_CACHE_KEY.format(user_id=instance.user_id))
+    if get_current_request() is not None:
+        RequestCache.get_request_cache().data.get(CourseEnrollment.REQUEST_CACHE_KEY, {}).pop(instance.user_id, None)
+
+
 class CourseEnrollmentAllowed(models.Model):
     """
     Table of users (specified by email address strings) who are allowed to enroll in a specified course.
@@ -17,7 +17,7 @@ from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.client import RequestFactory, Client
 from django.test.utils import override_settings
-from mock import Mock, patch
+from mock import Mock, patch, sentinel
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 from student.models import (
@@ -33,6 +33,7 @@ from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
 # These imports refer to lms djangoapps.
 # Their testcases are only run under lms.
 from bulk_email.models import Optout  # pylint: disable=import-error
+from request_cache.middleware import RequestCache
 from certificates.models import CertificateStatuses  # pylint: disable=import-error
 from certificates.tests.factories import GeneratedCertificateFactory  # pylint: disable=import-error
 from verify_student.models import SoftwareSecurePhotoVerification
@@ -615,6 +616,51 @@ class EnrollInCourseTest(TestCase):
         self.assert_enrollment_mode_change_event_was_emitted(user, course_id, "honor")
 
 
+@patch('student.models.get_current_request', return_value=sentinel.request)
+class RequestEnrollmentsTest(TestCase):
+    """Tests that enrollment checks share the user's enrollments within a request."""
+
+    def setUp(self):
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+        patcher = patch('student.models.tracker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = UserFactory.create()
+        self.course_id = SlashSeparatedCourseKey("edX", "Test101", "2013")
+        self.other_course_id = SlashSeparatedCourseKey("edX", "Test102", "2013")
+        CourseEnrollment.enroll(self.user, self.course_id, "verified")
+
+    def test_one_query(self, _mock_request):
+        with self.assertNumQueries(1):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course_id))
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.other_course_id))
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("verified", True))
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.other_course_id), (None, None))
+            self.assertTrue(CourseEnrollment.is_enrolled_by_partial(
+                self.user, SlashSeparatedCourseKey("edX", "Test101", None)
+            ))
+
+    def test_invalidated_on_change(self, _mock_request):
+        self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.other_course_id))
+        CourseEnrollment.enroll(self.user, self.other_course_id)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.other_course_id))
+
+        CourseEnrollment.unenroll(self.user, self.course_id)
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course_id), ("verified", False))
+
+    def test_enrolled_course_ids_cached(self, _mock_request):
+        with self.assertNumQueries(1):
+            self.assertEqual(CourseEnrollment.enrolled_course_ids(self.user), set([unicode(self.course_id)]))
+            self.assertEqual(CourseEnrollment.enrolled_course_ids(self.user), set([unicode(self.course_id)]))
+
+        CourseEnrollment.enroll(self.user, self.other_course_id)
+        self.assertEqual(
+            CourseEnrollment.enrolled_course_ids(self.user),
+            set([unicode(self.course_id), unicode(self.other_course_id)])
+        )
+
+
 @override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 class ChangeEnrollmentViewTest(ModuleStoreTestCase):
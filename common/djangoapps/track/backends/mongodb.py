@@ -95,3 +95,13 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_many(self, events):
+        """Insert the events in to the Mongo collection with a single request"""
+        if not events:
+            return
+        try:
+            self.collection.insert(events, manipulate=False, continue_on_error=True)
+        except PyMongoError:
+            msg = 'Error inserting to MongoDB event tracker backend'
+            log.exception(msg)
@@ -0,0 +1,141 @@
+"""
+Event tracker backend that takes events off the request path.
+
+Events are put on a bounded in-process queue and written to the wrapped
+backend in batches by a background thread.
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Queue, Empty, Full
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+
+class QueuedBackend(BaseBackend):
+    """
+    Wraps another backend, sending its events from a background thread.
+
+    """
+    def __init__(self, backend, name='default', max_size=10000, flush_size=100,
+                 flush_interval=1.0, block_timeout=0, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: the backend events are written to
+          - `name`: name of the backend, used to tag metrics
+          - `max_size`: maximum number of events waiting to be written
+          - `flush_size`: maximum number of events written at once
+          - `flush_interval`: seconds to wait for a batch to fill before
+            writing what has been queued so far
+          - `block_timeout`: seconds `send` waits for room on a full queue
+            before dropping the event
+
+        """
+        super(QueuedBackend, self).__init__(**kwargs)
+
+        self.backend = backend
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.tags = [u'backend:{0}'.format(name)]
+
+        self.queue = Queue(maxsize=max_size)
+        self._worker = None
+        self._worker_pid = None
+        self._worker_lock = threading.Lock()
+
+        atexit.register(self.flush)
+
+    def send(self, event):
+        """Queue the event, dropping it if the queue stays full"""
+        self._ensure_worker()
+        try:
+            if self.block_timeout:
+                self.queue.put(event, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(event)
+        except Full:
+            dog_stats_api.increment('track.queue.dropped', tags=self.tags)
+
+    def flush(self):
+        """Write every queued event in the calling thread"""
+        while True:
+            batch = self._get_batch(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _ensure_worker(self):
+        """
+        Start the worker thread if it is not running in this process.
+
+        Threads do not survive a fork, so a worker started before the
+        server forked is replaced in each child.
+
+        """
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker.is_alive():
+            return
+
+        with self._worker_lock:
+            if self._worker_pid == pid and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name='track.queued')
+            self._worker.daemon = True
+            self._worker.start()
+            self._worker_pid = pid
+
+    def _run(self):
+        """Worker loop: write batches as they fill or the interval passes"""
+        while True:
+            batch = self._get_batch(block=True)
+            if batch:
+                self._write(batch)
+
+    def _get_batch(self, block):
+        """
+        Take up to `flush_size` events from the queue.
+
+        When `block` is set, wait up to `flush_interval` for the batch to
+        fill after the first event arrives.
+
+        """
+        batch = []
+        deadline = None
+        while len(batch) < self.flush_size:
+            try:
+                if not block:
+                    batch.append(self.queue.get_nowait())
+                elif deadline is None:
+                    batch.append(self.queue.get(timeout=self.flush_interval))
+                    deadline = time.time() + self.flush_interval
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    batch.append(self.queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """Send a batch to the wrapped backend"""
+        dog_stats_api.histogram('track.queue.size', self.queue.qsize(), tags=self.tags)
+        try:
+            with dog_stats_api.timer('track.queue.flush', tags=self.tags):
+                self.backend.send_many(batch)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error writing queued tracking events')
+            dog_stats_api.increment('track.queue.dropped', len(batch), tags=self.tags)
@@ -0,0 +1,60 @@
+from __future__ import absolute_import
+
+import time
+
+from mock import patch
+
+from django.test import TestCase
+
+from track.backends import BaseBackend
+from track.backends.queued import QueuedBackend
+
+
+class BatchRecordingBackend(BaseBackend):
+    """Backend that records each batch of events it is sent"""
+    def __init__(self, **options):
+        super(BatchRecordingBackend, self).__init__(**options)
+        self.batches = []
+
+    def send(self, event):
+        self.batches.append([event])
+
+    def send_many(self, events):
+        self.batches.append(list(events))
+
+
+class TestQueuedBackend(TestCase):
+    def setUp(self):
+        self.recorder = BatchRecordingBackend()
+        self.backend = QueuedBackend(self.recorder, max_size=5, flush_size=2)
+        # Keep events on the queue so that tests can flush explicitly
+        patcher = patch.object(self.backend, '_ensure_worker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_flush_in_batches(self):
+        events = [{'test': i} for i in xrange(5)]
+        for event in events:
+            self.backend.send(event)
+
+        self.assertEqual(self.recorder.batches, [])
+        self.backend.flush()
+        self.assertEqual(self.recorder.batches, [events[0:2], events[2:4], events[4:5]])
+
+    @patch('track.backends.queued.dog_stats_api')
+    def test_drop_when_full(self, mock_stats):
+        for i in xrange(6):
+            self.backend.send({'test': i})
+
+        mock_stats.increment.assert_called_once_with('track.queue.dropped', tags=['backend:default'])
+        self.backend.flush()
+        self.assertEqual(sum(len(batch) for batch in self.recorder.batches), 5)
+
+    def test_worker_writes_events(self):
+        backend = QueuedBackend(self.recorder, flush_size=2, flush_interval=0.01)
+        backend.send({'test': 1})
+        for _ in xrange(100):
+            if self.recorder.batches:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.recorder.batches, [[{'test': 1}]])
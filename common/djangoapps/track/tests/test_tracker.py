@@ -4,6 +4,7 @@ from django.test.utils import override_settings
 
 import track.tracker as tracker
 from track.backends import BaseBackend
+from track.backends.queued import QueuedBackend
 
 
 SIMPLE_SETTINGS = {
@@ -15,6 +16,15 @@ SIMPLE_SETTINGS = {
     }
 }
 
+QUEUED_SETTINGS = {
+    'default': {
+        'ENGINE': 'track.tests.test_tracker.DummyBackend',
+        'QUEUE': {
+            'flush_size': 10,
+        }
+    }
+}
+
 MULTI_SETTINGS = {
     'first': {
         'ENGINE': 'track.tests.test_tracker.DummyBackend',
@@ -87,6 +97,16 @@ class TestTrackerDjangoInstantiation(TestCase):
         self.assertEqual(backends[0].count, event_count)
         self.assertEqual(backends[1].count, event_count)
 
+    @override_settings(TRACKING_BACKENDS=QUEUED_SETTINGS)
+    def test_django_queued_settings(self):
+        """Test that a backend with a QUEUE entry is wrapped"""
+
+        backend = self._reload_backends()['default']
+
+        self.assertIsInstance(backend, QueuedBackend)
+        self.assertIsInstance(backend.backend, DummyBackend)
+        self.assertEqual(backend.flush_size, 10)
+
     @override_settings(TRACKING_BACKENDS=MULTI_SETTINGS)
     def test_django_remove_settings(self):
         """Test if a backend can be remove by setting it to None."""
@@ -12,10 +12,19 @@ below::
               'host': ... ,
               'port': ... ,
               ...
+          },
+          'QUEUE': {
+              'max_size': ... ,
+              'flush_size': ... ,
+              'flush_interval': ... ,
           }
       }
   }
 
+A backend with a `QUEUE` entry is written to in batches from a
+background thread rather than within the request; see
+`track.backends.queued.QueuedBackend` for the available options.
+
 """
 
 import inspect
@@ -26,6 +35,7 @@ from dogapi import dog_stats_api
 from django.conf import settings
 
 from track.backends import BaseBackend
+from track.backends.queued import QueuedBackend
 
 
 __all__ = ['send']
@@ -49,7 +59,10 @@ def _initialize_backends_from_django_settings():
         if values:
             engine = values['ENGINE']
             options = values.get('OPTIONS', {})
-            backends[name] = _instantiate_backend_from_name(engine, options)
+            backend = _instantiate_backend_from_name(engine, options)
+            if 'QUEUE' in values:
+                backend = QueuedBackend(backend, name=name, **values['QUEUE'])
+            backends[name] = backend
 
 
 def _instantiate_backend_from_name(name, options):
@@ -11,6 +11,7 @@ import markupsafe
 from lxml import html, etree
 
 from django.conf import settings
+from django.db.models import Sum
 from django.utils.timezone import UTC
 from django.utils.html import escape
 from edxmako.shortcuts import render_to_string
@@ -172,19 +173,15 @@ def grade_histogram(module_id):
     it, their grade is None. Since there will always be at least one such student
     this function almost always returns [].
     '''
-    from django.db import connection
-    cursor = connection.cursor()
-
-    q = """SELECT courseware_studentmodule.grade,
-                  COUNT(courseware_studentmodule.student_id)
-    FROM courseware_studentmodule
-    WHERE courseware_studentmodule.module_id=%s
-    GROUP BY courseware_studentmodule.grade"""
-    # Passing module_id this way prevents sql-injection.
-    cursor.execute(q, [module_id.to_deprecated_string()])
-
-    grades = list(cursor.fetchall())
-    grades.sort(key=lambda x: x[0])  # Add ORDER BY to sql query?
+    # Counts are maintained by the `update_studentmodule_aggregates` command
+    from courseware.models import StudentModuleAggregate
+    grades = [
+        (row['grade'], row['student_count'])
+        for row in StudentModuleAggregate.objects.filter(
+            module_state_key=module_id,
+        ).values('grade').annotate(student_count=Sum('count')).order_by()
+    ]
+    grades.sort(key=lambda x: x[0])
     if len(grades) >= 1 and grades[0][0] is None:
         return []
     return grades
@@ -7,6 +7,9 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -73,6 +76,14 @@ SUFFIXES = {
 }
 
 
+# Parsed expressions are kept around, keyed by `(math_expr, case_sensitive)`,
+# so that evaluating the same formula repeatedly (e.g. at every sample point of
+# a FormulaResponse) only runs the pyparsing grammar once.
+PARSE_CACHE_SIZE = 1024
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -216,6 +227,39 @@ def add_defaults(variables, functions, case_sensitive):
     return (all_variables, all_functions)
 
 
+def parse_expression(math_expr, case_sensitive=False):
+    """
+    Return a parsed `ParseAugmenter` for `math_expr`, reusing earlier parses.
+
+    The returned object is shared between callers and must be treated as
+    read-only. Expressions that fail to parse are not cached.
+    """
+    key = (math_expr, case_sensitive)
+    with _PARSE_CACHE_LOCK:
+        math_interpreter = _PARSE_CACHE.pop(key, None)
+        if math_interpreter is not None:
+            # Re-insert to mark it as the most recently used.
+            _PARSE_CACHE[key] = math_interpreter
+            return math_interpreter
+
+    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+    math_interpreter.parse_algebra()
+
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[key] = math_interpreter
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    return math_interpreter
+
+
+def clear_parse_cache():
+    """
+    Forget all previously parsed expressions.
+    """
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE.clear()
+
+
 def evaluator(variables, functions, math_expr, case_sensitive=False):
     """
     Evaluate an expression; that is, take a string of math and return a float.
@@ -224,19 +268,23 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
+    return evaluate_samples([variables], functions, math_expr, case_sensitive)[0]
+
+
+def evaluate_samples(variables_list, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression once for each dictionary in `variables_list`.
+
+    Like `evaluator`, but the expression is only parsed once (and the parse is
+    cached), so checking a formula at many sample points is cheap. Return a
+    list of results in the same order as `variables_list`.
+    """
     # No need to go further.
     if math_expr.strip() == "":
-        return float('nan')
+        return [float('nan')] * len(variables_list)
 
     # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
-
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
-
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+    math_interpreter = parse_expression(math_expr, case_sensitive)
 
     # Create a recursion to evaluate the tree.
     if case_sensitive:
@@ -244,18 +292,27 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     else:
         casify = lambda x: x.lower()  # Lowercase for case insens.
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+    results = []
+    for variables in variables_list:
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+
+        # ...and check them
+        math_interpreter.check_variables(all_variables, all_functions)
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+
+        results.append(math_interpreter.reduce_tree(evaluate_actions))
+    return results
 
 
 class ParseAugmenter(object):
@@ -3,6 +3,7 @@ Unit tests for calc.py
 """
 
 import unittest
+import mock
 import numpy
 import calc
 from pyparsing import ParseException
@@ -559,3 +560,36 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+    def test_evaluate_samples(self):
+        """
+        Evaluate one expression at several variable assignments
+        """
+        samples = [{'x': 1.0}, {'x': 2.0}, {'x': 3.0}]
+        self.assertEqual(
+            calc.evaluate_samples(samples, {}, "2*x + 1"),
+            [3.0, 5.0, 7.0]
+        )
+        self.assertTrue(all(
+            numpy.isnan(result) for result in calc.evaluate_samples(samples, {}, "  ")
+        ))
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.evaluate_samples(samples, {}, "x + y")
+
+    def test_parse_cache(self):
+        """
+        Repeated evaluations of an expression should only parse it once
+        """
+        calc.clear_parse_cache()
+        with mock.patch.object(
+            calc.ParseAugmenter, 'parse_algebra', autospec=True,
+            side_effect=calc.ParseAugmenter.parse_algebra
+        ) as mock_parse:
+            self.assertEqual(calc.evaluator({'x': 2.0}, {}, "x^2"), 4.0)
+            self.assertEqual(calc.evaluator({'x': 3.0}, {}, "x^2"), 9.0)
+            calc.evaluate_samples([{'X': 1.0}, {'X': 4.0}], {}, "X^2")
+            self.assertEqual(mock_parse.call_count, 1)
+
+            # Case sensitivity is part of the cache key.
+            calc.evaluator({'x': 2.0}, {}, "x^2", case_sensitive=True)
+            self.assertEqual(mock_parse.call_count, 2)
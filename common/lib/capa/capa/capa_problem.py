@@ -13,11 +13,14 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import logging
 import os.path
 import re
+import threading
 
 from lxml import etree
 from pytz import UTC
@@ -56,6 +59,13 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# Parsed problem trees (with includes processed), keyed by a digest of the
+# problem text and the filestore includes are read from.  Parsing does not
+# depend on the student or the seed, so problems start from a copy of these.
+PARSED_PROBLEM_CACHE_SIZE = 500
+_PARSED_PROBLEM_CACHE = OrderedDict()
+_PARSED_PROBLEM_CACHE_LOCK = threading.Lock()
+
 log = logging.getLogger(__name__)
 
 #-----------------------------------------------------------------------------
@@ -159,11 +169,9 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse problem XML file into an element tree, handling any
+        # <include file="foo"> tags
+        self.tree = self._parse_problem_text(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         self.context = self._extract_context(self.tree)
@@ -529,11 +537,63 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
+    def _parse_problem_text(self, problem_text):
+        """
+        Return the element tree for `problem_text`, with includes processed.
+
+        Parsed trees are cached per process; each problem gets its own copy, since
+        later steps modify the tree in place.  A cached tree is only reused if the
+        files it included still have the same contents.
+        """
+        if isinstance(problem_text, unicode):
+            text_digest = hashlib.sha1(problem_text.encode('utf-8')).hexdigest()
+        else:
+            text_digest = hashlib.sha1(problem_text).hexdigest()
+        key = (text_digest, getattr(self.capa_system.filestore, 'root_path', None))
+
+        with _PARSED_PROBLEM_CACHE_LOCK:
+            cached = _PARSED_PROBLEM_CACHE.pop(key, None)
+            if cached is not None:
+                # Re-insert to mark it as the most recently used.
+                _PARSED_PROBLEM_CACHE[key] = cached
+
+        if cached is not None:
+            tree, include_digests = cached
+            if self._read_include_digests([filename for filename, __ in include_digests]) == include_digests:
+                return deepcopy(tree)
+
+        self.tree = etree.XML(problem_text)
+        include_digests = self._process_includes()
+        if include_digests is not None:
+            with _PARSED_PROBLEM_CACHE_LOCK:
+                _PARSED_PROBLEM_CACHE[key] = (deepcopy(self.tree), include_digests)
+                while len(_PARSED_PROBLEM_CACHE) > PARSED_PROBLEM_CACHE_SIZE:
+                    _PARSED_PROBLEM_CACHE.popitem(last=False)
+        return self.tree
+
+    def _read_include_digests(self, filenames):
+        """
+        Return a list of (filename, digest of contents) for the given include files,
+        or None if any of them can't be read.
+        """
+        digests = []
+        for filename in filenames:
+            try:
+                with self.capa_system.filestore.open(filename) as ifp:
+                    digests.append((filename, hashlib.sha1(ifp.read()).hexdigest()))
+            except Exception:  # pylint: disable=broad-except
+                return None
+        return digests
+
     def _process_includes(self):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
         into our XML tree.  Fail gracefully if debugging.
+
+        Return a list of (filename, digest of contents) for the included files, or None
+        if an include had to be skipped.
         """
+        include_digests = []
         includes = self.tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
@@ -555,10 +615,14 @@ class LoncapaProblem(object):
                     if not self.capa_system.DEBUG:
                         raise
                     else:
+                        include_digests = None
                         continue
                 try:
                     # read in and convert to XML
-                    incxml = etree.XML(ifp.read())
+                    contents = ifp.read()
+                    if include_digests is not None:
+                        include_digests.append((filename, hashlib.sha1(contents).hexdigest()))
+                    incxml = etree.XML(contents)
                 except Exception as err:
                     log.warning(
                         'Error %s in problem xml include: %s',
@@ -571,6 +635,7 @@ class LoncapaProblem(object):
                     if not self.capa_system.DEBUG:
                         raise
                     else:
+                        include_digests = None
                         continue
 
                 # insert new XML into tree in place of include
@@ -578,6 +643,7 @@ class LoncapaProblem(object):
                 parent.insert(parent.index(inc), incxml)
                 parent.remove(inc)
                 log.debug('Included %s into %s' % (filename, self.problem_id))
+        return include_digests
 
     def _extract_system_path(self, script):
         """
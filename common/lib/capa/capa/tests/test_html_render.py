@@ -55,6 +55,34 @@ class CapaHtmlRenderTest(unittest.TestCase):
         self.assertEqual(test_element.tag, "test")
         self.assertEqual(test_element.text, "Test include")
 
+    def test_include_html_changed(self):
+        # Parsed problems are cached, but a changed include file should be
+        # picked up by the next problem built from the same XML.
+        self._create_test_file('test_include.xml', '<test>Old include</test>')
+        xml_str = textwrap.dedent("""
+            <problem>
+                <include file="test_include.xml"/>
+            </problem>
+        """)
+        problem = new_loncapa_problem(xml_str, capa_system=self.capa_system)
+        self.assertEqual(etree.XML(problem.get_html()).find("test").text, "Old include")
+
+        self._create_test_file('test_include.xml', '<test>New include</test>')
+        problem = new_loncapa_problem(xml_str, capa_system=self.capa_system)
+        self.assertEqual(etree.XML(problem.get_html()).find("test").text, "New include")
+
+    def test_parsed_tree_is_copied(self):
+        # Problems built from the same XML share a cached parse, but must not
+        # share the tree that each one modifies in place.
+        xml_str = StringResponseXMLFactory().build_xml(answer="Parsed once")
+        with mock.patch('capa.capa_problem.etree.XML', wraps=etree.XML) as mock_xml:
+            first = new_loncapa_problem(xml_str)
+            second = new_loncapa_problem(xml_str)
+            self.assertEqual(
+                len([call for call in mock_xml.call_args_list if call[0][0] == xml_str]), 1
+            )
+        self.assertIsNot(first.tree, second.tree)
+
     def test_process_outtext(self):
         # Generate some XML with <startouttext /> and <endouttext />
         xml_str = textwrap.dedent("""
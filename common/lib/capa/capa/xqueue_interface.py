@@ -67,11 +67,18 @@ class XQueueInterface(object):
     Interface to the external grading system
     """
 
-    def __init__(self, url, django_auth, requests_auth=None):
+    def __init__(self, url, django_auth, requests_auth=None, submission_queue=None):
+        """
+        submission_queue: optional callable taking (header, body) that hands a
+            submission without files to a background worker, and returns
+            (error_code, msg) like `send_to_queue`. The worker is expected to
+            deliver it with `submit`.
+        """
         self.url = unicode(url)
         self.auth = django_auth
         self.session = requests.Session()
         self.session.auth = requests_auth
+        self.submission_queue = submission_queue
 
     def send_to_queue(self, header, body, files_to_upload=None):
         """
@@ -95,6 +102,17 @@ class XQueueInterface(object):
             u'queue:{}'.format(queue_name)
         ])
 
+        if self.submission_queue is not None and not files_to_upload:
+            return self.submission_queue(header, body)
+
+        return self.submit(header, body, files_to_upload)
+
+    def submit(self, header, body, files_to_upload=None):
+        """
+        Post a request to xqueue now, logging in first if needed.
+
+        Takes the same arguments and returns the same values as `send_to_queue`.
+        """
         # Attempt to send to queue
         (error, msg) = self._send_to_queue(header, body, files_to_upload)
 
@@ -11,7 +11,7 @@ from xblock.fields import Scope, String, Boolean, List
 from xmodule.editing_module import EditingDescriptor
 from xmodule.html_checker import check_html
 from xmodule.stringify import stringify_children
-from xmodule.x_module import XModule
+from xmodule.x_module import XModule, STUDENT_VIEW
 from xmodule.xml_module import XmlDescriptor, name_to_pathname
 import textwrap
 from xmodule.contentstore.content import StaticContent
@@ -72,6 +72,15 @@ class HtmlModuleMixin(HtmlFields, XModule):
     js_module_name = "HTMLModule"
     css = {'scss': [resource_string(__name__, 'css/html/display.scss')]}
 
+    @property
+    def cacheable_views(self):
+        """
+        The student view is the same for every user, unless it shows their id.
+        """
+        if "%%USER_ID%%" in self.data:
+            return ()
+        return (STUDENT_VIEW,)
+
     def get_html(self):
         if self.system.anonymous_student_id:
             return self.data.replace("%%USER_ID%%", self.system.anonymous_student_id)
@@ -115,6 +115,8 @@ class BulkOpsRecord(object):
     """
     def __init__(self):
         self._active_count = 0
+        # whether a write in this bulk operation changed the published content of the course
+        self.has_publish_item = False
 
     @property
     def active(self):
@@ -164,6 +166,9 @@ class BulkOperationsMixin(object):
     If a bulk write operation isn't active, then the changes are immediately written to the underlying
     mongo_connection.
     """
+    # Sends the `course_published` signal; set by the mixed modulestore on the stores it routes to
+    signal_handler = None
+
     def __init__(self, *args, **kwargs):
         super(BulkOperationsMixin, self).__init__(*args, **kwargs)
         self._active_bulk_ops = ActiveBulkThread(self._bulk_ops_record_type)
@@ -269,12 +274,105 @@ class BulkOperationsMixin(object):
 
         self._clear_bulk_ops_record(course_key)
 
+        # the writes of the bulk operation are persisted now, so receivers can read them
+        if bulk_ops_record.has_publish_item:
+            self.send_course_published(course_key)
+
     def _is_in_bulk_operation(self, course_key, ignore_case=False):
         """
         Return whether a bulk operation is active on `course_key`.
         """
         return self._get_bulk_ops_record(course_key, ignore_case).active
 
+    def send_course_published(self, course_key):
+        """
+        Send the `course_published` signal for `course_key` through `signal_handler`.
+
+        If a bulk operation is active on the course, the signal is sent once, when the
+        outermost bulk operation ends, as its writes may not be persisted before then.
+        """
+        bulk_ops_record = self._get_bulk_ops_record(course_key)
+        if bulk_ops_record.active:
+            bulk_ops_record.has_publish_item = True
+            return
+
+        if self.signal_handler is not None:
+            if hasattr(course_key, 'version_agnostic'):
+                course_key = course_key.version_agnostic()
+            self.signal_handler.send("course_published", course_key=course_key.for_branch(None))
+
+
+class CourseSummary(object):
+    """
+    The fields of a course needed to list it, which a modulestore can read
+    without loading the course's descriptor.
+    """
+    def __init__(self, location, display_name=None, display_coursenumber=None, display_organization=None):
+        """
+        `location` is the UsageKey of the course's root block; the other
+        arguments are the values of the course's fields of the same name.
+        """
+        self.location = location
+        self.display_name = display_name
+        self.display_coursenumber = display_coursenumber
+        self.display_organization = display_organization
+
+    @classmethod
+    def from_course(cls, course):
+        """
+        Returns the summary of an already loaded course descriptor.
+        """
+        return cls(
+            course.location,
+            display_name=course.display_name,
+            display_coursenumber=course.display_coursenumber,
+            display_organization=course.display_organization,
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, CourseSummary) and (
+            (self.location, self.display_name, self.display_coursenumber, self.display_organization) ==
+            (other.location, other.display_name, other.display_coursenumber, other.display_organization)
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return u'CourseSummary({!r})'.format(self.location)
+
+    @property
+    def id(self):  # pylint: disable=invalid-name
+        """
+        The CourseKey of the course.
+        """
+        return self.location.course_key
+
+    @property
+    def display_name_with_default(self):
+        """
+        Return the display name of the course if it has one, otherwise its run,
+        like CourseDescriptor.display_name_with_default.
+        """
+        name = self.display_name
+        if name is None:
+            name = self.location.course_key.run.replace('_', ' ')
+        return name.replace('<', '&lt;').replace('>', '&gt;')
+
+    @property
+    def display_number_with_default(self):
+        """
+        Return the display course number if it has been specified, otherwise the course's number.
+        """
+        return self.display_coursenumber or self.location.course_key.course
+
+    @property
+    def display_org_with_default(self):
+        """
+        Return the display organization if it has been specified, otherwise the course's org.
+        """
+        return self.display_organization or self.location.course_key.org
+
 
 class IncorrectlySortedList(Exception):
     """
@@ -702,6 +800,14 @@ class ModuleStoreRead(ModuleStoreAssetBase):
         '''
         pass
 
+    @abstractmethod
+    def get_course_summaries(self, **kwargs):
+        '''
+        Returns a list of CourseSummary objects, one for each course in this
+        modulestore, without loading the courses' descriptors where possible.
+        '''
+        pass
+
     @abstractmethod
     def get_course(self, course_id, depth=0, **kwargs):
         '''
@@ -965,6 +1071,22 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
         """
         return {}
 
+    def get_course_summaries(self, **kwargs):
+        """
+        See ModuleStoreRead.get_course_summaries
+
+        Default impl--summarizes the loaded courses
+        """
+        return [
+            CourseSummary(
+                course.location,
+                display_name=course.display_name,
+                display_coursenumber=getattr(course, 'display_coursenumber', None),
+                display_organization=getattr(course, 'display_organization', None),
+            )
+            for course in self.get_courses(**kwargs)
+        ]
+
     def get_course(self, course_id, depth=0, **kwargs):
         """
         See ModuleStoreRead.get_course
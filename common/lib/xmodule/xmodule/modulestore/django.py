@@ -10,10 +10,13 @@ from importlib import import_module
 from django.conf import settings
 if not settings.configured:
     settings.configure()
-from django.core.cache import get_cache, InvalidCacheBackendError
+from django.core.cache import cache as django_cache, get_cache, InvalidCacheBackendError
+import django.dispatch
 import django.utils
 
+import logging
 import re
+from uuid import uuid4
 
 from xmodule.util.django import get_current_request_hostname
 import xmodule.modulestore  # pylint: disable=unused-import
@@ -39,6 +42,85 @@ except ImportError:
 
 ASSET_IGNORE_REGEX = getattr(settings, "ASSET_IGNORE_REGEX", r"(^\._.*$)|(^\.DS_Store$)|(^.*~$)")
 
+log = logging.getLogger(__name__)
+
+
+class SignalHandler(object):
+    """
+    Sends Django signals on behalf of the modulestore, which does not itself
+    depend on Django.
+
+    The only signal so far is `course_published`, which is sent with the
+    `course_key` of a course whenever content visible in its published
+    branch may have changed.  Receivers use it to invalidate anything
+    they have computed from the published course:
+
+        from xmodule.modulestore.django import SignalHandler
+
+        @receiver(SignalHandler.course_published)
+        def listen_for_course_publish(sender, course_key, **kwargs):
+            ...
+    """
+    course_published = django.dispatch.Signal(providing_args=["course_key"])
+
+    _mapping = {
+        "course_published": course_published,
+    }
+
+    def __init__(self, modulestore_class):
+        self.modulestore_class = modulestore_class
+
+    def send(self, signal_name, **kwargs):
+        """
+        Send the signal named `signal_name` to its receivers.  Errors raised
+        by receivers are logged rather than propagated to the modulestore.
+        """
+        signal = self._mapping[signal_name]
+        responses = signal.send_robust(sender=self.modulestore_class, **kwargs)
+
+        for receiver, response in responses:
+            if isinstance(response, Exception):
+                log.error('Sending %s signal to %s with kwargs %s failed: %r', signal_name, receiver, kwargs, response)
+
+
+# How long a course's publish stamp is remembered.  If it expires, a new
+# stamp is made, which only costs a recomputation of whatever was keyed on it.
+COURSE_PUBLISH_STAMP_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _course_publish_stamp_key(course_key):
+    """
+    Returns the cache key under which the publish stamp for `course_key` is stored.
+    """
+    return u'modulestore.course_publish_stamp.{}'.format(course_key)
+
+
+def get_course_publish_stamp(course_key):
+    """
+    Returns an opaque string that changes whenever the published content of the
+    course may have changed, so that values computed from the published course
+    can be cached under keys that include it.
+
+    The stamp lives in the default cache so that it is shared between the LMS
+    and Studio processes: a publish in Studio changes the stamp seen by the LMS.
+    """
+    key = _course_publish_stamp_key(course_key)
+    stamp = django_cache.get(key)
+    if stamp is None:
+        stamp = uuid4().hex
+        # if another process got there first, use its stamp
+        if not django_cache.add(key, stamp, COURSE_PUBLISH_STAMP_TIMEOUT):
+            stamp = django_cache.get(key) or stamp
+    return stamp
+
+
+@django.dispatch.receiver(SignalHandler.course_published)
+def _reset_course_publish_stamp(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Give the course a new publish stamp whenever its published content changes.
+    """
+    django_cache.set(_course_publish_stamp_key(course_key), uuid4().hex, COURSE_PUBLISH_STAMP_TIMEOUT)
+
 
 def load_function(path):
     """
@@ -85,6 +167,7 @@ def create_modulestore_instance(
 
     if issubclass(class_, MixedModuleStore):
         _options['create_modulestore_instance'] = create_modulestore_instance
+        _options['signal_handler'] = SignalHandler(class_)
 
     if issubclass(class_, BranchSettingMixin):
         _options['branch_setting_func'] = _get_modulestore_branch_setting
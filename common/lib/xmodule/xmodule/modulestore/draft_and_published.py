@@ -4,12 +4,16 @@ This module provides an abstraction for Module Stores that support Draft and Pub
 
 import threading
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 from contextlib import contextmanager
 from . import ModuleStoreEnum
 
 # Things w/ these categories should never be marked as version=DRAFT
 DIRECT_ONLY_CATEGORIES = ['course', 'chapter', 'sequential', 'about', 'static_tab', 'course_info']
 
+# The result of has_changes and has_published_version for a single block
+BlockPublishState = namedtuple('BlockPublishState', 'has_changes published')
+
 
 class BranchSettingMixin(object):
     """
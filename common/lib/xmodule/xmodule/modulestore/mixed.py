@@ -9,6 +9,7 @@ import logging
 from contextlib import contextmanager
 import itertools
 import functools
+import time
 from contracts import contract, new_contract
 
 from opaque_keys import InvalidKeyError
@@ -16,11 +17,12 @@ from opaque_keys.edx.keys import CourseKey, AssetKey
 from opaque_keys.edx.locator import LibraryLocator
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.assetstore import AssetMetadata
+from xmodule.error_module import ErrorDescriptor
 
 from . import ModuleStoreWriteBase
 from . import ModuleStoreEnum
 from .exceptions import ItemNotFoundError, DuplicateCourseError
-from .draft_and_published import ModuleStoreDraftAndPublished
+from .draft_and_published import ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES
 from .split_migrator import SplitMigrator
 
 new_contract('CourseKey', CourseKey)
@@ -98,7 +100,18 @@ def strip_key(func):
 class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
     """
     ModuleStore knows how to route requests to the right persistence ms
+
+    The store of each course key is looked up once and kept in `mappings`.
+    Course keys that no store has are kept for a while as well, so that
+    requests for missing courses don't ask every store for them each time.
     """
+    # Seconds for which a course key that no store has is remembered as missing;
+    # another process may create the course in the meantime
+    MISSING_COURSE_TIMEOUT = 60
+
+    # Maximum number of course keys remembered as missing
+    MISSING_COURSE_LIMIT = 10000
+
     def __init__(
             self,
             contentstore,
@@ -108,11 +121,15 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             fs_service=None,
             user_service=None,
             create_modulestore_instance=None,
+            signal_handler=None,
             **kwargs
     ):
         """
         Initialize a MixedModuleStore. Here we look into our passed in kwargs which should be a
         collection of other modulestore configuration information
+
+        If given, `signal_handler` is used to send the `course_published` signal
+        whenever a write may have changed the published content of a course.
         """
         super(MixedModuleStore, self).__init__(contentstore, **kwargs)
 
@@ -120,7 +137,12 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             raise ValueError('MixedModuleStore constructor must be passed a create_modulestore_instance function')
 
         self.modulestores = []
+        self.signal_handler = signal_handler
         self.mappings = {}
+        # course key -> time until which it is known to be missing from every store
+        self._missing_courses = {}
+        # keys of the courses which this process last failed to load
+        self._errored_courses = set()
 
         for course_id, store_name in mappings.iteritems():
             try:
@@ -155,8 +177,28 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             for course_key, store_name in self.mappings.iteritems():
                 if store_name == key:
                     self.mappings[course_key] = store
+            store.signal_handler = self.signal_handler
             self.modulestores.append(store)
 
+        # the mappings given in the configuration, which are never forgotten
+        self._configured_mappings = frozenset(self.mappings)
+
+    @property
+    def signal_handler(self):
+        """
+        The handler through which the stores send the `course_published` signal.
+        """
+        return self._signal_handler
+
+    @signal_handler.setter
+    def signal_handler(self, signal_handler):
+        """
+        Set the handler of this store and of the stores it routes to.
+        """
+        self._signal_handler = signal_handler
+        for store in self.modulestores:
+            store.signal_handler = signal_handler
+
     def _clean_locator_for_mapping(self, locator):
         """
         In order for mapping to work, the locator must be minimal--no version, no branch--
@@ -182,19 +224,50 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             mapping = self.mappings.get(locator, None)
             if mapping is not None:
                 return mapping
-            else:
+            elif self._missing_courses.get(locator, 0) < time.time():
                 if isinstance(locator, LibraryLocator):
                     has_locator = lambda store: hasattr(store, 'has_library') and store.has_library(locator)
                 else:
                     has_locator = lambda store: store.has_course(locator)
                 for store in self.modulestores:
                     if has_locator(store):
-                        self.mappings[locator] = store
+                        self._set_mapping(locator, store)
                         return store
 
+                if len(self._missing_courses) >= self.MISSING_COURSE_LIMIT:
+                    self._missing_courses.clear()
+                self._missing_courses[locator] = time.time() + self.MISSING_COURSE_TIMEOUT
+
         # return the default store
         return self.default_modulestore
 
+    def _set_mapping(self, locator, store):
+        """
+        Route the course or library `locator` to `store` from now on.
+        """
+        locator = self._clean_locator_for_mapping(locator)
+        self._missing_courses.pop(locator, None)
+        self.mappings[locator] = store
+
+    def _remove_mapping(self, locator):
+        """
+        Forget the store of the course or library `locator`, unless it was configured.
+        """
+        locator = self._clean_locator_for_mapping(locator)
+        if locator not in self._configured_mappings:
+            self.mappings.pop(locator, None)
+
+    def warm_mappings(self):
+        """
+        Route every course of every store up front, reading only the course
+        summaries, so that no request has to look for the store of a course.
+        """
+        for store in self.modulestores:
+            for summary in store.get_course_summaries():
+                locator = self._clean_locator_for_mapping(summary.id)
+                if locator not in self.mappings:
+                    self._set_mapping(locator, store)
+
     def _get_modulestore_by_type(self, modulestore_type):
         """
         This method should only really be used by tests and migration scripts when necessary.
@@ -205,6 +278,26 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 return store
         return None
 
+    def _send_course_published(self, store, course_key, block_type=None):
+        """
+        Send the `course_published` signal for `course_key`, if a write of a block of
+        `block_type` through `store` may have changed the course's published content.
+
+        Draft-only edits (those of draftable block types made while the store's branch
+        isn't published-only) don't change what learners see, so they don't send it.
+        If `block_type` is None, the write is assumed to affect the published content.
+
+        Inside a bulk operation on the course, the store sends the signal once the
+        outermost bulk operation has ended and its writes have been persisted.
+        """
+        if self.signal_handler is None or not hasattr(store, 'send_course_published'):
+            return
+        if block_type is not None and block_type not in DIRECT_ONLY_CATEGORIES:
+            get_branch_setting = getattr(store, 'get_branch_setting', None)
+            if get_branch_setting is None or get_branch_setting() != ModuleStoreEnum.Branch.published_only:
+                return
+        store.send_course_published(course_key)
+
     def fill_in_run(self, course_key):
         """
         Some course_keys are used without runs. This function calls the corresponding
@@ -277,6 +370,26 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                     courses[course_id] = course
         return courses.values()
 
+    @strip_key
+    def get_course_summaries(self, **kwargs):
+        """
+        Returns a list of CourseSummary objects for the courses in this modulestore,
+        without loading the courses' descriptors where the stores can avoid it.
+
+        Courses which this process last failed to load are left out, as get_courses leaves them out.
+        """
+        summaries = {}
+        for store in self.modulestores:
+            # filter out ones which were fetched from earlier stores but locations may not be ==
+            for summary in store.get_course_summaries(**kwargs):
+                course_id = self._clean_locator_for_mapping(summary.id)
+                if course_id in self._errored_courses:
+                    continue
+                if course_id not in summaries:
+                    # course is indeed unique. save it in result
+                    summaries[course_id] = summary
+        return summaries.values()
+
     @strip_key
     def get_libraries(self, **kwargs):
         """
@@ -321,9 +434,15 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         assert isinstance(course_key, CourseKey)
         store = self._get_modulestore_for_courselike(course_key)
         try:
-            return store.get_course(course_key, depth=depth, **kwargs)
+            course = store.get_course(course_key, depth=depth, **kwargs)
         except ItemNotFoundError:
             return None
+        # remember the courses which fail to load, so that get_course_summaries can leave them out
+        if isinstance(course, ErrorDescriptor):
+            self._errored_courses.add(self._clean_locator_for_mapping(course_key))
+        else:
+            self._errored_courses.discard(self._clean_locator_for_mapping(course_key))
+        return course
 
     @strip_key
     @contract(library_key='LibraryLocator')
@@ -365,7 +484,10 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         """
         assert isinstance(course_key, CourseKey)
         store = self._get_modulestore_for_courselike(course_key)
-        return store.delete_course(course_key, user_id)
+        result = store.delete_course(course_key, user_id)
+        self._remove_mapping(course_key)
+        self._send_course_published(store, course_key)
+        return result
 
     @contract(asset_metadata='AssetMetadata', user_id='int|long', import_only=bool)
     def save_asset_metadata(self, asset_metadata, user_id, import_only=False):
@@ -591,7 +713,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         course = store.create_course(org, course, run, user_id, **kwargs)
 
         # add new course to the mapping
-        self.mappings[course_key] = store
+        self._set_mapping(course_key, store)
 
         return course
 
@@ -619,7 +741,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         library = store.create_library(org, library, user_id, fields, **kwargs)
 
         # add new library to the mapping
-        self.mappings[lib_key] = store
+        self._set_mapping(lib_key, store)
 
         return library
 
@@ -639,7 +761,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # to have only course re-runs go to split. This code, however, uses the config'd priority
         dest_modulestore = self._get_modulestore_for_courselike(dest_course_id)
         if source_modulestore == dest_modulestore:
-            return source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            result = source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            self._set_mapping(dest_course_id, dest_modulestore)
+            return result
 
         if dest_modulestore.get_modulestore_type() == ModuleStoreEnum.Type.split:
             split_migrator = SplitMigrator(dest_modulestore, source_modulestore)
@@ -648,6 +772,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             )
             # the super handles assets and any other necessities
             super(MixedModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            self._set_mapping(dest_course_id, dest_modulestore)
         else:
             raise NotImplementedError("No code for cloning from {} to {}".format(
                 source_modulestore, dest_modulestore
@@ -671,7 +796,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 in the newly created block
         """
         modulestore = self._verify_modulestore_support(course_key, 'create_item')
-        return modulestore.create_item(user_id, course_key, block_type, block_id=block_id, fields=fields, **kwargs)
+        item = modulestore.create_item(user_id, course_key, block_type, block_id=block_id, fields=fields, **kwargs)
+        self._send_course_published(modulestore, course_key, block_type)
+        return item
 
     @strip_key
     def create_child(self, user_id, parent_usage_key, block_type, block_id=None, fields=None, **kwargs):
@@ -691,7 +818,11 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                 in the newly created block
         """
         modulestore = self._verify_modulestore_support(parent_usage_key.course_key, 'create_child')
-        return modulestore.create_child(user_id, parent_usage_key, block_type, block_id=block_id, fields=fields, **kwargs)
+        item = modulestore.create_child(
+            user_id, parent_usage_key, block_type, block_id=block_id, fields=fields, **kwargs
+        )
+        self._send_course_published(modulestore, parent_usage_key.course_key, block_type)
+        return item
 
     @strip_key
     def import_xblock(self, user_id, course_key, block_type, block_id, fields=None, runtime=None, **kwargs):
@@ -701,7 +832,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Defer to the course's modulestore if it supports this method
         """
         store = self._verify_modulestore_support(course_key, 'import_xblock')
-        return store.import_xblock(user_id, course_key, block_type, block_id, fields, runtime)
+        item = store.import_xblock(user_id, course_key, block_type, block_id, fields, runtime)
+        self._send_course_published(store, course_key, block_type)
+        return item
 
     @strip_key
     def copy_from_template(self, source_keys, dest_key, user_id, **kwargs):
@@ -718,7 +851,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         (content, children, and metadata) attribute the change to the given user.
         """
         store = self._verify_modulestore_support(xblock.location.course_key, 'update_item')
-        return store.update_item(xblock, user_id, allow_not_found, **kwargs)
+        item = store.update_item(xblock, user_id, allow_not_found, **kwargs)
+        self._send_course_published(store, xblock.location.course_key, xblock.location.block_type)
+        return item
 
     @strip_key
     def delete_item(self, location, user_id, **kwargs):
@@ -726,7 +861,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Delete the given item from persistence. kwargs allow modulestore specific parameters.
         """
         store = self._verify_modulestore_support(location.course_key, 'delete_item')
-        return store.delete_item(location, user_id=user_id, **kwargs)
+        result = store.delete_item(location, user_id=user_id, **kwargs)
+        self._send_course_published(store, location.course_key)
+        return result
 
     def revert_to_published(self, location, user_id):
         """
@@ -820,7 +957,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Returns the newly published item.
         """
         store = self._verify_modulestore_support(location.course_key, 'publish')
-        return store.publish(location, user_id, **kwargs)
+        item = store.publish(location, user_id, **kwargs)
+        self._send_course_published(store, location.course_key)
+        return item
 
     @strip_key
     def unpublish(self, location, user_id, **kwargs):
@@ -829,7 +968,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Returns the newly unpublished item.
         """
         store = self._verify_modulestore_support(location.course_key, 'unpublish')
-        return store.unpublish(location, user_id, **kwargs)
+        item = store.unpublish(location, user_id, **kwargs)
+        self._send_course_published(store, location.course_key)
+        return item
 
     def convert_to_draft(self, location, user_id):
         """
@@ -850,6 +991,14 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._verify_modulestore_support(xblock.location.course_key, 'has_changes')
         return store.has_changes(xblock)
 
+    def get_course_publish_states(self, course_key):
+        """
+        Returns the has_changes and has_published_version state of every block in the course,
+        as a dict keyed by (block_type, block_id).
+        """
+        store = self._verify_modulestore_support(course_key, 'get_course_publish_states')
+        return store.get_course_publish_states(course_key)
+
     def check_supports(self, course_key, method):
         """
         Verifies that the modulestore for a particular course supports a feature.
@@ -43,7 +43,9 @@ from xmodule.error_module import ErrorDescriptor
 from xmodule.errortracker import null_error_tracker, exc_info_to_str
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.mako_module import MakoDescriptorSystem
-from xmodule.modulestore import ModuleStoreWriteBase, ModuleStoreEnum, BulkOperationsMixin, BulkOpsRecord
+from xmodule.modulestore import (
+    ModuleStoreWriteBase, ModuleStoreEnum, BulkOperationsMixin, BulkOpsRecord, CourseSummary
+)
 from xmodule.modulestore.draft_and_published import ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES
 from xmodule.modulestore.edit_info import EditInfoRuntimeMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError, DuplicateCourseError, ReferentialIntegrityError
@@ -914,6 +916,31 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         )
         return [course for course in base_list if not isinstance(course, ErrorDescriptor)]
 
+    @autoretry_read()
+    def get_course_summaries(self, **kwargs):
+        '''
+        Returns a list of CourseSummary objects, reading only the fields they
+        need from the course documents.
+        '''
+        summary_fields = ('display_name', 'display_coursenumber', 'display_organization')
+        courses = self.collection.find(
+            {'_id.category': 'course'},
+            dict([('_id', True)] + [('metadata.' + field, True) for field in summary_fields])
+        )
+        return [
+            CourseSummary(
+                SlashSeparatedCourseKey(
+                    course['_id']['org'], course['_id']['course'], course['_id']['name']
+                ).make_usage_key('course', course['_id']['name']),
+                **dict((field, course.get('metadata', {}).get(field)) for field in summary_fields)
+            )
+            for course in courses
+            if not (  # TODO kill this
+                course['_id']['org'] == 'edx' and
+                course['_id']['course'] == 'templates'
+            )
+        ]
+
     def _find_one(self, location):
         '''Look for a given location in the collection. If the item is not present, raise
         ItemNotFoundError.
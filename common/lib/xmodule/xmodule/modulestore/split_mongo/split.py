@@ -72,7 +72,8 @@ from opaque_keys.edx.locator import (
 from xmodule.modulestore.exceptions import InsufficientSpecificationError, VersionConflictError, DuplicateItemError, \
     DuplicateCourseError
 from xmodule.modulestore import (
-    inheritance, ModuleStoreWriteBase, ModuleStoreEnum, BulkOpsRecord, BulkOperationsMixin, SortedAssetList
+    inheritance, ModuleStoreWriteBase, ModuleStoreEnum, BulkOpsRecord, BulkOperationsMixin, SortedAssetList,
+    CourseSummary,
 )
 
 from ..exceptions import ItemNotFoundError
@@ -878,6 +879,27 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # get the blocks for each course index (s/b the root)
         return self._get_structures_for_branch_and_locator(branch, self._create_course_locator, **kwargs)
 
+    @autoretry_read()
+    def get_course_summaries(self, branch, **kwargs):
+        """
+        Returns a list of CourseSummary objects for the courses on the named
+        branch, read from the course index and the root block of each
+        course's structure without loading any blocks or definitions.
+
+        :param branch: the branch for which to return course summaries.
+        """
+        summaries = []
+        for entry, course_info in self._get_structures_for_branch(branch):
+            locator = self._create_course_locator(course_info, branch)
+            root = entry['root']
+            block = entry['blocks'][root]
+            summary_fields = dict(
+                (field, block.fields.get(field, block.defaults.get(field)))
+                for field in ('display_name', 'display_coursenumber', 'display_organization')
+            )
+            summaries.append(CourseSummary(locator.make_usage_key(root.type, root.id), **summary_fields))
+        return summaries
+
     def get_libraries(self, branch="library", **kwargs):
         """
         Returns a list of "library" root blocks matching any given qualifiers.
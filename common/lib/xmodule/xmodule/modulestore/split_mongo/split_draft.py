@@ -8,7 +8,7 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.courseware_index import CoursewareSearchIndexer
 from xmodule.modulestore.exceptions import InsufficientSpecificationError, ItemNotFoundError
 from xmodule.modulestore.draft_and_published import (
-    ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES, UnsupportedRevisionError
+    ModuleStoreDraftAndPublished, DIRECT_ONLY_CATEGORIES, UnsupportedRevisionError, BlockPublishState
 )
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator, LibraryUsageLocator
 from xmodule.modulestore.split_mongo import BlockKey
@@ -83,6 +83,22 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         else:
             raise InsufficientSpecificationError()
 
+    def get_course_summaries(self, **kwargs):
+        """
+        Returns the summaries of all the courses on the Draft or Published branch depending on the branch setting.
+        """
+        branch_setting = self.get_branch_setting()
+        if branch_setting == ModuleStoreEnum.Branch.draft_preferred:
+            return super(DraftVersioningModuleStore, self).get_course_summaries(
+                ModuleStoreEnum.BranchName.draft, **kwargs
+            )
+        elif branch_setting == ModuleStoreEnum.Branch.published_only:
+            return super(DraftVersioningModuleStore, self).get_course_summaries(
+                ModuleStoreEnum.BranchName.published, **kwargs
+            )
+        else:
+            raise InsufficientSpecificationError()
+
     def _auto_publish_no_children(self, location, category, user_id, **kwargs):
         """
         Publishes item if the category is DIRECT_ONLY. This assumes another method has checked that
@@ -333,6 +349,48 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
 
         return has_changes_subtree(BlockKey.from_usage_key(xblock.location))
 
+    def get_course_publish_states(self, course_key):
+        """
+        Returns a dict mapping BlockKey (a (block_type, block_id) tuple) to a BlockPublishState
+        for every block in the draft branch of the course. The draft and published structures
+        are each fetched and walked once, so this is linear in the size of the course.
+        """
+        draft_course = self._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.draft)).structure
+        try:
+            published_course = self._lookup_course(
+                course_key.for_branch(ModuleStoreEnum.BranchName.published)
+            ).structure
+        except ItemNotFoundError:
+            published_course = {'blocks': {}}
+
+        changes = {}
+
+        def has_changes_subtree(block_key):
+            """
+            Same comparison as has_changes, but memoized across the whole course.
+            """
+            if block_key not in changes:
+                draft_block = self._get_block_from_structure(draft_course, block_key)
+                published_block = self._get_block_from_structure(published_course, block_key)
+                if draft_block is None or published_block is None:
+                    changes[block_key] = True
+                elif self._get_version(draft_block) != self._get_version(published_block):
+                    changes[block_key] = True
+                else:
+                    changes[block_key] = any([
+                        has_changes_subtree(child_block_key)
+                        for child_block_key in draft_block.get('fields', {}).get('children', [])
+                    ])
+            return changes[block_key]
+
+        return {
+            block_key: BlockPublishState(
+                has_changes_subtree(block_key),
+                self._get_block_from_structure(published_course, block_key) is not None
+            )
+            for block_key in draft_course['blocks']
+        }
+
     def publish(self, location, user_id, blacklist=None, **kwargs):
         """
         Publishes the subtree under location from the draft branch to the published branch
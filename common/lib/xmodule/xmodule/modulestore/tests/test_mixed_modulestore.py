@@ -7,6 +7,7 @@ import datetime
 import ddt
 import itertools
 import mimetypes
+from mock import Mock, patch
 from uuid import uuid4
 
 # Mixed modulestore depends on django, so we'll manually configure some django settings
@@ -557,6 +558,27 @@ class TestMixedModuleStore(CourseComparisonTest):
         for key in locations:
             self.assertFalse(self._has_changes(locations[key]))
 
+    def test_get_course_publish_states(self):
+        """
+        Tests that get_course_publish_states() agrees with has_changes() and has_published_version()
+        """
+        locations = self.setup_has_changes('split')
+        course_key = locations['child'].course_key
+
+        # Change the child
+        child = self.store.get_item(locations['child'])
+        child.display_name = 'Changed Display Name'
+        self.store.update_item(child, self.user_id)
+
+        self.assertTrue(self.store.check_supports(course_key, 'get_course_publish_states'))
+        publish_states = self.store.get_course_publish_states(course_key)
+        for key, location in locations.iteritems():
+            item = self.store.get_item(location)
+            state = publish_states[(location.block_type, location.block_id)]
+            self.assertEqual(state.has_changes, self.store.has_changes(item), key)
+            self.assertEqual(state.published, self.store.has_published_version(item), key)
+            self.assertEqual(state.has_changes, key in ('grandparent', 'parent', 'child'), key)
+
     @ddt.data('draft', 'split')
     def test_has_changes_publish_ancestors(self, default_ms):
         """
@@ -840,6 +862,41 @@ class TestMixedModuleStore(CourseComparisonTest):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    @ddt.data('draft', 'split')
+    def test_get_course_summaries(self, default_ms):
+        self.initdb(default_ms)
+        summaries = self.store.get_course_summaries()
+        courses = self.store.get_courses()
+        self.assertEqual(
+            sorted(unicode(summary.id) for summary in summaries),
+            sorted(unicode(course.id) for course in courses)
+        )
+        for summary in summaries:
+            course = self.store.get_course(summary.id)
+            self.assertEqual(summary.display_name_with_default, course.display_name_with_default)
+            self.assertEqual(summary.display_org_with_default, course.display_org_with_default)
+            self.assertEqual(summary.display_number_with_default, course.display_number_with_default)
+
+    @ddt.data('draft', 'split')
+    def test_missing_course_remembered(self, default_ms):
+        self.initdb(default_ms)
+        missing_key = self.store.make_course_key('missing', 'course', 'run')
+        self.assertIsNone(self.store.get_course(missing_key))
+
+        # the stores aren't asked again about a course none of them has
+        for store in self.store.modulestores:
+            with patch.object(store, 'has_course') as mock_has_course:
+                store_for_course = self.store._get_modulestore_for_courselike(missing_key)  # pylint: disable=protected-access
+                self.assertEqual(store_for_course, self.store.default_modulestore)
+                self.assertFalse(mock_has_course.called)
+
+        # until the course is created
+        self.store.create_course(missing_key.org, missing_key.course, missing_key.run, self.user_id)
+        self.assertTrue(self.store.has_course(missing_key))
+
+        self.store.delete_course(missing_key, self.user_id)
+        self.assertNotIn(missing_key, self.store.mappings)
+
     @ddt.data('draft', 'split')
     def test_create_child_detached_tabs(self, default_ms):
         """
@@ -1215,6 +1272,40 @@ class TestMixedModuleStore(CourseComparisonTest):
 
         self.assertBlocksEqualByFields(orig_vertical, reverted_vertical)
 
+    @ddt.data('draft', 'split')
+    def test_course_published_signal(self, default_ms):
+        """
+        Test that course_published is sent for publishes but not for draft-only edits.
+        """
+        self.initdb(default_ms)
+        self._create_block_hierarchy()
+        self.store.signal_handler = Mock()
+
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, self.course.id):
+            vertical = self.store.get_item(self.vertical_x1a)
+            vertical.display_name = 'updated draft'
+            self.store.update_item(vertical, self.user_id)
+        self.assertFalse(self.store.signal_handler.send.called)
+
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, self.course.id):
+            sequential = self.store.get_item(self.sequential_x1)
+            sequential.display_name = 'updated direct-only'
+            self.store.update_item(sequential, self.user_id)
+        self.store.signal_handler.send.assert_called_with('course_published', course_key=self.course.id)
+
+        self.store.signal_handler.reset_mock()
+        self.store.publish(self.vertical_x1a, self.user_id)
+        self.store.signal_handler.send.assert_called_once_with('course_published', course_key=self.course.id)
+
+        # inside a bulk operation, the signal is sent once the outermost one has ended
+        self.store.signal_handler.reset_mock()
+        with self.store.bulk_operations(self.course.id):
+            with self.store.bulk_operations(self.course.id):
+                self.store.publish(self.vertical_x1a, self.user_id)
+                self.store.publish(self.vertical_x1b, self.user_id)
+            self.assertFalse(self.store.signal_handler.send.called)
+        self.store.signal_handler.send.assert_called_once_with('course_published', course_key=self.course.id)
+
     @ddt.data('draft', 'split')
     def test_revert_to_published_no_published(self, default_ms):
         """
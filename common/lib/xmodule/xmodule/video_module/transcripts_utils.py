@@ -4,9 +4,12 @@ Utility functions for transcripts.
 """
 import os
 import copy
+import hashlib
 import json
 import requests
 import logging
+import threading
+from collections import OrderedDict
 from pysrt import SubRipTime, SubRipItem, SubRipFile
 from lxml import etree
 from HTMLParser import HTMLParser
@@ -35,6 +38,91 @@ class TranscriptsRequestValidationException(Exception):  # pylint: disable=missi
     pass
 
 
+class ConvertedTranscriptCache(object):
+    """
+    Content-addressed cache of converted transcripts.
+
+    Entries are keyed by the digest of the source transcript, its format, the
+    target format and the target speed, so an edited transcript simply gets a
+    new key and stale entries age out.  Up to `max_bytes` of converted
+    transcripts are kept in process, evicting the least recently used entry
+    first.  Callers may also pass a shared second-tier `cache` (an object with
+    .get(key) and .set(key, value) methods, like the runtime's cache), which is
+    consulted on a local miss and filled on a conversion.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content, input_format, output_format, speed=1.0):
+        """
+        Returns the cache key for converting `content` from `input_format` to
+        `output_format` at `speed`.
+        """
+        if isinstance(content, unicode):
+            content = content.encode('utf8')
+        return "transcript.{}.{}.{}.{!r}".format(
+            hashlib.sha1(content).hexdigest(), input_format, output_format, float(speed)
+        )
+
+    def get(self, key, cache=None):
+        """
+        Returns the converted transcript stored under `key`, or None.
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                # re-insert to mark it as the most recently used
+                self._entries[key] = value
+                return value
+
+        if cache is not None:
+            value = cache.get(key)
+            if value is not None:
+                self._store(key, value)
+        return value
+
+    def set(self, key, value, cache=None):
+        """
+        Stores the converted transcript `value` under `key`.
+        """
+        self._store(key, value)
+        if cache is not None:
+            cache.set(key, value)
+
+    def clear(self):
+        """
+        Empties the in-process tier.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store(self, key, value):
+        """
+        Adds an entry to the in-process tier, evicting old entries to stay within `max_bytes`.
+        """
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self._size -= len(old_value)
+            while self._entries and self._size + size > self.max_bytes:
+                __, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+            self._entries[key] = value
+            self._size += size
+
+
+# Process-wide cache of converted transcripts, used by `Transcript.convert`
+CONVERTED_TRANSCRIPT_CACHE = ConvertedTranscriptCache(max_bytes=16 * 1024 * 1024)
+
+
 def generate_subs(speed, source_speed, source_subs):
     """
     Generate transcripts from one speed to another speed.
@@ -443,12 +531,16 @@ class Transcript(object):
     }
 
     @staticmethod
-    def convert(content, input_format, output_format):
+    def convert(content, input_format, output_format, cache=None):
         """
         Convert transcript `content` from `input_format` to `output_format`.
 
         Accepted input formats: sjson, srt.
         Accepted output format: srt, txt.
+
+        Conversions are remembered in `CONVERTED_TRANSCRIPT_CACHE`, keyed by the
+        digest of `content`, so a transcript is only parsed the first time it is
+        requested in each format.  `cache`, if given, is used as a shared second tier.
         """
         assert input_format in ('srt', 'sjson')
         assert output_format in ('txt', 'srt', 'sjson')
@@ -456,6 +548,19 @@ class Transcript(object):
         if input_format == output_format:
             return content
 
+        key = ConvertedTranscriptCache.key(content, input_format, output_format)
+        converted = CONVERTED_TRANSCRIPT_CACHE.get(key, cache)
+        if converted is None:
+            converted = Transcript._convert(content, input_format, output_format)
+            if converted:
+                CONVERTED_TRANSCRIPT_CACHE.set(key, converted, cache)
+        return converted
+
+    @staticmethod
+    def _convert(content, input_format, output_format):
+        """
+        Convert transcript `content` from `input_format` to a different `output_format`, without caching.
+        """
         if input_format == 'srt':
 
             if output_format == 'txt':
@@ -585,11 +690,11 @@ class VideoTranscriptsMixin(object):
 
             data = Transcript.asset(self.location, transcript_name, lang).data
             filename = u'{}.{}'.format(transcript_name, transcript_format)
-            content = Transcript.convert(data, 'sjson', transcript_format)
+            content = Transcript.convert(data, 'sjson', transcript_format, cache=self._transcript_cache())
         else:
             data = Transcript.asset(self.location, None, None, self.transcripts[lang]).data
             filename = u'{}.{}'.format(os.path.splitext(self.transcripts[lang])[0], transcript_format)
-            content = Transcript.convert(data, 'srt', transcript_format)
+            content = Transcript.convert(data, 'srt', transcript_format, cache=self._transcript_cache())
 
         if not content:
             log.debug('no subtitles produced in get_transcript')
@@ -597,6 +702,12 @@ class VideoTranscriptsMixin(object):
 
         return content, filename, Transcript.mime_types[transcript_format]
 
+    def _transcript_cache(self):
+        """
+        Returns the runtime's cache, used as the shared tier for converted transcripts, if it has one.
+        """
+        return getattr(self.runtime, 'cache', None)
+
     def get_default_transcript_language(self):
         """
         Returns the default transcript language for this video module.
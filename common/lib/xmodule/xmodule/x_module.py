@@ -261,6 +261,11 @@ class XModuleMixin(XBlockMixin):
     # student interacts with the module on the page.  A specific example is
     # FoldIt, which posts grade-changing updates through a separate API.
     always_recalculate_grades = False
+
+    # Names of the views whose output is the same for every user that views
+    # this version of the block, which runtimes may therefore cache
+    cacheable_views = ()
+
     # The default implementation of get_icon_class returns the icon_class
     # attribute of the class
     #
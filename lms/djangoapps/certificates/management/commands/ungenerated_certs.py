@@ -4,7 +4,7 @@ courses that have finished, and put their cert requests on the queue.
 """
 from django.core.management.base import BaseCommand, CommandError
 from certificates.models import certificate_status_for_student
-from certificates.queue import XQueueCertInterface
+from certificates.queue import XQueueCertInterface, ADD_CERTS_CHUNK_SIZE, ADD_CERTS_NUM_WORKERS
 from django.contrib.auth.models import User
 from optparse import make_option
 from django.conf import settings
@@ -28,6 +28,9 @@ class Command(BaseCommand):
 
     Use the --noop option to test without actually putting certificates on the
     queue to be generated.
+
+    Use the --batch option to grade students and read their certificate status
+    in chunks, and post the resulting requests to the queue concurrently.
     """
 
     option_list = BaseCommand.option_list + (
@@ -55,6 +58,24 @@ class Command(BaseCommand):
                     'whose entry in the certificate table matches STATUS. '
                     'STATUS can be generating, unavailable, deleted, error '
                     'or notpassing.'),
+        make_option('-b', '--batch',
+                    action='store_true',
+                    dest='batch',
+                    default=False,
+                    help='Grade students and put their certificate requests '
+                    'on the queue in batches'),
+        make_option('--batch-size',
+                    metavar='NUM',
+                    dest='batch_size',
+                    type='int',
+                    default=ADD_CERTS_CHUNK_SIZE,
+                    help='Number of students handled together in --batch mode'),
+        make_option('--workers',
+                    metavar='NUM',
+                    dest='workers',
+                    type='int',
+                    default=ADD_CERTS_NUM_WORKERS,
+                    help='Number of concurrent queue requests in --batch mode'),
     )
 
     def handle(self, *args, **options):
@@ -64,7 +85,7 @@ class Command(BaseCommand):
         # to something else with the force flag
 
         if options['force']:
-            valid_statuses = getattr(CertificateStatuses, options['force'])
+            valid_statuses = [getattr(CertificateStatuses, options['force'])]
         else:
             valid_statuses = [CertificateStatuses.unavailable]
 
@@ -98,6 +119,21 @@ class Command(BaseCommand):
             count = 0
             start = datetime.datetime.now(UTC)
 
+            if options['batch']:
+                if options['noop']:
+                    print "{0} students would be considered".format(total)
+                    continue
+                status_counts = xq.add_certs(
+                    enrolled_students.iterator(), course_key, course=course,
+                    valid_statuses=valid_statuses,
+                    chunk_size=options['batch_size'],
+                    num_workers=options['workers'],
+                    progress_callback=self._print_batch_progress(total),
+                )
+                for status, num in sorted(status_counts.items()):
+                    print '{0}: {1}'.format(status, num)
+                continue
+
             for student in enrolled_students:
                 count += 1
                 if count % STATUS_INTERVAL == 0:
@@ -119,3 +155,24 @@ class Command(BaseCommand):
                         ret = xq.add_cert(student, course_key, course=course)
                         if ret == 'generating':
                             print '{0} - {1}'.format(student, ret)
+
+    @staticmethod
+    def _print_batch_progress(total):
+        """
+        Return a progress callback for `XQueueCertInterface.add_certs` that
+        prints a status update with an approximation of how much time is
+        left after each batch.
+        """
+        progress = {'count': 0, 'start': datetime.datetime.now(UTC)}
+
+        def print_progress(results):
+            """Print progress after a batch of `results` is done."""
+            progress['count'] += len(results)
+            diff = datetime.datetime.now(UTC) - progress['start']
+            timeleft = diff * (total - progress['count']) / max(progress['count'], 1)
+            hours, remainder = divmod(timeleft.seconds, 3600)
+            minutes, seconds = divmod(remainder, 60)
+            print "{0}/{1} completed ~{2:02}:{3:02}m remaining".format(
+                progress['count'], total, hours, minutes)
+
+        return print_progress
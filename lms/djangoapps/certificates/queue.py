@@ -1,7 +1,9 @@
 from certificates.models import GeneratedCertificate
 from certificates.models import certificate_status_for_student
+from certificates.models import certificate_statuses_for_students
 from certificates.models import CertificateStatuses as status
 from certificates.models import CertificateWhitelist
+from certificates.tasks import send_certificate_requests
 
 from courseware import grades, courses
 from django.test.client import RequestFactory
@@ -15,12 +17,29 @@ from verify_student.models import SoftwareSecurePhotoVerification
 import json
 import random
 import logging
+import threading
 import lxml.html
+from collections import defaultdict
 from lxml.etree import XMLSyntaxError, ParserError
+from multiprocessing.pool import ThreadPool
 
 
 logger = logging.getLogger(__name__)
 
+# Statuses from which add_cert will (re-)request a certificate
+ADD_CERT_VALID_STATUSES = [
+    status.generating,
+    status.unavailable,
+    status.deleted,
+    status.error,
+    status.notpassing,
+]
+
+# Number of students handled together by add_certs, and the number of
+# threads used to post their requests to the xqueue
+ADD_CERTS_CHUNK_SIZE = 100
+ADD_CERTS_NUM_WORKERS = 4
+
 
 class XQueueCertInterface(object):
     """
@@ -41,6 +60,11 @@ class XQueueCertInterface(object):
                    view which will save the certificate
                    download URL.
 
+       add_certs:  Add new certificates for many students
+                   in a course at once.  Reads certificate
+                   state in bulk and posts the resulting
+                   requests to the queue concurrently.
+
        regen_cert: Regenerate an existing certificate.
                    For a user that already has a certificate
                    this will delete the existing one and
@@ -55,6 +79,23 @@ class XQueueCertInterface(object):
 
     def __init__(self, request=None):
 
+        if request is None:
+            factory = RequestFactory()
+            self.request = factory.get('/')
+        else:
+            self.request = request
+
+        self.xqueue_interface = self._make_xqueue_interface()
+        # The interfaces of the add_certs worker threads, which can't share a requests session
+        self._worker_local = threading.local()
+        self.whitelist = CertificateWhitelist.objects.all()
+        self.restricted = UserProfile.objects.filter(allow_certificate=False)
+        self.use_https = True
+
+    def _make_xqueue_interface(self):
+        """
+        Return a new XQueueInterface, with its own connection to the queue server.
+        """
         # Get basic auth (username/password) for
         # xqueue connection if it's in the settings
 
@@ -64,20 +105,11 @@ class XQueueCertInterface(object):
         else:
             requests_auth = None
 
-        if request is None:
-            factory = RequestFactory()
-            self.request = factory.get('/')
-        else:
-            self.request = request
-
-        self.xqueue_interface = XQueueInterface(
+        return XQueueInterface(
             settings.XQUEUE_INTERFACE['url'],
             settings.XQUEUE_INTERFACE['django_auth'],
             requests_auth,
         )
-        self.whitelist = CertificateWhitelist.objects.all()
-        self.restricted = UserProfile.objects.filter(allow_certificate=False)
-        self.use_https = True
 
     def regen_cert(self, student, course_id, course=None, forced_grade=None, template_file=None):
         """(Re-)Make certificate for a particular student in a particular course
@@ -153,101 +185,280 @@ class XQueueCertInterface(object):
         Returns the student's status
         """
 
-        VALID_STATUSES = [status.generating,
-                          status.unavailable,
-                          status.deleted,
-                          status.error,
-                          status.notpassing]
-
         cert_status = certificate_status_for_student(student, course_id)['status']
 
+        if cert_status not in ADD_CERT_VALID_STATUSES:
+            return cert_status
+
+        # re-use the course passed in optionally so we don't have to re-fetch everything
+        # for every student
+        if course is None:
+            course = courses.get_course_by_id(course_id)
+        profile = UserProfile.objects.get(user=student)
+
+        # grade the student
+        grade = self._grade(student, course)
+        enrollment_mode, __ = CourseEnrollment.enrollment_mode_for_user(student, course_id)
+        is_whitelisted = self.whitelist.filter(user=student, course_id=course_id, whitelist=True).exists()
+        is_restricted = self.restricted.filter(user=student).exists()
+
+        new_status, contents, key = self._prepare_cert(
+            student, course_id, course, grade, profile.name, enrollment_mode,
+            is_whitelisted, is_restricted, cert_status,
+            forced_grade=forced_grade, template_file=template_file
+        )
+        if contents is not None:
+            self._send_to_xqueue(contents, key)
+
+        return new_status
+
+    def add_certs(self, students, course_id, course=None, valid_statuses=None,
+                  chunk_size=ADD_CERTS_CHUNK_SIZE, num_workers=ADD_CERTS_NUM_WORKERS,
+                  progress_callback=None):
+        """
+        Request new certificates for many students in a course.
+
+        This is the batched counterpart of `add_cert`.  Students are handled
+        in chunks of `chunk_size`: the certificate statuses, profiles,
+        enrollment modes, whitelist and restriction entries for a chunk
+        are each read with a single query, the eligible students are graded,
+        and the resulting requests are posted to the xqueue concurrently by
+        `num_workers` threads.
+
+        Arguments:
+          students  - iterable of User objects
+          course_id - courseenrollment.course_id (CourseKey)
+          course    - the course descriptor, fetched if not given
+          valid_statuses - only students whose current certificate status
+                           is in this list are considered.  Defaults to the
+                           statuses accepted by `add_cert`.
+          progress_callback - if given, called after each chunk with a list
+                           of (student, status, attempted) tuples, where
+                           `attempted` is False for students who were skipped
+                           because of their current status.
+
+        If a request cannot be put on the queue, the certificate is left in
+        the 'error' state instead of raising, so that one bad request does
+        not abort the rest of the batch.
+
+        If FEATURES['ENABLE_XQUEUE_SUBMISSION_QUEUE'] is set, the requests of
+        each chunk are instead handed to one `send_certificate_requests` task,
+        which retries them and sets the 'error' state if they cannot be sent.
+
+        Returns a dictionary mapping each resulting status to the number of
+        students who ended up in it.
+        """
+        if valid_statuses is None:
+            valid_statuses = ADD_CERT_VALID_STATUSES
+        valid_statuses = [cert_status for cert_status in valid_statuses if cert_status in ADD_CERT_VALID_STATUSES]
+
+        if course is None:
+            course = courses.get_course_by_id(course_id)
+
+        status_counts = defaultdict(int)
+        pool = ThreadPool(num_workers)
+        try:
+            for chunk in _chunks(students, chunk_size):
+                results = self._add_cert_chunk(chunk, course_id, course, valid_statuses, pool)
+                for __, new_status, __ in results:
+                    status_counts[new_status] += 1
+                if progress_callback is not None:
+                    progress_callback(results)
+        finally:
+            pool.close()
+            pool.join()
+
+        return dict(status_counts)
+
+    def _add_cert_chunk(self, students, course_id, course, valid_statuses, pool):
+        """
+        Grade one chunk of students for `add_certs` and post their requests.
+
+        Returns a list of (student, status, attempted) tuples.
+        """
+        cert_statuses = certificate_statuses_for_students(students, course_id)
+        eligible = [student for student in students if cert_statuses[student.id]['status'] in valid_statuses]
+        eligible_ids = [student.id for student in eligible]
+
+        profile_names = dict(
+            UserProfile.objects.filter(user__in=eligible_ids).values_list('user_id', 'name')
+        )
+        enrollment_modes = dict(
+            CourseEnrollment.objects.filter(
+                user__in=eligible_ids, course_id=course_id
+            ).values_list('user_id', 'mode')
+        )
+        whitelisted_ids = set(
+            self.whitelist.filter(
+                user__in=eligible_ids, course_id=course_id, whitelist=True
+            ).values_list('user_id', flat=True)
+        )
+        restricted_ids = set(self.restricted.filter(user__in=eligible_ids).values_list('user_id', flat=True))
+
+        results = []
+        submissions = []
+        for student in students:
+            cert_status = cert_statuses[student.id]['status']
+            if cert_status not in valid_statuses:
+                results.append((student, cert_status, False))
+                continue
+
+            grade = self._grade(student, course)
+            new_status, contents, key = self._prepare_cert(
+                student, course_id, course, grade, profile_names.get(student.id, u''),
+                enrollment_modes.get(student.id),
+                student.id in whitelisted_ids, student.id in restricted_ids, cert_status
+            )
+            if contents is not None:
+                submissions.append((student, contents, key))
+            results.append((student, new_status, True))
+
+        if settings.FEATURES.get('ENABLE_XQUEUE_SUBMISSION_QUEUE') and submissions:
+            try:
+                send_certificate_requests.apply_async(
+                    args=[
+                        unicode(course_id),
+                        [
+                            (submitted.id, submitted_contents, submitted_key)
+                            for submitted, submitted_contents, submitted_key in submissions
+                        ],
+                        self.use_https,
+                    ],
+                    routing_key=settings.XQUEUE_SUBMISSION_ROUTING_KEY,
+                )
+                return results
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Unable to queue certificate requests, posting them directly')
+
+        failed_ids = set()
+        send_results = pool.map(
+            self._try_send_to_xqueue,
+            [(request_contents, request_key) for __, request_contents, request_key in submissions]
+        )
+        for (student, __, __), sent in zip(submissions, send_results):
+            if not sent:
+                failed_ids.add(student.id)
+
+        if failed_ids:
+            GeneratedCertificate.objects.filter(user__in=failed_ids, course_id=course_id).update(
+                status=status.error, error_reason='Unable to send queue message'
+            )
+            results = [
+                (result_student, status.error if result_student.id in failed_ids else result_status, attempted)
+                for result_student, result_status, attempted in results
+            ]
+
+        return results
+
+    def _grade(self, student, course):
+        """
+        Grade `student` in `course` using this interface's fake request.
+        """
+        # Needed
+        self.request.user = student
+        self.request.session = {}
+        return grades.grade(student, self.request, course)
+
+    def _prepare_cert(self, student, course_id, course, grade, profile_name, enrollment_mode,
+                      is_whitelisted, is_restricted, cert_status, forced_grade=None, template_file=None):
+        """
+        Update the student's GeneratedCertificate from an already computed grade.
+
+        Returns a tuple (new_status, contents, key).  If the student should be
+        issued a certificate, `contents` and `key` describe the request to put
+        on the queue; otherwise both are None.
+        """
         new_status = cert_status
+        contents = key = None
 
-        if cert_status in VALID_STATUSES:
-            # grade the student
-
-            # re-use the course passed in optionally so we don't have to re-fetch everything
-            # for every student
-            if course is None:
-                course = courses.get_course_by_id(course_id)
-            profile = UserProfile.objects.get(user=student)
-            profile_name = profile.name
-
-            # Needed
-            self.request.user = student
-            self.request.session = {}
-
-            course_name = course.display_name or course_id.to_deprecated_string()
-            is_whitelisted = self.whitelist.filter(user=student, course_id=course_id, whitelist=True).exists()
-            grade = grades.grade(student, self.request, course)
-            enrollment_mode, __ = CourseEnrollment.enrollment_mode_for_user(student, course_id)
-            mode_is_verified = (enrollment_mode == GeneratedCertificate.MODES.verified)
+        course_name = course.display_name or course_id.to_deprecated_string()
+        mode_is_verified = (enrollment_mode == GeneratedCertificate.MODES.verified)
+        if mode_is_verified:
             user_is_verified = SoftwareSecurePhotoVerification.user_is_verified(student)
             user_is_reverified = SoftwareSecurePhotoVerification.user_is_reverified_for_all(course_id, student)
-            cert_mode = enrollment_mode
-            if (mode_is_verified and user_is_verified and user_is_reverified):
-                template_pdf = "certificate-template-{id.org}-{id.course}-verified.pdf".format(id=course_id)
-            elif (mode_is_verified and not (user_is_verified and user_is_reverified)):
-                template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
-                cert_mode = GeneratedCertificate.MODES.honor
-            else:
-                # honor code and audit students
-                template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
-            if forced_grade:
-                grade['grade'] = forced_grade
-
-            cert, __ = GeneratedCertificate.objects.get_or_create(user=student, course_id=course_id)
-
-            cert.mode = cert_mode
-            cert.user = student
-            cert.grade = grade['percent']
-            cert.course_id = course_id
-            cert.name = profile_name
-            # Strip HTML from grade range label
-            grade_contents = grade.get('grade', None)
-            try:
-                grade_contents = lxml.html.fromstring(grade_contents).text_content()
-            except (TypeError, XMLSyntaxError, ParserError) as e:
-                #   Despite blowing up the xml parser, bad values here are fine
-                grade_contents = None
-
-            if is_whitelisted or grade_contents is not None:
-
-                # check to see whether the student is on the
-                # the embargoed country restricted list
-                # otherwise, put a new certificate request
-                # on the queue
-
-                if self.restricted.filter(user=student).exists():
-                    new_status = status.restricted
-                    cert.status = new_status
-                    cert.save()
-                else:
-                    key = make_hashkey(random.random())
-                    cert.key = key
-                    contents = {
-                        'action': 'create',
-                        'username': student.username,
-                        'course_id': course_id.to_deprecated_string(),
-                        'course_name': course_name,
-                        'name': profile_name,
-                        'grade': grade_contents,
-                        'template_pdf': template_pdf,
-                    }
-                    if template_file:
-                        contents['template_pdf'] = template_file
-                    new_status = status.generating
-                    cert.status = new_status
-                    cert.save()
-                    self._send_to_xqueue(contents, key)
+        else:
+            user_is_verified = user_is_reverified = False
+        cert_mode = enrollment_mode
+        if (mode_is_verified and user_is_verified and user_is_reverified):
+            template_pdf = "certificate-template-{id.org}-{id.course}-verified.pdf".format(id=course_id)
+        elif (mode_is_verified and not (user_is_verified and user_is_reverified)):
+            template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
+            cert_mode = GeneratedCertificate.MODES.honor
+        else:
+            # honor code and audit students
+            template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
+        if forced_grade:
+            grade['grade'] = forced_grade
+
+        cert, __ = GeneratedCertificate.objects.get_or_create(user=student, course_id=course_id)
+
+        cert.mode = cert_mode
+        cert.user = student
+        cert.grade = grade['percent']
+        cert.course_id = course_id
+        cert.name = profile_name
+        # Strip HTML from grade range label
+        grade_contents = grade.get('grade', None)
+        try:
+            grade_contents = lxml.html.fromstring(grade_contents).text_content()
+        except (TypeError, XMLSyntaxError, ParserError) as e:
+            #   Despite blowing up the xml parser, bad values here are fine
+            grade_contents = None
+
+        if is_whitelisted or grade_contents is not None:
+
+            # check to see whether the student is on the
+            # the embargoed country restricted list
+            # otherwise, put a new certificate request
+            # on the queue
+
+            if is_restricted:
+                new_status = status.restricted
+                cert.status = new_status
+                cert.save()
             else:
-                cert_status = status.notpassing
-                cert.status = cert_status
+                key = make_hashkey(random.random())
+                cert.key = key
+                contents = {
+                    'action': 'create',
+                    'username': student.username,
+                    'course_id': course_id.to_deprecated_string(),
+                    'course_name': course_name,
+                    'name': profile_name,
+                    'grade': grade_contents,
+                    'template_pdf': template_pdf,
+                }
+                if template_file:
+                    contents['template_pdf'] = template_file
+                new_status = status.generating
+                cert.status = new_status
                 cert.save()
+        else:
+            cert_status = status.notpassing
+            cert.status = cert_status
+            cert.save()
 
-        return new_status
+        return new_status, contents, key
 
-    def _send_to_xqueue(self, contents, key):
+    def _try_send_to_xqueue(self, args):
+        """
+        Call `_send_to_xqueue` with a (contents, key) tuple from a worker thread,
+        using that thread's own XQueueInterface.
+
+        Returns True if the request was queued, False otherwise.
+        """
+        contents, key = args
+        xqueue_interface = getattr(self._worker_local, 'xqueue_interface', None)
+        if xqueue_interface is None:
+            xqueue_interface = self._worker_local.xqueue_interface = self._make_xqueue_interface()
+        try:
+            self._send_to_xqueue(contents, key, xqueue_interface)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Unable to add certificate request for %s to the queue', contents['username'])
+            return False
+        return True
+
+    def _send_to_xqueue(self, contents, key, xqueue_interface=None):
 
         if self.use_https:
             proto = "https"
@@ -258,8 +469,22 @@ class XQueueCertInterface(object):
             '{0}://{1}/update_certificate?{2}'.format(
                 proto, settings.SITE_NAME, key), key, settings.CERT_QUEUE)
 
-        (error, msg) = self.xqueue_interface.send_to_queue(
+        (error, msg) = (xqueue_interface or self.xqueue_interface).send_to_queue(
             header=xheader, body=json.dumps(contents))
         if error:
             logger.critical('Unable to add a request to the queue: {} {}'.format(error, msg))
             raise Exception('Unable to send queue message')
+
+
+def _chunks(items, chunk_size):
+    """
+    Yield successive lists of at most `chunk_size` items from the iterable `items`.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
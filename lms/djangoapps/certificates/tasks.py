@@ -0,0 +1,50 @@
+"""
+Celery tasks for certificates.
+"""
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from opaque_keys.edx.keys import CourseKey
+
+from certificates.models import GeneratedCertificate, CertificateStatuses
+
+
+log = get_task_logger(__name__)
+
+
+@task(max_retries=settings.XQUEUE_SUBMISSION_MAX_RETRIES)  # pylint: disable=not-callable
+def send_certificate_requests(course_key_string, requests, use_https=True):
+    """
+    Post a batch of certificate requests to the xqueue.
+
+    `requests` is a list of (user_id, contents, key) tuples as prepared by
+    `XQueueCertInterface.add_certs`. Requests that cannot be posted are
+    retried with exponential backoff; once the retries are used up, their
+    certificates are put in the error state.
+    """
+    # Imported here since certificates.queue queues this task
+    from certificates.queue import XQueueCertInterface
+
+    xqueue = XQueueCertInterface()
+    xqueue.use_https = use_https
+    failed = [
+        (user_id, contents, key)
+        for user_id, contents, key in requests
+        if not xqueue._try_send_to_xqueue((contents, key))  # pylint: disable=protected-access
+    ]
+    if not failed:
+        return
+
+    retries = send_certificate_requests.request.retries
+    if retries < send_certificate_requests.max_retries:
+        log.warning("Unable to send %d certificate requests to the xqueue, retrying", len(failed))
+        raise send_certificate_requests.retry(
+            args=[course_key_string, failed, use_https],
+            countdown=settings.XQUEUE_SUBMISSION_RETRY_DELAY * 2 ** retries,
+        )
+
+    log.error("Unable to send %d certificate requests to the xqueue after %d retries", len(failed), retries)
+    GeneratedCertificate.objects.filter(
+        user__in=[user_id for user_id, __, __ in failed],
+        course_id=CourseKey.from_string(course_key_string),
+    ).update(status=CertificateStatuses.error, error_reason='Unable to send queue message')
@@ -0,0 +1,98 @@
+"""
+Tests for delivering certificate requests to the xqueue through the
+send_certificate_requests celery task.
+"""
+from mock import patch
+from django.conf import settings
+
+from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from certificates.models import CertificateStatuses, GeneratedCertificate
+from certificates.queue import XQueueCertInterface
+from certificates.tasks import send_certificate_requests
+
+
+@patch.dict(settings.FEATURES, {'ENABLE_XQUEUE_SUBMISSION_QUEUE': True})
+@patch('certificates.queue.grades.grade', lambda *args: {'grade': 'Pass', 'percent': 1.0})
+class SendCertificateRequestsTest(ModuleStoreTestCase):
+    """
+    Tests that add_certs hands its requests to send_certificate_requests,
+    which the test settings run eagerly.
+    """
+    def setUp(self):
+        super(SendCertificateRequestsTest, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [UserFactory() for __ in range(2)]
+        for student in self.students:
+            CourseEnrollment.enroll(student, self.course.id)
+
+    def assert_cert_statuses(self, expected_status):
+        """
+        Check that every student's certificate is in `expected_status`.
+        """
+        for student in self.students:
+            cert = GeneratedCertificate.objects.get(user=student, course_id=self.course.id)
+            self.assertEqual(cert.status, expected_status)
+
+    @patch('certificates.tasks.send_certificate_requests.retry')
+    @patch('certificates.queue.XQueueCertInterface._send_to_xqueue')
+    def test_requests_delivered(self, mock_send_to_xqueue, mock_retry):
+        status_counts = XQueueCertInterface().add_certs(self.students, self.course.id, course=self.course)
+
+        self.assertEqual(status_counts, {CertificateStatuses.generating: len(self.students)})
+        self.assertEqual(
+            sorted(contents['username'] for (contents, __, __), __ in mock_send_to_xqueue.call_args_list),
+            sorted(student.username for student in self.students)
+        )
+        self.assertFalse(mock_retry.called)
+        self.assert_cert_statuses(CertificateStatuses.generating)
+
+    @patch('certificates.queue.XQueueCertInterface._send_to_xqueue')
+    def test_retry_resends_failed_requests(self, mock_send_to_xqueue):
+        failing_username = self.students[0].username
+        sent_usernames = []
+
+        def fail_once(contents, key, xqueue_interface=None):  # pylint: disable=unused-argument
+            """
+            Fail the first attempt to send the first student's request.
+            """
+            sent_usernames.append(contents['username'])
+            if contents['username'] == failing_username and sent_usernames.count(failing_username) == 1:
+                raise Exception('Unable to send queue message')
+        mock_send_to_xqueue.side_effect = fail_once
+
+        with patch(
+            'certificates.tasks.send_certificate_requests.retry', wraps=send_certificate_requests.retry
+        ) as mock_retry:
+            XQueueCertInterface().add_certs(self.students, self.course.id, course=self.course)
+
+        # only the failed request is sent again
+        self.assertEqual(mock_retry.call_count, 1)
+        __, kwargs = mock_retry.call_args
+        self.assertEqual([request[0] for request in kwargs['args'][1]], [self.students[0].id])
+        self.assertEqual(len(sent_usernames), len(self.students) + 1)
+        self.assertEqual(sent_usernames[-1], failing_username)
+        self.assert_cert_statuses(CertificateStatuses.generating)
+
+    @patch('certificates.queue.XQueueCertInterface._send_to_xqueue')
+    def test_retries_exhausted(self, mock_send_to_xqueue):
+        mock_send_to_xqueue.side_effect = Exception('Unable to send queue message')
+
+        with patch(
+            'certificates.tasks.send_certificate_requests.retry', wraps=send_certificate_requests.retry
+        ) as mock_retry:
+            XQueueCertInterface().add_certs(self.students, self.course.id, course=self.course)
+
+        # every retry resends both requests, waiting twice as long as the one before
+        max_retries = settings.XQUEUE_SUBMISSION_MAX_RETRIES
+        self.assertEqual(
+            [kwargs['countdown'] for __, kwargs in mock_retry.call_args_list],
+            [settings.XQUEUE_SUBMISSION_RETRY_DELAY * 2 ** retries for retries in range(max_retries)]
+        )
+        self.assertEqual(mock_send_to_xqueue.call_count, len(self.students) * (max_retries + 1))
+        for cert in GeneratedCertificate.objects.filter(course_id=self.course.id):
+            self.assertEqual(cert.error_reason, 'Unable to send queue message')
+        self.assert_cert_statuses(CertificateStatuses.error)
@@ -10,7 +10,12 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 from student.tests.factories import UserFactory
-from certificates.models import CertificateStatuses, GeneratedCertificate, certificate_status_for_student
+from certificates.models import (
+    CertificateStatuses,
+    GeneratedCertificate,
+    certificate_status_for_student,
+    certificate_statuses_for_students,
+)
 from certificates.tests.factories import GeneratedCertificateFactory
 
 from util.milestones_helpers import (
@@ -33,6 +38,25 @@ class CertificatesModelTest(ModuleStoreTestCase):
         self.assertEqual(certificate_status['status'], CertificateStatuses.unavailable)
         self.assertEqual(certificate_status['mode'], GeneratedCertificate.MODES.honor)
 
+    def test_certificate_statuses_for_students(self):
+        course = CourseFactory.create(org='edx', number='bulk', display_name='Bulk Course')
+        students = [UserFactory() for __ in range(3)]
+        GeneratedCertificateFactory.create(
+            user=students[0],
+            course_id=course.id,
+            status=CertificateStatuses.downloadable,
+            download_url='http://www.example.com/certificate.pdf',
+            mode='verified'
+        )
+
+        with self.assertNumQueries(1):
+            statuses = certificate_statuses_for_students(students, course.id)
+
+        for student in students:
+            self.assertEqual(statuses[student.id], certificate_status_for_student(student, course.id))
+        self.assertEqual(statuses[students[0].id]['status'], CertificateStatuses.downloadable)
+        self.assertEqual(statuses[students[1].id]['status'], CertificateStatuses.unavailable)
+
     @patch.dict(settings.FEATURES, {'ENABLE_PREREQUISITE_COURSES': True, 'MILESTONES_APP': True})
     def test_course_milestone_collected(self):
         seed_milestone_relationship_types()
@@ -5,7 +5,7 @@ from util.json_request import JsonResponse
 import json
 
 from courseware import models
-from django.db.models import Count
+from django.db.models import Sum
 from django.utils.translation import ugettext as _
 
 from xmodule.modulestore.django import modulestore
@@ -32,12 +32,12 @@ def get_problem_grade_distribution(course_id):
         attempting the problem
     """
 
-    # Aggregate query on studentmodule table for grade data for all problems in course
-    db_query = models.StudentModule.objects.filter(
+    # Grade counts for all problems in course, maintained by `update_studentmodule_aggregates`
+    db_query = models.StudentModuleAggregate.objects.filter(
         course_id__exact=course_id,
         grade__isnull=False,
         module_type__exact="problem",
-    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
+    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Sum('count'))
 
     prob_grade_distrib = {}
     total_student_count = {}
@@ -75,11 +75,11 @@ def get_sequential_open_distrib(course_id):
     Outputs a dict mapping the 'module_id' to the number of students that have opened that subsection/sequential.
     """
 
-    # Aggregate query on studentmodule table for "opening a subsection" data
-    db_query = models.StudentModule.objects.filter(
+    # "Opening a subsection" counts, maintained by `update_studentmodule_aggregates`
+    db_query = models.StudentModuleAggregate.objects.filter(
         course_id__exact=course_id,
         module_type__exact="sequential",
-    ).values('module_state_key').annotate(count_sequential=Count('module_state_key'))
+    ).values('module_state_key').annotate(count_sequential=Sum('count'))
 
     # Build set of "opened" data for each subsection that has "opened" data
     sequential_open_distrib = {}
@@ -98,15 +98,15 @@ def get_problem_set_grade_distrib(course_id, problem_set):
 
     `problem_set` an array of UsageKeys representing problem module_id's.
 
-    Requests from the database the a count of each grade for each problem in the `problem_set`.
+    Reads from StudentModuleAggregate the count of each grade for each problem in the `problem_set`.
 
     Returns a dict, where the key is the problem 'module_id' and the value is a dict with two parts:
       'max_grade' - the maximum grade possible for the course
       'grade_distrib' - array of tuples (`grade`,`count`) ordered by `grade`
     """
 
-    # Aggregate query on studentmodule table for grade data for set of problems in course
-    db_query = models.StudentModule.objects.filter(
+    # Grade counts for set of problems in course, maintained by `update_studentmodule_aggregates`
+    db_query = models.StudentModuleAggregate.objects.filter(
         course_id__exact=course_id,
         grade__isnull=False,
         module_type__exact="problem",
@@ -115,7 +115,7 @@ def get_problem_set_grade_distrib(course_id, problem_set):
         'module_state_key',
         'grade',
         'max_grade',
-    ).annotate(count_grade=Count('grade')).order_by('module_state_key', 'grade')
+    ).annotate(count_grade=Sum('count')).order_by('module_state_key', 'grade')
 
     prob_grade_distrib = {}
 
@@ -11,6 +11,7 @@ from mock import patch
 
 from capa.tests.response_xml_factory import StringResponseXMLFactory
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
+from courseware.models import StudentModuleAggregate
 from courseware.tests.factories import StudentModuleFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -93,6 +94,8 @@ class TestGetProblemGradeDistribution(ModuleStoreTestCase):
                     module_state_key=self.item.location,
                 )
 
+        StudentModuleAggregate.update_course(self.course.id)
+
     def test_get_problem_grade_distribution(self):
 
         prob_grade_distrib, total_student_count = get_problem_grade_distribution(self.course.id)
@@ -0,0 +1,51 @@
+# pylint: disable=missing-docstring
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from xmodule.modulestore.django import modulestore
+
+from courseware.models import StudentModuleAggregate
+
+
+class Command(BaseCommand):
+    """
+    Update the StudentModule aggregates read by the instructor dashboard and
+    staff debug histograms.
+
+    Takes an optional list of course ids; all courses are updated if none are
+    given. Meant to be run periodically, e.g. from cron.
+
+    """
+    args = "[<course_id> ...]"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--full',
+                    action='store_true',
+                    default=False,
+                    help='Recount every module rather than only those changed since the last run'),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            course_keys = [self._parse_course_key(arg) for arg in args]
+        else:
+            course_keys = [course.id for course in modulestore().get_courses()]
+
+        for course_key in course_keys:
+            updated = StudentModuleAggregate.update_course(course_key, full=options['full'])
+            self.stdout.write(u"{}: {} modules updated\n".format(course_key.to_deprecated_string(), updated))
+
+    def _parse_course_key(self, course_id):
+        try:
+            return CourseKey.from_string(course_id)
+        except InvalidKeyError:
+            try:
+                return SlashSeparatedCourseKey.from_deprecated_string(course_id)
+            except InvalidKeyError:
+                raise CommandError("Invalid course id {}".format(course_id))
@@ -3,7 +3,8 @@ Classes to provide the LMS runtime data storage to XBlocks
 """
 
 import json
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
 from itertools import chain
 from .models import (
     StudentModule,
@@ -16,12 +17,14 @@ from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.asides import AsideUsageKeyV1
 
+from django.core.cache import cache
 from django.db import DatabaseError
 
 from xblock.runtime import KeyValueStore
 from xblock.exceptions import KeyValueMultiSaveError, InvalidScopeError
 from xblock.fields import Scope, UserScope
-from xmodule.modulestore.django import modulestore
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore, get_course_publish_stamp
 from xblock.core import XBlockAside
 
 log = logging.getLogger(__name__)
@@ -42,12 +45,28 @@ def chunks(items, chunk_size):
     return (items[i:i + chunk_size] for i in xrange(0, len(items), chunk_size))
 
 
+# How long the summary of the blocks below a descriptor, used to prefetch their data, is cached
+STRUCTURE_CACHE_TIMEOUT = 60 * 60
+
+# Scopes whose fields FieldDataCache prefetches, by the name they are cached under
+_STRUCTURE_SCOPES = {
+    'user_state': Scope.user_state,
+    'user_state_summary': Scope.user_state_summary,
+    'preferences': Scope.preferences,
+    'user_info': Scope.user_info,
+}
+_STRUCTURE_SCOPE_NAMES = dict((scope, name) for name, scope in _STRUCTURE_SCOPES.iteritems())
+
+
 class FieldDataCache(object):
     """
     A cache of django model objects needed to supply the data
     for a module and its decendants
     """
-    def __init__(self, descriptors, course_id, user, select_for_update=False, asides=None):
+    # Above this many blocks, a user's StudentModules are read for the whole course
+    MAX_USAGE_IDS_PER_QUERY = 500
+
+    def __init__(self, descriptors, course_id, user, select_for_update=False, asides=None, structure=None):
         '''
         Find any courseware.models objects that are needed by any descriptor
         in descriptors. Attempts to minimize the number of queries to the database.
@@ -60,8 +79,13 @@ class FieldDataCache(object):
         user: The user for which to cache data
         select_for_update: True if rows should be locked until end of transaction
         asides: The list of aside types to load, or None to prefetch no asides.
+        structure: A summary of the blocks to cache data for, as built by
+            `_summarize_descriptors`, used in place of `descriptors`.
         '''
         self.cache = {}
+        # Maps field objects with unsaved changes to the names of the fields changed
+        self._dirty = OrderedDict()
+        self._write_depth = 0
         self.descriptors = descriptors
         self.select_for_update = select_for_update
 
@@ -74,14 +98,18 @@ class FieldDataCache(object):
         self.course_id = course_id
         self.user = user
 
+        if structure is None:
+            structure = self._summarize_descriptors(descriptors)
+        self._usage_ids, self._block_types, self._scope_fields = structure
+
         if user.is_authenticated():
-            for scope, fields in self._fields_to_cache().items():
-                for field_object in self._retrieve_fields(scope, fields):
+            for scope, field_names in self._fields_to_cache().items():
+                for field_object in self._retrieve_fields(scope, field_names):
                     self.cache[self._cache_key_from_field_object(scope, field_object)] = field_object
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
-                                         descriptor_filter=lambda descriptor: True,
+                                         descriptor_filter=None,
                                          select_for_update=False, asides=None):
         """
         course_id: the course in the context of which we want StudentModules.
@@ -90,8 +118,12 @@ class FieldDataCache(object):
         depth is the number of levels of descendent modules to load StudentModules for, in addition to
             the supplied descriptor. If depth is None, load all descendent StudentModules
         descriptor_filter is a function that accepts a descriptor and return wether the StudentModule
-            should be cached
+            should be cached, or None to cache all of them
         select_for_update: Flag indicating whether the rows should be locked until end of transaction
+
+        Without a `descriptor_filter`, the summary of the descendents is cached for the published
+        version of the course, so that later calls need not load the descendent descriptors.
+        Draft previews always load the descendents, as they would otherwise share the entry.
         """
 
         def get_child_descriptors(descriptor, depth, descriptor_filter):
@@ -117,10 +149,52 @@ class FieldDataCache(object):
 
             return descriptors
 
-        with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+        if descriptor_filter is not None or \
+                modulestore().get_branch_setting() == ModuleStoreEnum.Branch.draft_preferred:
+            with modulestore().bulk_operations(descriptor.location.course_key):
+                descriptors = get_child_descriptors(descriptor, depth, descriptor_filter or (lambda __: True))
+            return FieldDataCache(descriptors, course_id, user, select_for_update, asides=asides)
 
-        return FieldDataCache(descriptors, course_id, user, select_for_update, asides=asides)
+        usage_id = descriptor.scope_ids.usage_id
+        cache_key = u'courseware.field_data_structure.{}.{}.{}'.format(
+            usage_id, depth, get_course_publish_stamp(usage_id.course_key)
+        )
+        cached = cache.get(cache_key)
+        if cached is None:
+            with modulestore().bulk_operations(descriptor.location.course_key):
+                descriptors = get_child_descriptors(descriptor, depth, lambda descriptor: True)
+            usage_ids, block_types, scope_fields = cls._summarize_descriptors(descriptors)
+            cached = (
+                [(block.block_type, block.block_id) for block in usage_ids],
+                [(block_type.block_family, block_type.block_type) for block_type in block_types],
+                dict((_STRUCTURE_SCOPE_NAMES[scope], list(names)) for scope, names in scope_fields.iteritems()),
+            )
+            cache.set(cache_key, cached, STRUCTURE_CACHE_TIMEOUT)
+
+        block_ids, block_types, scope_fields = cached
+        structure = (
+            set(usage_id.course_key.make_usage_key(block_type, block_id) for block_type, block_id in block_ids),
+            set(BlockTypeKeyV1(block_family, block_type) for block_family, block_type in block_types),
+            dict((_STRUCTURE_SCOPES[name], set(names)) for name, names in scope_fields.iteritems()),
+        )
+        return FieldDataCache([], course_id, user, select_for_update, asides=asides, structure=structure)
+
+    @staticmethod
+    def _summarize_descriptors(descriptors):
+        """
+        Return the usage ids, block types and fields by scope of `descriptors`, which are
+        all a FieldDataCache needs to know about the blocks it caches data for.
+        """
+        usage_ids = set()
+        block_types = set()
+        scope_fields = defaultdict(set)
+        for descriptor in descriptors:
+            usage_ids.add(descriptor.scope_ids.usage_id)
+            block_types.add(BlockTypeKeyV1(descriptor.entry_point, descriptor.scope_ids.block_type))
+            for field in descriptor.fields.values():
+                if field.scope in _STRUCTURE_SCOPE_NAMES:
+                    scope_fields[field.scope].add(field.name)
+        return usage_ids, block_types, scope_fields
 
     def _query(self, model_class, **kwargs):
         """
@@ -153,12 +227,10 @@ class FieldDataCache(object):
         Return a set of all usage_ids for the descriptors that this FieldDataCache is caching
         against, and well as all asides for those descriptors.
         """
-        usage_ids = set()
-        for descriptor in self.descriptors:
-            usage_ids.add(descriptor.scope_ids.usage_id)
-
+        usage_ids = set(self._usage_ids)
+        for usage_id in self._usage_ids:
             for aside_type in self.asides:
-                usage_ids.add(AsideUsageKeyV1(descriptor.scope_ids.usage_id, aside_type))
+                usage_ids.add(AsideUsageKeyV1(usage_id, aside_type))
 
         return usage_ids
 
@@ -167,33 +239,42 @@ class FieldDataCache(object):
         """
         Return a set of all block_types that are cached by this FieldDataCache.
         """
-        block_types = set()
-        for descriptor in self.descriptors:
-            block_types.add(BlockTypeKeyV1(descriptor.entry_point, descriptor.scope_ids.block_type))
+        block_types = set(self._block_types)
 
         for aside_type in self.asides:
             block_types.add(BlockTypeKeyV1(XBlockAside.entry_point, aside_type))
 
         return block_types
 
-    def _retrieve_fields(self, scope, fields):
+    def _retrieve_fields(self, scope, field_names):
         """
         Queries the database for all of the fields in the specified scope
         """
         if scope == Scope.user_state:
-            return self._chunked_query(
-                StudentModule,
-                'module_state_key__in',
-                self._all_usage_ids,
-                course_id=self.course_id,
-                student=self.user.pk,
+            usage_ids = self._all_usage_ids
+            if len(usage_ids) <= self.MAX_USAGE_IDS_PER_QUERY or self.select_for_update:
+                return self._chunked_query(
+                    StudentModule,
+                    'module_state_key__in',
+                    usage_ids,
+                    chunk_size=self.MAX_USAGE_IDS_PER_QUERY,
+                    course_id=self.course_id,
+                    student=self.user.pk,
+                )
+            # Rather than a long list of ids, read all of the user's rows in the course,
+            # which is a single lookup on the (student, module_state_key, course_id) index
+            usage_ids = set(usage_id.map_into_course(self.course_id) for usage_id in usage_ids)
+            return (
+                student_module
+                for student_module in self._query(StudentModule, course_id=self.course_id, student=self.user.pk)
+                if student_module.module_state_key.map_into_course(self.course_id) in usage_ids
             )
         elif scope == Scope.user_state_summary:
             return self._chunked_query(
                 XModuleUserStateSummaryField,
                 'usage_id__in',
                 self._all_usage_ids,
-                field_name__in=set(field.name for field in fields),
+                field_name__in=field_names,
             )
         elif scope == Scope.preferences:
             return self._chunked_query(
@@ -201,26 +282,22 @@ class FieldDataCache(object):
                 'module_type__in',
                 self._all_block_types,
                 student=self.user.pk,
-                field_name__in=set(field.name for field in fields),
+                field_name__in=field_names,
             )
         elif scope == Scope.user_info:
             return self._query(
                 XModuleStudentInfoField,
                 student=self.user.pk,
-                field_name__in=set(field.name for field in fields),
+                field_name__in=field_names,
             )
         else:
             return []
 
     def _fields_to_cache(self):
         """
-        Returns a map of scopes to fields in that scope that should be cached
+        Returns a map of scopes to names of fields in that scope that should be cached
         """
-        scope_map = defaultdict(set)
-        for descriptor in self.descriptors:
-            for field in descriptor.fields.values():
-                scope_map[field.scope].add(field)
-        return scope_map
+        return self._scope_fields
 
     def _cache_key_from_kvs_key(self, key):
         """
@@ -305,6 +382,74 @@ class FieldDataCache(object):
         self.cache[cache_key] = field_object
         return field_object
 
+    @contextmanager
+    def deferred_writes(self):
+        """
+        Hold back writes made through `save_many` until the block exits.
+
+        A row changed several times inside the block, e.g. by a grade
+        event and then by the XBlock saving its state, is written once.
+        If the block raises, its changes are dropped rather than written,
+        so that a failing write can't mask the exception.
+        """
+        self._write_depth += 1
+        try:
+            yield
+        except Exception:
+            if self._write_depth == 1:
+                self._dirty = OrderedDict()
+            raise
+        finally:
+            self._write_depth -= 1
+        if not self._write_depth:
+            self.flush()
+
+    def save_many(self, field_objects):
+        """
+        Save changed field objects, or record them to be saved on `flush`
+        when inside `deferred_writes`.
+
+        `field_objects`: A dictionary mapping field objects to the names of
+          the fields changed on them
+
+        Raises KeyValueMultiSaveError if a write fails.
+        """
+        if not self._write_depth:
+            self._write(field_objects)
+            return
+
+        for field_object, field_names in field_objects.iteritems():
+            self._dirty.setdefault(field_object, []).extend(field_names)
+
+    def discard(self, field_object):
+        """
+        Forget any unsaved changes to `field_object`
+        """
+        self._dirty.pop(field_object, None)
+
+    def flush(self):
+        """
+        Write all field objects changed inside `deferred_writes`
+        """
+        dirty, self._dirty = self._dirty, OrderedDict()
+        self._write(dirty)
+
+    def _write(self, field_objects):
+        """
+        Save each of `field_objects`, a dictionary mapping field objects to
+        the names of the fields changed on them
+        """
+        saved_fields = []
+        for field_object, field_names in field_objects.iteritems():
+            try:
+                field_object.save()
+                # If save is successful on this scope, add the saved fields to
+                # the list of successful saves
+                saved_fields.extend(field_names)
+            except DatabaseError:
+                log.exception('Error saving fields %r', field_names)
+                raise KeyValueMultiSaveError(saved_fields)
+
 
 class DjangoKeyValueStore(KeyValueStore):
     """
@@ -361,7 +506,6 @@ class DjangoKeyValueStore(KeyValueStore):
           xblock.KvsFieldData._key : value
 
         """
-        saved_fields = []
         # field_objects maps a field_object to a list of associated fields
         field_objects = dict()
         for field in kv_dict:
@@ -374,7 +518,7 @@ class DjangoKeyValueStore(KeyValueStore):
             if field_object not in field_objects.keys():
                 field_objects[field_object] = []
             # Update the list of associated fields
-            field_objects[field_object].append(field)
+            field_objects[field_object].append(field.field_name)
 
             # Special case when scope is for the user state, because this scope saves fields in a single row
             if field.scope == Scope.user_state:
@@ -386,16 +530,7 @@ class DjangoKeyValueStore(KeyValueStore):
                 # we don't have to worry about conflicts
                 field_object.value = json.dumps(kv_dict[field])
 
-        for field_object in field_objects:
-            try:
-                # Save the field object that we made above
-                field_object.save()
-                # If save is successful on this scope, add the saved fields to
-                # the list of successful saves
-                saved_fields.extend([field.field_name for field in field_objects[field_object]])
-            except DatabaseError:
-                log.exception('Error saving fields %r', field_objects[field_object])
-                raise KeyValueMultiSaveError(saved_fields)
+        self._field_data_cache.save_many(field_objects)
 
     def delete(self, key):
         if key.scope not in self._allowed_scopes:
@@ -409,8 +544,9 @@ class DjangoKeyValueStore(KeyValueStore):
             state = json.loads(field_object.state)
             del state[key.field_name]
             field_object.state = json.dumps(state)
-            field_object.save()
+            self._field_data_cache.save_many({field_object: [key.field_name]})
         else:
+            self._field_data_cache.discard(field_object)
             field_object.delete()
 
     def has(self, key):
@@ -14,9 +14,11 @@ ASSUMPTIONS: modules have unique IDs, even across different module_types
 """
 from django.contrib.auth.models import User
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from opaque_keys.edx.keys import UsageKey
 
 from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField
 
@@ -230,3 +232,113 @@ class OfflineComputedGradeLog(models.Model):
 
     def __unicode__(self):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
+
+
+class StudentModuleAggregate(models.Model):
+    """
+    Count of StudentModule rows for a module, grouped by grade and max_grade.
+
+    Dashboards read grade distributions and subsection open counts from this
+    table rather than aggregating courseware_studentmodule on every request.
+    Rows are rebuilt for modules whose StudentModules changed since the last
+    run; see `update_course`.
+    """
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    module_type = models.CharField(max_length=32, db_index=True)
+    module_state_key = LocationKeyField(max_length=255, db_index=True, db_column='module_id')
+
+    grade = models.FloatField(null=True, blank=True)
+    max_grade = models.FloatField(null=True, blank=True)
+    count = models.IntegerField(default=0)
+
+    # Number of modules rebuilt per query when updating a course
+    UPDATE_CHUNK_SIZE = 100
+
+    @classmethod
+    def update_course(cls, course_id, full=False):
+        """
+        Bring the aggregates for `course_id` up to date.
+
+        Only modules with a StudentModule modified since the previous update
+        are recounted, unless `full` is set, in which case every module in the
+        course is. Deleted StudentModules are only noticed by a full update.
+
+        The aggregates of each chunk of modules are replaced in a transaction,
+        so dashboards never read partial counts while they are being updated.
+
+        Returns the number of modules that were recounted.
+        """
+        def usage_key(module_key):
+            """
+            Return the UsageKey of the module key string `module_key`, which
+            values_list returns without converting it.
+            """
+            if isinstance(module_key, UsageKey):
+                return module_key
+            return UsageKey.from_string(module_key).map_into_course(course_id)
+
+        log, _created = StudentModuleAggregateLog.objects.get_or_create(course_id=course_id)
+        started = timezone.now()
+
+        modules = StudentModule.objects.filter(course_id=course_id)
+        if not full and log.aggregated_until is not None:
+            modules = modules.filter(modified__gte=log.aggregated_until)
+        module_keys = [
+            usage_key(module_key)
+            for module_key in modules.values_list('module_state_key', flat=True).distinct()
+        ]
+
+        for start in xrange(0, len(module_keys), cls.UPDATE_CHUNK_SIZE):
+            chunk = module_keys[start:start + cls.UPDATE_CHUNK_SIZE]
+            with transaction.commit_on_success():
+                cls.objects.filter(course_id=course_id, module_state_key__in=chunk).delete()
+                counts = StudentModule.objects.filter(
+                    course_id=course_id,
+                    module_state_key__in=chunk,
+                ).values(
+                    'module_type', 'module_state_key', 'grade', 'max_grade'
+                ).annotate(count=models.Count('id')).order_by()
+                cls.objects.bulk_create([
+                    cls(
+                        course_id=course_id,
+                        module_type=row['module_type'],
+                        module_state_key=usage_key(row['module_state_key']),
+                        grade=row['grade'],
+                        max_grade=row['max_grade'],
+                        count=row['count'],
+                    )
+                    for row in counts
+                ])
+
+        if full:
+            # drop the aggregates of modules which no longer have any StudentModule
+            stale_keys = list(set(
+                usage_key(module_key)
+                for module_key in cls.objects.filter(course_id=course_id).values_list(
+                    'module_state_key', flat=True
+                ).distinct()
+            ) - set(module_keys))
+            for start in xrange(0, len(stale_keys), cls.UPDATE_CHUNK_SIZE):
+                cls.objects.filter(
+                    course_id=course_id, module_state_key__in=stale_keys[start:start + cls.UPDATE_CHUNK_SIZE]
+                ).delete()
+
+        log.aggregated_until = started
+        log.save()
+        return len(module_keys)
+
+    def __unicode__(self):
+        return "[StudentModuleAggregate] %s: %s/%s = %d" % (
+            self.module_state_key, self.grade, self.max_grade, self.count
+        )
+
+
+class StudentModuleAggregateLog(models.Model):
+    """
+    Records how far StudentModuleAggregate has been brought up to date for a course.
+    """
+    course_id = CourseKeyField(max_length=255, unique=True)
+    aggregated_until = models.DateTimeField(null=True, blank=True)
+
+    def __unicode__(self):
+        return "[StudentModuleAggregateLog] %s: %s" % (self.course_id, self.aggregated_until)
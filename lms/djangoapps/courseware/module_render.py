@@ -15,6 +15,7 @@ from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.http import Http404, HttpResponse
+from django.utils.translation import ugettext as _
 from django.views.decorators.csrf import csrf_exempt
 
 from capa.xqueue_interface import XQueueInterface
@@ -22,6 +23,7 @@ from courseware.access import has_access, get_user_role
 from courseware.masquerade import setup_masquerade
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
 from courseware.models import StudentModule
+from courseware.tasks import queue_xqueue_submission
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.runtime import LmsModuleSystem, unquote_slashes, quote_slashes
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
@@ -32,14 +34,15 @@ from student.models import anonymous_id_for_user, user_by_anonymous_id
 from xblock.core import XBlock
 from xblock.fields import Scope
 from xblock.runtime import KvsFieldData, KeyValueStore
-from xblock.exceptions import NoSuchHandlerError
+from xblock.exceptions import NoSuchHandlerError, KeyValueMultiSaveError
 from xblock.django.request import django_to_webob_request, webob_to_django_response
 from xmodule.error_module import ErrorDescriptor, NonStaffErrorDescriptor
 from xmodule.exceptions import NotFoundError, ProcessingError
+from xmodule.fields import Date
 from opaque_keys.edx.keys import UsageKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.contentstore.django import contentstore
-from xmodule.modulestore.django import modulestore, ModuleI18nService
+from xmodule.modulestore.django import modulestore, ModuleI18nService, get_course_publish_stamp
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.duedate import get_extended_due_date
 from xmodule_modifiers import (
@@ -63,6 +66,9 @@ if settings.FEATURES.get('MILESTONES_APP', False):
 
 log = logging.getLogger(__name__)
 
+# How long the user-independent table of contents of a course version is cached for
+TOC_SKELETON_CACHE_TIMEOUT = 60 * 60
+
 
 if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
     REQUESTS_AUTH = HTTPBasicAuth(*settings.XQUEUE_INTERFACE['basic_auth'])
@@ -73,6 +79,9 @@ XQUEUE_INTERFACE = XQueueInterface(
     settings.XQUEUE_INTERFACE['url'],
     settings.XQUEUE_INTERFACE['django_auth'],
     REQUESTS_AUTH,
+    submission_queue=(
+        queue_xqueue_submission if settings.FEATURES.get('ENABLE_XQUEUE_SUBMISSION_QUEUE') else None
+    ),
 )
 
 # TODO: course_id and course_key are used interchangeably in this file, which is wrong.
@@ -124,6 +133,59 @@ def _get_required_content(course, user):
     return required_content
 
 
+def _toc_skeleton(course):
+    """
+    Returns the parts of the table of contents for `course` that are the same for every user:
+    a list of chapters, each with its list of sections, leaving out those hidden from the toc.
+
+    Computed from the course descriptors and cached for each published version of the course.
+    """
+    cache_key = u'courseware.toc_skeleton.{}.{}'.format(course.id, get_course_publish_stamp(course.id))
+    skeleton = cache.get(cache_key)
+    if skeleton is None:
+        skeleton = [
+            {
+                'block_type': chapter.location.block_type,
+                'block_id': chapter.location.block_id,
+                'display_name': chapter.display_name_with_default,
+                'url_name': chapter.url_name,
+                'sections': [
+                    {
+                        'block_type': section.location.block_type,
+                        'block_id': section.location.block_id,
+                        'display_name': section.display_name_with_default,
+                        'url_name': section.url_name,
+                        'format': section.format if section.format is not None else '',
+                        'due': section.due,
+                        'graded': section.graded,
+                    }
+                    for section in chapter.get_display_items()
+                    if not section.hide_from_toc
+                ],
+            }
+            for chapter in course.get_display_items()
+            if not chapter.hide_from_toc
+        ]
+        cache.set(cache_key, skeleton, TOC_SKELETON_CACHE_TIMEOUT)
+    return skeleton
+
+
+def _get_extended_due(user, section_location, field_data_cache):
+    """
+    Returns the extended due date granted to `user` for the section, or None.
+    """
+    key = KeyValueStore.Key(
+        scope=Scope.user_state,
+        user_id=user.id,
+        block_scope_id=section_location,
+        field_name='extended_due',
+    )
+    student_module = field_data_cache.find(key)
+    if student_module is None:
+        return None
+    return Date().from_json(json.loads(student_module.state).get('extended_due'))
+
+
 def toc_for_course(request, course, active_chapter, active_section, field_data_cache):
     '''
     Create a table of contents from the module store
@@ -145,48 +207,71 @@ def toc_for_course(request, course, active_chapter, active_section, field_data_c
     NOTE: assumes that if we got this far, user has access to course.  Returns
     None if this is not the case.
 
+    The user-independent structure comes from a cached skeleton (see _toc_skeleton); access
+    checks run against the course's descriptors, so no XModules are instantiated.
+
     field_data_cache must include data from the course module and 2 levels of its descendents
     '''
-
+    user = request.user
     with modulestore().bulk_operations(course.id):
-        course_module = get_module_for_descriptor(request.user, request, course, field_data_cache, course.id)
-        if course_module is None:
+        if getattr(user, 'known', True) and not has_access(user, 'load', course, course.id):
             return None
 
         # Check to see if the course is gated on required content (such as an Entrance Exam)
-        required_content = _get_required_content(course, request.user)
+        required_content = _get_required_content(course, user)
+
+        # The descriptors of the chapters and sections, to check the user's access to them
+        descriptors = {}
+        for chapter in course.get_display_items():
+            descriptors[(chapter.location.block_type, chapter.location.block_id)] = chapter
+            for section in chapter.get_display_items():
+                descriptors[(section.location.block_type, section.location.block_id)] = section
+
+        def can_load(node):
+            """
+            Returns the descriptor for the skeleton node if the user may load it, else None.
+            """
+            descriptor = descriptors.get((node['block_type'], node['block_id']))
+            if descriptor is None:
+                return None
+            if getattr(user, 'known', True) and not has_access(user, 'load', descriptor, course.id):
+                return None
+            return descriptor
 
         chapters = list()
-        for chapter in course_module.get_display_items():
+        for chapter_node in _toc_skeleton(course):
+            chapter = can_load(chapter_node)
+            if chapter is None:
+                continue
+
             # Only show required content, if there is required content
-            # chapter.hide_from_toc is read-only (boo)
-            local_hide_from_toc = False
             if len(required_content):
                 if unicode(chapter.location) not in required_content:
-                    local_hide_from_toc = True
-
-            # Skip the current chapter if a hide flag is tripped
-            if chapter.hide_from_toc or local_hide_from_toc:
-                continue
+                    continue
 
             sections = list()
-            for section in chapter.get_display_items():
-
-                active = (chapter.url_name == active_chapter and
-                          section.url_name == active_section)
-
-                if not section.hide_from_toc:
-                    sections.append({'display_name': section.display_name_with_default,
-                                     'url_name': section.url_name,
-                                     'format': section.format if section.format is not None else '',
-                                     'due': get_extended_due_date(section),
-                                     'active': active,
-                                     'graded': section.graded,
-                                     })
-            chapters.append({'display_name': chapter.display_name_with_default,
-                             'url_name': chapter.url_name,
+            for section_node in chapter_node['sections']:
+                section = can_load(section_node)
+                if section is None:
+                    continue
+
+                active = (chapter_node['url_name'] == active_chapter and
+                          section_node['url_name'] == active_section)
+
+                sections.append({'display_name': section_node['display_name'],
+                                 'url_name': section_node['url_name'],
+                                 'format': section_node['format'],
+                                 'due': get_extended_due_date({
+                                     'due': section_node['due'],
+                                     'extended_due': _get_extended_due(user, section.location, field_data_cache),
+                                 }),
+                                 'active': active,
+                                 'graded': section_node['graded'],
+                                 })
+            chapters.append({'display_name': chapter_node['display_name'],
+                             'url_name': chapter_node['url_name'],
                              'sections': sections,
-                             'active': chapter.url_name == active_chapter})
+                             'active': chapter_node['url_name'] == active_chapter})
         return chapters
 
 
@@ -442,7 +527,7 @@ def get_module_system_for_user(user, field_data_cache,
         student_module.grade = event.get('value')
         student_module.max_grade = event.get('max_value')
         # Save all changes to the underlying KeyValueStore
-        student_module.save()
+        field_data_cache.save_many({student_module: ['grade', 'max_grade']})
 
         # Bin score into range and increment stats
         score_bucket = get_score_bucket(student_module.grade, student_module.max_grade)
@@ -462,6 +547,8 @@ def get_module_system_for_user(user, field_data_cache,
         # through the fulfillment scenarios to see if any are now applicable
         # thanks to the updated grading information that was just submitted
         if settings.FEATURES.get('MILESTONES_APP', False):
+            # Milestones read the grade back from the database
+            field_data_cache.flush()
             _fulfill_content_milestones(
                 user,
                 course_id,
@@ -528,27 +615,20 @@ def get_module_system_for_user(user, field_data_cache,
         module.runtime = inner_system
         inner_system.xmodule_instance = module
 
-    # Build a list of wrapping functions that will be applied in order
+    # Build lists of wrapping functions that will be applied in order
     # to the Fragment content coming out of the xblocks that are about to be rendered.
+    # The output of the shared wrappers is the same for every user, so it can be
+    # cached for the views that blocks declare cacheable; block_wrappers are
+    # applied after them, on every render.
+    shared_wrappers = []
     block_wrappers = []
 
-    # Wrap the output display in a single div to allow for the XModule
-    # javascript to be bound correctly
-    if wrap_xmodule_display is True:
-        block_wrappers.append(partial(
-            wrap_xblock,
-            'LmsRuntime',
-            extra_data={'course-id': course_id.to_deprecated_string()},
-            usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string()),
-            request_token=request_token,
-        ))
-
     # TODO (cpennington): When modules are shared between courses, the static
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
     # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
+    shared_wrappers.append(partial(
         replace_static_urls,
         getattr(descriptor, 'data_dir', None),
         course_id=course_id,
@@ -557,19 +637,30 @@ def get_module_system_for_user(user, field_data_cache,
 
     # Allow URLs of the form '/course/' refer to the root of multicourse directory
     #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
+    shared_wrappers.append(partial(replace_course_urls, course_id))
 
     # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
     # is an improvement over the /course/... format for studio authored courses,
     # because it is agnostic to course-hierarchy.
     # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
     # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
+    shared_wrappers.append(partial(
         replace_jump_to_id_urls,
         course_id,
         reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
     ))
 
+    # Wrap the output display in a single div to allow for the XModule
+    # javascript to be bound correctly
+    if wrap_xmodule_display is True:
+        block_wrappers.append(partial(
+            wrap_xblock,
+            'LmsRuntime',
+            extra_data={'course-id': course_id.to_deprecated_string()},
+            usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string()),
+            request_token=request_token,
+        ))
+
     if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
         if has_access(user, 'staff', descriptor, course_id):
             has_instructor_access = has_access(user, 'instructor', descriptor, course_id)
@@ -633,7 +724,9 @@ def get_module_system_for_user(user, field_data_cache,
         get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
         mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
+        shared_wrappers=shared_wrappers,
         wrappers=block_wrappers,
+        fragment_cache=settings.FEATURES.get('ENABLE_XBLOCK_FRAGMENT_CACHE', False),
         get_real_user=user_by_anonymous_id,
         services={
             'i18n': ModuleI18nService(),
@@ -886,8 +979,11 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, user):
 
     req = django_to_webob_request(request)
     try:
-        with tracker.get_tracker().context(tracking_context_name, tracking_context):
-            resp = instance.handle(handler, req, suffix)
+        # Write the state and grade changes made by the handler once it is done
+        with field_data_cache.deferred_writes():
+            with tracker.get_tracker().context(tracking_context_name, tracking_context):
+                resp = instance.handle(handler, req, suffix)
+            field_data_cache.flush()
 
     except NoSuchHandlerError:
         log.exception("XBlock %s attempted to access missing handler %r", instance, handler)
@@ -898,6 +994,11 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, user):
         log.exception("Module indicating to user that request doesn't exist")
         raise Http404
 
+    # If the handler's changes couldn't be saved, tell the user rather than failing the request
+    except KeyValueMultiSaveError:
+        log.exception("Unable to save the changes made by xblock handler %r of %s", handler, instance)
+        return JsonResponse(object={'success': _("Your changes could not be saved. Please try again.")}, status=200)
+
     # For XModule-specific errors, we log the error and respond with an error message
     except ProcessingError as err:
         log.warning("Module encountered an error while processing AJAX call",
@@ -0,0 +1,150 @@
+"""
+Celery tasks for courseware.
+
+When FEATURES['ENABLE_XQUEUE_SUBMISSION_QUEUE'] is set, problem submissions
+without files are handed to `send_to_xqueue` rather than posted to xqueue
+while the student waits for the check to return.
+"""
+import json
+import time
+from urlparse import urlparse
+
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+from django.core.urlresolvers import resolve, Resolver404
+from django.db import transaction
+from django.utils.translation import ugettext as _
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from requests.auth import HTTPBasicAuth
+
+import dogstats_wrapper as dog_stats_api
+from capa.xqueue_interface import XQueueInterface, XQUEUE_METRIC_NAME
+from courseware.models import StudentModule
+
+
+log = get_task_logger(__name__)
+
+# Cache key of the count of submissions queued but not yet delivered
+QUEUE_DEPTH_CACHE_KEY = 'courseware.xqueue_submissions.depth'
+
+_XQUEUE_INTERFACE = None
+
+
+def get_xqueue_interface():
+    """
+    Return the XQueueInterface that background tasks post submissions with,
+    sharing its session between tasks run by the same worker process.
+    """
+    global _XQUEUE_INTERFACE  # pylint: disable=global-statement
+    if _XQUEUE_INTERFACE is None:
+        if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
+            requests_auth = HTTPBasicAuth(*settings.XQUEUE_INTERFACE['basic_auth'])
+        else:
+            requests_auth = None
+        _XQUEUE_INTERFACE = XQueueInterface(
+            settings.XQUEUE_INTERFACE['url'],
+            settings.XQUEUE_INTERFACE['django_auth'],
+            requests_auth,
+        )
+    return _XQUEUE_INTERFACE
+
+
+def queue_xqueue_submission(header, body):
+    """
+    Hand a submission to `send_to_xqueue`, for use as the `submission_queue`
+    of an XQueueInterface.
+
+    If the task cannot be queued, the submission is posted right away instead.
+    Returns (error_code, msg) like `XQueueInterface.send_to_queue`.
+    """
+    try:
+        send_to_xqueue.apply_async(
+            args=[header, body, time.time()],
+            routing_key=settings.XQUEUE_SUBMISSION_ROUTING_KEY,
+        )
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Unable to queue xqueue submission, posting it directly")
+        return get_xqueue_interface().submit(header, body)
+
+    _update_queue_depth(1)
+    return (0, '')
+
+
+@task(max_retries=settings.XQUEUE_SUBMISSION_MAX_RETRIES)  # pylint: disable=not-callable
+def send_to_xqueue(header, body, queued_at):
+    """
+    Post a queued submission to xqueue, retrying with exponential backoff
+    while xqueue cannot be reached or rejects it. Once the retries run out, the
+    problem stops waiting for the submission to be graded.
+
+    `queued_at` is the time.time() at which the submission was queued.
+    """
+    (error, msg) = get_xqueue_interface().submit(header, body)
+    if error:
+        retries = send_to_xqueue.request.retries
+        if retries < send_to_xqueue.max_retries:
+            log.warning("Unable to send submission to xqueue, retrying: %s", msg)
+            raise send_to_xqueue.retry(countdown=settings.XQUEUE_SUBMISSION_RETRY_DELAY * 2 ** retries)
+        log.error("Unable to send submission to xqueue after %d retries: %s", retries, msg)
+        dog_stats_api.increment(XQUEUE_METRIC_NAME, tags=[u'action:drop_submission'])
+        _record_undelivered_submission(header, msg)
+    else:
+        dog_stats_api.histogram(u'{}.submission_latency'.format(XQUEUE_METRIC_NAME), time.time() - queued_at)
+
+    _update_queue_depth(-1)
+
+
+@transaction.commit_on_success
+def _record_undelivered_submission(header, error_msg):
+    """
+    Take the submission described by the xqueue `header` out of the queued state in
+    its StudentModule, with the message the problem gives when the submission can't
+    be delivered right away, so that the student can submit again.
+    """
+    header = json.loads(header)
+    try:
+        callback = resolve(urlparse(header['lms_callback_url']).path)
+    except Resolver404:
+        log.error("Unable to find the problem of undelivered submission %s", header['lms_key'])
+        return
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(callback.kwargs['course_id'])
+    try:
+        student_module = StudentModule.objects.select_for_update().get(
+            student_id=callback.kwargs['userid'],
+            course_id=course_key,
+            module_state_key=course_key.make_usage_key_from_deprecated_string(callback.kwargs['mod_id']),
+        )
+    except StudentModule.DoesNotExist:
+        log.error("Unable to find the state of undelivered submission %s", header['lms_key'])
+        return
+
+    state = json.loads(student_module.state or '{}')
+    msg = _(
+        'Unable to deliver your submission to grader (Reason: {error_msg}). Please try again later.'
+    ).format(error_msg=error_msg)
+    for answer in state.get('correct_map', {}).values():
+        if (answer.get('queuestate') or {}).get('key') == header['lms_key']:
+            answer.update(correctness=None, npoints=None, msg=msg, queuestate=None)
+    for input_state in state.get('input_state', {}).values():
+        if input_state.get('queuekey') == header['lms_key']:
+            input_state.update(queuestate=None, queuekey=None)
+    student_module.state = json.dumps(state)
+    student_module.save()
+
+
+def _update_queue_depth(delta):
+    """
+    Adjust the count of submissions waiting to be delivered, and report it.
+    """
+    try:
+        if delta > 0:
+            depth = cache.incr(QUEUE_DEPTH_CACHE_KEY, delta)
+        else:
+            depth = cache.decr(QUEUE_DEPTH_CACHE_KEY, -delta)
+    except ValueError:
+        # The counter is missing, e.g. after a cache flush; restart it
+        depth = max(delta, 0)
+        cache.set(QUEUE_DEPTH_CACHE_KEY, depth)
+    dog_stats_api.histogram(u'{}.queue_depth'.format(XQUEUE_METRIC_NAME), depth)
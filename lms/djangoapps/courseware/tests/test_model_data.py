@@ -18,6 +18,9 @@ from courseware.tests.factories import StudentPrefsFactory, StudentInfoFactory
 from xblock.fields import Scope, BlockScope, ScopeIds
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.core import XBlock
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from django.test import TestCase
 from django.db import DatabaseError
 
@@ -176,6 +179,47 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
                 self.kvs.set_many(kv_dict)
         self.assertEquals(len(exception_context.exception.saved_field_names), 0)
 
+    def test_deferred_writes(self):
+        "Test that writes inside deferred_writes are saved once, when the block exits"
+        with patch.object(StudentModule, 'save', autospec=True, side_effect=StudentModule.save) as mock_save:
+            with self.field_data_cache.deferred_writes():
+                self.kvs.set(user_state_key('a_field'), 'new_value')
+                self.kvs.set(user_state_key('b_field'), 'newer_value')
+                self.assertEquals(
+                    {'a_field': 'a_value', 'b_field': 'b_value'},
+                    json.loads(StudentModule.objects.all()[0].state)
+                )
+        self.assertEquals(1, mock_save.call_count)
+        self.assertEquals(
+            {'a_field': 'new_value', 'b_field': 'newer_value'},
+            json.loads(StudentModule.objects.all()[0].state)
+        )
+
+    def test_deferred_writes_failure(self):
+        "Test that a failed deferred write raises KeyValueMultiSaveError when the block exits"
+        with patch('django.db.models.Model.save', side_effect=DatabaseError):
+            with self.assertRaises(KeyValueMultiSaveError) as exception_context:
+                with self.field_data_cache.deferred_writes():
+                    self.kvs.set_many(self.construct_kv_dict())
+        self.assertEquals(len(exception_context.exception.saved_field_names), 0)
+        self.assertEquals(
+            {'a_field': 'a_value', 'b_field': 'b_value'},
+            json.loads(StudentModule.objects.all()[0].state)
+        )
+
+    def test_deferred_writes_exception(self):
+        "Test that the writes of a block that raises are dropped, and its exception propagates"
+        with patch('django.db.models.Model.save', side_effect=DatabaseError) as mock_save:
+            with self.assertRaises(ValueError):
+                with self.field_data_cache.deferred_writes():
+                    self.kvs.set_many(self.construct_kv_dict())
+                    raise ValueError
+        self.assertFalse(mock_save.called)
+        self.assertEquals(
+            {'a_field': 'a_value', 'b_field': 'b_value'},
+            json.loads(StudentModule.objects.all()[0].state)
+        )
+
 
 class TestMissingStudentModule(TestCase):
     def setUp(self):
@@ -339,3 +383,56 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestCacheForDescriptorDescendents(ModuleStoreTestCase):
+    """Tests for prefetching field data below a descriptor"""
+    def setUp(self):
+        super(TestCacheForDescriptorDescendents, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent_location=self.course.location, category='chapter')
+        sequential = ItemFactory.create(parent_location=chapter.location, category='sequential')
+        self.problems = [
+            ItemFactory.create(parent_location=sequential.location, category='problem')
+            for __ in xrange(3)
+        ]
+        self.user = UserFactory.create()
+        for problem in self.problems:
+            cmfStudentModuleFactory.create(
+                student=self.user,
+                course_id=self.course.id,
+                module_state_key=problem.location,
+                state=json.dumps({'attempts': 1}),
+            )
+
+    def _assert_problems_cached(self, field_data_cache):
+        """Assert that the StudentModule of each problem is in `field_data_cache`"""
+        for problem in self.problems:
+            key = DjangoKeyValueStore.Key(Scope.user_state, self.user.id, problem.location, 'attempts')
+            self.assertIsNotNone(field_data_cache.find(key))
+
+    def test_structure_is_cached(self):
+        self._assert_problems_cached(
+            FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, self.course)
+        )
+
+        # The descendents are not loaded again
+        with patch.object(self.course, 'get_children', side_effect=AssertionError):
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, self.course)
+        self._assert_problems_cached(field_data_cache)
+
+    def test_structure_is_not_cached_for_drafts(self):
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, self.course.id):
+            self._assert_problems_cached(
+                FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, self.course)
+            )
+
+        # A published request does not reuse the structure loaded for the draft preview
+        with patch.object(self.course, 'get_children', side_effect=AssertionError):
+            with self.assertRaises(AssertionError):
+                FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, self.course)
+
+    def test_many_usage_ids(self):
+        with patch.object(FieldDataCache, 'MAX_USAGE_IDS_PER_QUERY', 1):
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, self.course)
+        self._assert_problems_cached(field_data_cache)
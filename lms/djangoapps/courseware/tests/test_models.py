@@ -0,0 +1,61 @@
+"""
+Tests for courseware.models
+"""
+from django.test import TestCase
+
+from courseware.models import StudentModule, StudentModuleAggregate
+from courseware.tests.factories import StudentModuleFactory, location, course_id
+from xmodule_modifiers import grade_histogram
+
+
+class TestStudentModuleAggregate(TestCase):
+    """
+    Tests for maintaining StudentModuleAggregate
+    """
+    def setUp(self):
+        super(TestStudentModuleAggregate, self).setUp()
+        self.problem = location('problem1')
+        self.other_problem = location('problem2')
+        self.modules = [
+            StudentModuleFactory.create(
+                course_id=course_id, module_state_key=self.problem, grade=grade, max_grade=1
+            )
+            for grade in (0, 1, 1)
+        ]
+        StudentModuleFactory.create(
+            course_id=course_id, module_state_key=self.other_problem, grade=1, max_grade=1
+        )
+
+    def test_update_course(self):
+        self.assertEquals(2, StudentModuleAggregate.update_course(course_id))
+        self.assertEquals([(0, 1), (1, 2)], grade_histogram(self.problem))
+        self.assertEquals([(1, 1)], grade_histogram(self.other_problem))
+
+    def test_incremental_update(self):
+        StudentModuleAggregate.update_course(course_id)
+
+        self.modules[0].grade = 1
+        self.modules[0].save()
+
+        # Only the changed problem is recounted
+        self.assertEquals(1, StudentModuleAggregate.update_course(course_id))
+        self.assertEquals([(1, 3)], grade_histogram(self.problem))
+        self.assertEquals([(1, 1)], grade_histogram(self.other_problem))
+
+    def test_full_update(self):
+        StudentModuleAggregate.update_course(course_id)
+        self.modules[0].delete()
+
+        self.assertEquals(0, StudentModuleAggregate.update_course(course_id))
+        self.assertEquals([(0, 1), (1, 2)], grade_histogram(self.problem))
+
+        self.assertEquals(2, StudentModuleAggregate.update_course(course_id, full=True))
+        self.assertEquals([(1, 2)], grade_histogram(self.problem))
+
+    def test_full_update_removes_deleted_modules(self):
+        StudentModuleAggregate.update_course(course_id)
+        StudentModule.objects.filter(module_state_key=self.other_problem).delete()
+
+        self.assertEquals(1, StudentModuleAggregate.update_course(course_id, full=True))
+        self.assertEquals([], grade_histogram(self.other_problem))
+        self.assertEquals([(0, 1), (1, 2)], grade_histogram(self.problem))
@@ -20,6 +20,7 @@ from xblock.field_data import FieldData
 from xblock.runtime import Runtime
 from xblock.fields import ScopeIds
 from xblock.core import XBlock
+from xblock.exceptions import KeyValueMultiSaveError
 
 from capa.tests.response_xml_factory import OptionResponseXMLFactory
 from courseware import module_render as render
@@ -38,7 +39,8 @@ from student.models import anonymous_id_for_user
 from xmodule.lti_module import LTIDescriptor
 
 from xmodule.modulestore import ModuleStoreEnum
-from xmodule.modulestore.django import modulestore
+from xmodule.html_module import HtmlModule
+from xmodule.modulestore.django import modulestore, SignalHandler
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import ItemFactory, CourseFactory, check_mongo_calls
 from xmodule.x_module import XModuleDescriptor, XModule, STUDENT_VIEW
@@ -353,6 +355,21 @@ class TestHandleXBlockCallback(ModuleStoreTestCase, LoginEnrollmentTestCase):
         )
         self.assertIsInstance(response, HttpResponse)
 
+    @patch('courseware.module_render.FieldDataCache.flush', side_effect=KeyValueMultiSaveError([]))
+    def test_xmodule_dispatch_save_failure(self, mock_flush):
+        request = self.request_factory.post('dummy_url', data={'position': 1})
+        request.user = self.mock_user
+        response = render.handle_xblock_callback(
+            request,
+            self.course_key.to_deprecated_string(),
+            quote_slashes(self.location.to_deprecated_string()),
+            'xmodule_handler',
+            'goto_position',
+        )
+        self.assertEqual(mock_flush.call_count, 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), {'success': 'Your changes could not be saved. Please try again.'})
+
     def test_bad_course_id(self):
         request = self.request_factory.post('dummy_url')
         request.user = self.mock_user
@@ -498,6 +515,24 @@ class TestTOC(ModuleStoreTestCase):
             for toc_section in expected:
                 self.assertIn(toc_section, actual)
 
+    @ddt.data((ModuleStoreEnum.Type.mongo, 3, 0), (ModuleStoreEnum.Type.split, 6, 0))
+    @ddt.unpack
+    def test_toc_without_modules(self, default_ms, setup_finds, setup_sends):
+        """
+        The toc is built from the descriptors and a cached skeleton, without binding modules.
+        """
+        with self.store.default_store(default_ms):
+            self.setup_modulestore(default_ms, setup_finds, setup_sends)
+            with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+                first = render.toc_for_course(self.request, self.toy_course, self.chapter, None, self.field_data_cache)
+                with patch('courseware.module_render.cache.set') as mock_cache_set:
+                    second = render.toc_for_course(
+                        self.request, self.toy_course, self.chapter, None, self.field_data_cache
+                    )
+            self.assertFalse(mock_get_module.called)
+            self.assertFalse(mock_cache_set.called)
+            self.assertEqual(first, second)
+
 
 @override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
 class TestHtmlModifiers(ModuleStoreTestCase):
@@ -632,6 +667,68 @@ class TestHtmlModifiers(ModuleStoreTestCase):
         )
 
 
+@override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_XBLOCK_FRAGMENT_CACHE': True})
+class TestFragmentCache(ModuleStoreTestCase):
+    """
+    Tests that the output of cacheable views is served from the fragment cache
+    """
+    def setUp(self):
+        super(TestFragmentCache, self).setUp()
+        self.user = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        self.request.session = {}
+        self.course = CourseFactory.create()
+
+    def _render(self, descriptor):
+        """
+        Render the student view of `descriptor` for the test user
+        """
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course.id, self.user, descriptor
+        )
+        module = render.get_module(self.user, self.request, descriptor.location, field_data_cache)
+        return module.render(STUDENT_VIEW).content
+
+    def test_cached_render(self):
+        descriptor = ItemFactory.create(
+            category='html', parent_location=self.course.location, data='<a href="/static/foo">Foo</a>'
+        )
+        content = self._render(descriptor)
+        self.assertIn('/c4x/{}/{}/asset/foo'.format(self.course.location.org, self.course.location.course), content)
+
+        with patch.object(HtmlModule, 'get_html') as mock_get_html:
+            self.assertEqual(self._render(descriptor), content)
+            self.assertFalse(mock_get_html.called)
+
+    def test_publish_invalidates(self):
+        descriptor = ItemFactory.create(category='html', parent_location=self.course.location, data='<p>Foo</p>')
+        self._render(descriptor)
+
+        SignalHandler.course_published.send(sender=None, course_key=self.course.id)
+        with patch.object(HtmlModule, 'get_html', return_value='<p>Bar</p>'):
+            self.assertIn('<p>Bar</p>', self._render(descriptor))
+
+    def test_personalized_html_not_cached(self):
+        descriptor = ItemFactory.create(
+            category='html', parent_location=self.course.location, data='<p>%%USER_ID%%</p>'
+        )
+        self._render(descriptor)
+
+        with patch.object(HtmlModule, 'get_html', return_value='<p>Bar</p>') as mock_get_html:
+            self.assertIn('<p>Bar</p>', self._render(descriptor))
+            self.assertTrue(mock_get_html.called)
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_XBLOCK_FRAGMENT_CACHE': False})
+    def test_cache_disabled(self):
+        descriptor = ItemFactory.create(category='html', parent_location=self.course.location, data='<p>Foo</p>')
+        self._render(descriptor)
+
+        with patch.object(HtmlModule, 'get_html', return_value='<p>Bar</p>'):
+            self.assertIn('<p>Bar</p>', self._render(descriptor))
+
+
 class ViewInStudioTest(ModuleStoreTestCase):
     """Tests for the 'View in Studio' link visiblity."""
 
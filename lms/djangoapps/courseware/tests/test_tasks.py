@@ -0,0 +1,98 @@
+"""
+Tests for courseware.tasks
+"""
+import json
+import socket
+
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+
+from capa.xqueue_interface import XQueueInterface, make_xheader
+from courseware.models import StudentModule
+from courseware.tasks import queue_xqueue_submission
+from courseware.tests.factories import StudentModuleFactory, course_id, location
+from terrain.stubs.xqueue import StubXQueueService
+
+
+class TestSendToXQueue(TestCase):
+    """
+    Tests for delivering queued submissions to a stub xqueue server.
+    """
+    def setUp(self):
+        super(TestSendToXQueue, self).setUp()
+        self.server = StubXQueueService()
+        self.addCleanup(self.server.shutdown)
+        self.server.config['register_submission_url'] = 'http://127.0.0.1/register'
+
+        # Capture the grader payloads the stub receives, and don't post grades back
+        for name in ('post', 'Timer'):
+            patcher = patch('terrain.stubs.xqueue.{}'.format(name))
+            self.addCleanup(patcher.stop)
+            setattr(self, name.lower(), patcher.start())
+
+        # Build a fresh interface for the stub's url
+        patcher = patch('courseware.tasks._XQUEUE_INTERFACE', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.header = make_xheader('http://127.0.0.1/callback', 'queuekey', 'test_queue')
+        self.body = json.dumps({'grader_payload': 'payload', 'student_response': 'answer'})
+
+    def _xqueue_settings(self, port):
+        """Return XQUEUE_INTERFACE settings pointing at `port`"""
+        return dict(settings.XQUEUE_INTERFACE, url='http://127.0.0.1:{}'.format(port), basic_auth=None)
+
+    def test_submission_delivered(self):
+        with override_settings(XQUEUE_INTERFACE=self._xqueue_settings(self.server.port)):
+            self.assertEqual((0, ''), queue_xqueue_submission(self.header, self.body))
+
+        self.post.assert_called_once_with('http://127.0.0.1/register', data={'grader_payload': 'payload'})
+
+    def _unreachable_xqueue_settings(self):
+        """Return XQUEUE_INTERFACE settings pointing at a port that nothing listens on"""
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return self._xqueue_settings(port)
+
+    @patch('courseware.tasks.dog_stats_api')
+    def test_submission_retried_then_dropped(self, mock_stats):
+        with override_settings(XQUEUE_INTERFACE=self._unreachable_xqueue_settings()):
+            with patch.object(XQueueInterface, 'submit', autospec=True, side_effect=XQueueInterface.submit) as submit:
+                self.assertEqual((0, ''), queue_xqueue_submission(self.header, self.body))
+
+        self.assertEqual(settings.XQUEUE_SUBMISSION_MAX_RETRIES + 1, submit.call_count)
+        mock_stats.increment.assert_called_once_with('edxapp.xqueue', tags=[u'action:drop_submission'])
+
+    def test_dropped_submission_no_longer_queued(self):
+        queuestate = {'key': 'queuekey', 'time': '20141018120000'}
+        student_module = StudentModuleFactory.create(
+            course_id=course_id,
+            module_state_key=location('test_problem'),
+            state=json.dumps({
+                'correct_map': {
+                    'answer_1': {'correctness': 'incomplete', 'msg': '', 'queuestate': queuestate},
+                    'answer_2': {'correctness': 'correct', 'msg': '', 'queuestate': None},
+                },
+            }),
+        )
+        callback_url = 'http://127.0.0.1' + reverse('xqueue_callback', kwargs={
+            'course_id': course_id.to_deprecated_string(),
+            'userid': str(student_module.student.id),
+            'mod_id': location('test_problem').to_deprecated_string(),
+            'dispatch': 'score_update',
+        })
+        header = make_xheader(callback_url, 'queuekey', 'test_queue')
+
+        with override_settings(XQUEUE_INTERFACE=self._unreachable_xqueue_settings()):
+            queue_xqueue_submission(header, self.body)
+
+        correct_map = json.loads(StudentModule.objects.get(pk=student_module.pk).state)['correct_map']
+        self.assertIsNone(correct_map['answer_1']['queuestate'])
+        self.assertIsNone(correct_map['answer_1']['correctness'])
+        self.assertIn('Unable to deliver your submission to grader', correct_map['answer_1']['msg'])
+        self.assertEqual(correct_map['answer_2']['correctness'], 'correct')
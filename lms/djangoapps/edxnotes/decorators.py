@@ -50,5 +50,18 @@ def edxnotes(cls):
                 },
             })
 
+    def cacheable_views(self):
+        """
+        Returns no views while notes are enabled, since they are loaded with a
+        token for the current user.
+        """
+        is_studio = getattr(self.system, "is_author_mode", False)
+        course = self.descriptor.runtime.modulestore.get_course(self.runtime.course_id)
+
+        if is_studio or not is_feature_enabled(course):
+            return super(cls, self).cacheable_views
+        return ()
+
     cls.get_html = get_html
+    cls.cacheable_views = property(cacheable_views)
     return cls
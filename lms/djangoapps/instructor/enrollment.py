@@ -7,12 +7,20 @@ Does not include any access control, be sure to check access before calling.
 import json
 from django.contrib.auth.models import User
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.core.mail import send_mail
+from django.db import transaction
 from django.utils.translation import override as override_language
+import dogstats_wrapper as dog_stats_api
 
-from student.models import CourseEnrollment, CourseEnrollmentAllowed
+from student.models import (
+    CourseEnrollment,
+    CourseEnrollmentAllowed,
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
+)
 from courseware.models import StudentModule
+from django_comment_common.models import Role, FORUM_ROLE_STUDENT
 from edxmako.shortcuts import render_to_string
 from lang_pref import LANGUAGE_KEY
 
@@ -161,6 +169,135 @@ def unenroll_email(course_id, student_email, email_students=False, email_params=
     return previous_state, after_state
 
 
+@transaction.commit_on_success
+def bulk_enroll_emails(course_id, student_emails, auto_enroll=False):
+    """
+    Enroll many students by email, like `enroll_email` but with a fixed
+    number of queries rather than several per student, in one transaction.
+
+    Students who have registered are enrolled; the others are allowed to
+    enroll, with `auto_enroll` put in CourseEnrollmentAllowed.auto_enroll.
+
+    returns a list of (email, message, full_name) tuples, one per email, where
+        `message` names the notification email to send the student (see
+        `send_mail_to_student`), or is None if the student was already enrolled.
+    """
+    # emails are matched in lower case, as the database may compare them case insensitively
+    users = dict(
+        (user.email.lower(), user)
+        for user in User.objects.filter(email__in=student_emails).select_related('profile')
+    )
+    enrollments = dict(
+        (enrollment.user_id, enrollment)
+        for enrollment in CourseEnrollment.objects.filter(course_id=course_id, user__in=users.values())
+    )
+    allowed_emails = set(
+        email.lower() for email in CourseEnrollmentAllowed.objects.filter(
+            course_id=course_id, email__in=student_emails
+        ).values_list('email', flat=True)
+    )
+
+    results = []
+    new_enrollments = []
+    reactivated_enrollments = []
+    new_allowed = []
+    for email in student_emails:
+        user = users.get(email.lower())
+        if user is None:
+            if email.lower() not in allowed_emails:
+                new_allowed.append(CourseEnrollmentAllowed(course_id=course_id, email=email, auto_enroll=auto_enroll))
+                allowed_emails.add(email.lower())
+            results.append((email, 'allowed_enroll', None))
+            continue
+
+        enrollment = enrollments.get(user.id)
+        if enrollment is None:
+            enrollment = CourseEnrollment(user=user, course_id=course_id, mode=u"honor", is_active=True)
+            new_enrollments.append(enrollment)
+            enrollments[user.id] = enrollment
+        elif not enrollment.is_active:
+            # if the student is currently unenrolled, don't enroll them in their
+            # previous mode
+            enrollment.is_active = True
+            enrollment.mode = u"honor"
+            reactivated_enrollments.append(enrollment)
+        else:
+            results.append((email, None, user.profile.name))
+            continue
+        results.append((email, 'enrolled_enroll', user.profile.name))
+
+    CourseEnrollment.objects.bulk_create(new_enrollments)
+    CourseEnrollment.objects.filter(
+        id__in=[reactivated.id for reactivated in reactivated_enrollments]
+    ).update(is_active=True, mode=u"honor")
+    CourseEnrollmentAllowed.objects.bulk_create(new_allowed)
+    CourseEnrollmentAllowed.objects.filter(
+        course_id=course_id, email__in=[email for email, message, __ in results if message == 'allowed_enroll']
+    ).update(auto_enroll=auto_enroll)
+
+    activated = new_enrollments + reactivated_enrollments
+    # bulk writes send no signals, so drop the cached enrollments and give the
+    # students the default forum role here
+    cache.delete_many([
+        CourseEnrollment.ENROLLED_COURSE_IDS_CACHE_KEY.format(user_id=activated_enrollment.user_id)
+        for activated_enrollment in activated
+    ])
+    if activated:
+        forum_role, __ = Role.objects.get_or_create(course_id=course_id, name=FORUM_ROLE_STUDENT)
+        forum_role.users.add(*[activated_enrollment.user for activated_enrollment in activated])
+    for enrollment in activated:
+        enrollment.emit_event(EVENT_NAME_ENROLLMENT_ACTIVATED)
+    if activated:
+        dog_stats_api.increment(
+            "common.student.enrollment",
+            len(activated),
+            tags=[u"org:{}".format(course_id.org),
+                  u"offering:{}".format(course_id.offering),
+                  u"mode:honor"]
+        )
+
+    return results
+
+
+def bulk_unenroll_emails(course_id, student_emails):
+    """
+    Unenroll many students by email, like `unenroll_email` but looking up
+    their enrollments in one query.
+
+    Each enrollment is still deactivated on its own, so that the
+    unenrollment signal is sent for every student.
+
+    returns a list of (email, message, full_name) tuples, one per email, where
+        `message` names the notification email to send the student (see
+        `send_mail_to_student`), or is None if the student was neither
+        enrolled nor allowed to enroll.
+    """
+    # emails are matched in lower case, as the database may compare them case insensitively
+    enrollments = dict(
+        (enrollment.user.email.lower(), enrollment)
+        for enrollment in CourseEnrollment.objects.filter(
+            course_id=course_id, is_active=True, user__email__in=student_emails
+        ).select_related('user__profile')
+    )
+    allowed = CourseEnrollmentAllowed.objects.filter(course_id=course_id, email__in=student_emails)
+    allowed_emails = set(email.lower() for email in allowed.values_list('email', flat=True))
+
+    results = []
+    for email in student_emails:
+        enrollment = enrollments.pop(email.lower(), None)
+        if enrollment is not None:
+            enrollment.update_enrollment(is_active=False)
+            results.append((email, 'enrolled_unenroll', enrollment.user.profile.name))
+        elif email.lower() in allowed_emails:
+            allowed_emails.discard(email.lower())
+            results.append((email, 'allowed_unenroll', None))
+        else:
+            results.append((email, None, None))
+    allowed.delete()
+
+    return results
+
+
 def send_beta_role_email(action, user, email_params):
     """
     Send an email to a user added or removed as a beta tester.
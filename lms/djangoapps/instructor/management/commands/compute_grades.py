@@ -3,7 +3,9 @@
 django management command: dump grades to csv files
 for use by batch processes
 """
-from instructor.offline_gradecalc import offline_grade_calculation
+from optparse import make_option
+
+from instructor.offline_gradecalc import offline_grade_calculation, GRADE_CHUNK_SIZE
 from courseware.courses import get_course_by_id
 from xmodule.modulestore.django import modulestore
 from opaque_keys import InvalidKeyError
@@ -15,10 +17,25 @@ from django.core.management.base import BaseCommand
 
 class Command(BaseCommand):
     help = "Compute grades for all students in a course, and store result in DB.\n"
-    help += "Usage: compute_grades course_id_or_dir \n"
+    help += "Usage: compute_grades [--processes N] [--chunk-size N] [--resume] course_id_or_dir \n"
     help += "   course_id_or_dir: either course_id or course_dir\n"
     help += 'Example course_id: MITx/8.01rq_MW/Classical_Mechanics_Reading_Questions_Fall_2012_MW_Section'
 
+    option_list = BaseCommand.option_list + (
+        make_option('--processes',
+                    type='int',
+                    default=1,
+                    help='Number of processes to grade students in'),
+        make_option('--chunk-size',
+                    type='int',
+                    default=GRADE_CHUNK_SIZE,
+                    help='Number of students graded and saved at a time'),
+        make_option('--resume',
+                    action='store_true',
+                    default=False,
+                    help='Skip students graded since the last completed run, to finish an interrupted run'),
+    )
+
     def handle(self, *args, **options):
 
         print "args = ", args
@@ -48,4 +65,17 @@ class Command(BaseCommand):
         print "-----------------------------------------------------------------------------"
         print "Computing grades for {}".format(course_id)
 
-        offline_grade_calculation(course_key)
+        def print_progress(ngraded, nstudents):
+            """
+            Print how many of the students have been graded so far.
+            """
+            print "{} of {} students done".format(ngraded, nstudents)
+
+        offline_grade_calculation(
+            course_key,
+            processes=options['processes'],
+            chunk_size=options['chunk_size'],
+            resume=options['resume'],
+            progress_callback=print_progress,
+        )
+        print "All Done!"
@@ -7,15 +7,28 @@ be computed offline, by a batch process (eg cronjob).
 The grades are stored in the OfflineComputedGrade table of the courseware model.
 """
 import json
+import logging
 import time
+from itertools import imap
+from multiprocessing import Pool
 
 from json import JSONEncoder
 from courseware import grades, models
 from courseware.courses import get_course_by_id
 from django.contrib.auth.models import User
+from django.db import close_connection, transaction
+from opaque_keys.edx.keys import CourseKey
 
 from instructor.utils import DummyRequest
 
+log = logging.getLogger(__name__)
+
+# Number of students graded by a worker, and written to the DB, at a time
+GRADE_CHUNK_SIZE = 100
+
+# The course being graded by this worker process, loaded when the process starts
+_WORKER_COURSE = None
+
 
 class MyEncoder(JSONEncoder):
 
@@ -28,41 +41,119 @@ class MyEncoder(JSONEncoder):
             yield chunk
 
 
-def offline_grade_calculation(course_key):
+def offline_grade_calculation(course_key, processes=1, chunk_size=GRADE_CHUNK_SIZE, resume=False,
+                              progress_callback=None):
     '''
     Compute grades for all students for a specified course, and save results to the DB.
+
+    Students are graded in chunks of `chunk_size`, spread across `processes` worker
+    processes, and each chunk's grades are written to the DB as soon as it is done.
+    If `resume` is True, students whose grades were written since the last completed
+    calculation for the course are skipped, so an interrupted run can be picked up
+    where it stopped.
+
+    If given, `progress_callback(ngraded, nstudents)` is called after each chunk is saved.
     '''
 
     tstart = time.time()
-    enrolled_students = User.objects.filter(
+    student_ids = list(User.objects.filter(
         courseenrollment__course_id=course_key,
         courseenrollment__is_active=1
-    ).prefetch_related("groups").order_by('username')
+    ).order_by('id').values_list('id', flat=True))
+    nstudents = len(student_ids)
 
-    enc = MyEncoder()
+    log.info(u"%s: %s enrolled students", course_key, nstudents)
+
+    if resume:
+        done_ids = set(_graded_since_last_run(course_key))
+        student_ids = [student_id for student_id in student_ids if student_id not in done_ids]
+        log.info(u"%s: %s students already graded, resuming", course_key, nstudents - len(student_ids))
+
+    chunks = [student_ids[index:index + chunk_size] for index in xrange(0, len(student_ids), chunk_size)]
+
+    if processes > 1:
+        # Don't share this process' DB connection with the workers
+        close_connection()
+        pool = Pool(processes, initializer=_init_worker, initargs=(unicode(course_key),))
+        results = pool.imap_unordered(_grade_students, chunks)
+    else:
+        pool = None
+        course = get_course_by_id(course_key)
+        results = imap(lambda chunk: _grade_students(chunk, course), chunks)
+
+    try:
+        ngraded = nstudents - len(student_ids)
+        for gradesets in results:
+            _save_gradesets(course_key, gradesets)
+            ngraded += len(gradesets)
+            log.info(u"%s: %s of %s students done", course_key, ngraded, nstudents)
+            if progress_callback is not None:
+                progress_callback(ngraded, nstudents)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    tend = time.time()
+    dt = tend - tstart
+
+    ocgl = models.OfflineComputedGradeLog(course_id=course_key, seconds=dt, nstudents=nstudents)
+    ocgl.save()
+    log.info(u"%s: %s", course_key, ocgl)
+
+
+def _graded_since_last_run(course_key):
+    '''
+    Returns the ids of the students whose grades for the course were written after
+    the last completed calculation finished, or all graded students if none has.
+    '''
+    grades_written = models.OfflineComputedGrade.objects.filter(course_id=course_key)
+    last_run = offline_grades_available(course_key)
+    if last_run:
+        grades_written = grades_written.filter(updated__gte=last_run.created)
+    return grades_written.values_list('user_id', flat=True)
 
-    print "{} enrolled students".format(len(enrolled_students))
-    course = get_course_by_id(course_key)
 
-    for student in enrolled_students:
+def _init_worker(course_id):
+    '''
+    Load the course to be graded into a new worker process.
+    '''
+    global _WORKER_COURSE  # pylint: disable=global-statement
+    _WORKER_COURSE = get_course_by_id(CourseKey.from_string(course_id))
+
+
+def _grade_students(student_ids, course=None):
+    '''
+    Grade the students with the given ids in `course`, or in the worker process' course,
+    returning a list of (student id, JSON gradeset).
+    '''
+    course = course or _WORKER_COURSE
+    enc = MyEncoder()
+    gradesets = []
+    for student in User.objects.filter(id__in=student_ids).prefetch_related("groups").order_by('username'):
         request = DummyRequest()
         request.user = student
         request.session = {}
 
         gradeset = grades.grade(student, request, course, keep_raw_scores=True)
-        gs = enc.encode(gradeset)
-        ocg, _created = models.OfflineComputedGrade.objects.get_or_create(user=student, course_id=course_key)
-        ocg.gradeset = gs
-        ocg.save()
-        print "%s done" % student  	# print statement used because this is run by a management command
+        gradesets.append((student.id, enc.encode(gradeset)))
+    return gradesets
 
-    tend = time.time()
-    dt = tend - tstart
 
-    ocgl = models.OfflineComputedGradeLog(course_id=course_key, seconds=dt, nstudents=len(enrolled_students))
-    ocgl.save()
-    print ocgl
-    print "All Done!"
+@transaction.commit_on_success
+def _save_gradesets(course_key, gradesets):
+    '''
+    Replace the students' stored grades for the course with the given list of
+    (student id, JSON gradeset), using a query to remove the old grades and
+    another to insert the new ones.
+    '''
+    models.OfflineComputedGrade.objects.filter(
+        course_id=course_key,
+        user__in=[student_id for student_id, __ in gradesets]
+    ).delete()
+    models.OfflineComputedGrade.objects.bulk_create([
+        models.OfflineComputedGrade(user_id=student_id, course_id=course_key, gradeset=gradeset)
+        for student_id, gradeset in gradesets
+    ])
 
 
 def offline_grades_available(course_key):
@@ -76,6 +167,31 @@ def offline_grades_available(course_key):
     return ocgl.latest('created')
 
 
+def offline_gradesets(course_key, student_ids):
+    '''
+    Returns the offline computed gradesets of the students with the given ids, keyed
+    by student id, reading them all with one query. Students without an offline
+    gradeset are left out.
+    '''
+    return dict(
+        (user_id, json.loads(gradeset))
+        for user_id, gradeset in models.OfflineComputedGrade.objects.filter(
+            course_id=course_key, user__in=student_ids
+        ).values_list('user_id', 'gradeset')
+    )
+
+
+def no_offline_gradeset(student, course_key):
+    '''
+    Returns the gradeset reported for a student without an offline computed one.
+    '''
+    return dict(
+        raw_scores=[],
+        section_breakdown=[],
+        msg='Error: no offline gradeset available for {}, {}'.format(student, course_key)
+    )
+
+
 def student_grades(student, request, course, keep_raw_scores=False, use_offline=False):
     '''
     This is the main interface to get grades.  It has the same parameters as grades.grade, as well
@@ -88,10 +204,6 @@ def student_grades(student, request, course, keep_raw_scores=False, use_offline=
     try:
         ocg = models.OfflineComputedGrade.objects.get(user=student, course_id=course.id)
     except models.OfflineComputedGrade.DoesNotExist:
-        return dict(
-            raw_scores=[],
-            section_breakdown=[],
-            msg='Error: no offline gradeset available for {}, {}'.format(student, course.id)
-        )
+        return no_offline_gradeset(student, course.id)
 
     return json.loads(ocg.gradeset)
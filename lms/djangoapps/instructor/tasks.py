@@ -0,0 +1,58 @@
+"""
+Celery tasks for instructor enrollment operations.
+
+Bulk enrollments queue their notification emails to `send_enrollment_emails`
+instead of sending them one by one while students are being enrolled.
+"""
+from celery import task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from opaque_keys.edx.keys import CourseKey
+
+from courseware.courses import get_course_by_id
+from instructor.enrollment import get_email_params, send_mail_to_student
+from lang_pref import LANGUAGE_KEY
+from openedx.core.djangoapps.user_api.models import UserPreference
+
+
+log = get_task_logger(__name__)
+
+
+def queue_enrollment_emails(course_id, notifications, auto_enroll=False, secure=True):
+    """
+    Queue the notification emails of a bulk enrollment change.
+
+    `notifications` is a list of (email, message, full_name) tuples, as
+        returned by `bulk_enroll_emails` and `bulk_unenroll_emails`; those
+        without a message are left out.
+    """
+    notifications = [list(notification) for notification in notifications if notification[1] is not None]
+    if notifications:
+        send_enrollment_emails.apply_async(
+            args=[unicode(course_id), notifications, auto_enroll, secure],
+            routing_key=settings.BULK_EMAIL_ROUTING_KEY,
+        )
+
+
+@task()  # pylint: disable=not-callable
+def send_enrollment_emails(course_id, notifications, auto_enroll, secure):
+    """
+    Send the enrollment notification emails queued by `queue_enrollment_emails`,
+    each in the language its student prefers.
+    """
+    course = get_course_by_id(CourseKey.from_string(course_id))
+    email_params = get_email_params(course, auto_enroll, secure=secure)
+    languages = dict(
+        UserPreference.objects.filter(
+            key=LANGUAGE_KEY, user__email__in=[email for email, __, __ in notifications]
+        ).values_list('user__email', 'value')
+    )
+
+    for email, message, full_name in notifications:
+        params = dict(email_params, message=message, email_address=email)
+        if full_name is not None:
+            params['full_name'] = full_name
+        try:
+            send_mail_to_student(email, params, language=languages.get(email))
+        except Exception:  # pylint: disable=broad-except
+            log.exception("Unable to send %s email to %s", message, email)
@@ -7,6 +7,7 @@ import json
 import mock
 from abc import ABCMeta
 from courseware.models import StudentModule
+from django_comment_common.models import FORUM_ROLE_STUDENT
 from django.conf import settings
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -19,6 +20,8 @@ from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
 from instructor.enrollment import (
     EmailEnrollmentState,
+    bulk_enroll_emails,
+    bulk_unenroll_emails,
     enroll_email,
     get_email_params,
     reset_student_attempts,
@@ -290,6 +293,72 @@ class TestInstructorUnenrollDB(TestEnrollmentChangeBase):
         return self._run_state_change_test(before_ideal, after_ideal, action)
 
 
+class TestBulkEnrollment(TestCase):
+    """ Test instructor.enrollment.bulk_enroll_emails and bulk_unenroll_emails """
+    def setUp(self):
+        self.course_key = SlashSeparatedCourseKey('Robot', 'fAKE', 'C-%-se-%-ID')
+        self.unenrolled = UserFactory.create()
+        self.enrolled = UserFactory.create()
+        CourseEnrollment.enroll(self.enrolled, self.course_key)
+        self.inactive = UserFactory.create()
+        CourseEnrollment.enroll(self.inactive, self.course_key, mode='verified')
+        CourseEnrollment.unenroll(self.inactive, self.course_key)
+        CourseEnrollmentAllowed.objects.create(course_id=self.course_key, email='allowed@example.com')
+
+    def test_bulk_enroll(self):
+        emails = [
+            self.unenrolled.email, self.enrolled.email, self.inactive.email,
+            'allowed@example.com', 'new@example.com',
+        ]
+        with self.assertNumQueries(10):
+            results = bulk_enroll_emails(self.course_key, emails, auto_enroll=True)
+
+        self.assertEqual([(email, message) for email, message, __ in results], [
+            (self.unenrolled.email, 'enrolled_enroll'),
+            (self.enrolled.email, None),
+            (self.inactive.email, 'enrolled_enroll'),
+            ('allowed@example.com', 'allowed_enroll'),
+            ('new@example.com', 'allowed_enroll'),
+        ])
+        for user in (self.unenrolled, self.enrolled, self.inactive):
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(user, self.course_key), (u'honor', True))
+        self.assertEqual(
+            set(CourseEnrollmentAllowed.objects.filter(course_id=self.course_key, auto_enroll=True).values_list(
+                'email', flat=True
+            )),
+            set(['allowed@example.com', 'new@example.com'])
+        )
+
+    def test_bulk_enroll_assigns_forum_role(self):
+        bulk_enroll_emails(self.course_key, [self.unenrolled.email, self.inactive.email])
+
+        for user in (self.unenrolled, self.inactive):
+            self.assertTrue(
+                user.roles.filter(course_id=self.course_key, name=FORUM_ROLE_STUDENT).exists()
+            )
+
+    def test_bulk_enroll_matches_email_case(self):
+        results = bulk_enroll_emails(self.course_key, [self.unenrolled.email.upper()])
+
+        self.assertEqual(results[0][1], 'enrolled_enroll')
+        self.assertTrue(CourseEnrollment.is_enrolled(self.unenrolled, self.course_key))
+        self.assertFalse(CourseEnrollmentAllowed.objects.filter(course_id=self.course_key).exclude(
+            email='allowed@example.com'
+        ).exists())
+
+    def test_bulk_unenroll(self):
+        emails = [self.unenrolled.email, self.enrolled.email, 'allowed@example.com']
+        results = bulk_unenroll_emails(self.course_key, emails)
+
+        self.assertEqual([(email, message) for email, message, __ in results], [
+            (self.unenrolled.email, None),
+            (self.enrolled.email, 'enrolled_unenroll'),
+            ('allowed@example.com', 'allowed_unenroll'),
+        ])
+        self.assertFalse(CourseEnrollment.is_enrolled(self.enrolled, self.course_key))
+        self.assertFalse(CourseEnrollmentAllowed.objects.filter(course_id=self.course_key).exists())
+
+
 @override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
 class TestInstructorEnrollmentStudentModule(TestCase):
     """ Test student module manipulations. """
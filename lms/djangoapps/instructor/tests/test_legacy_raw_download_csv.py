@@ -3,8 +3,10 @@
 Create course and answer a problem to test raw grade CSV
 """
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from mock import patch
 
 from courseware.tests.test_submitting_problems import TestSubmittingProblems
 from student.roles import CourseStaffRole
@@ -56,3 +58,16 @@ class TestRawGradeCSV(TestSubmittingProblems):
 "2","u2","username","view2@test.com","","0.0","1.0","0.0"
 '''
         self.assertEqual(body, expected_csv, msg)
+
+    @patch.dict(settings.FEATURES, {'MAX_ENROLLMENT_INSTR_BUTTONS': 1})
+    def test_large_course_without_offline_grades(self):
+        """
+        Grades of a course too large to grade in the request are not computed without offline grades.
+        """
+        url = reverse('instructor_dashboard_legacy', kwargs={'course_id': self.course.id.to_deprecated_string()})
+        with patch('instructor.views.legacy.student_grades') as mock_grades:
+            response = self.client.post(url, {'action': 'Download CSV of all RAW grades'})
+
+        self.assertFalse(mock_grades.called)
+        self.assertNotEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('too many students to grade them all here', response.content)
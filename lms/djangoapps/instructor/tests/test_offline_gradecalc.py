@@ -0,0 +1,92 @@
+"""
+Tests of the offline grade calculation
+"""
+import json
+
+from django.test.utils import override_settings
+from mock import patch
+
+from courseware.models import OfflineComputedGrade, OfflineComputedGradeLog
+from instructor.offline_gradecalc import offline_grade_calculation, offline_gradesets
+from student.tests.factories import UserFactory, CourseEnrollmentFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, TEST_DATA_MOCK_MODULESTORE
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+@override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
+@patch('instructor.offline_gradecalc.grades.grade')
+class TestOfflineGradeCalculation(ModuleStoreTestCase):
+    """
+    Test computing and storing the grades of every student in a course
+    """
+    def setUp(self):
+        super(TestOfflineGradeCalculation, self).setUp()
+        self.course = CourseFactory.create()
+        self.students = [UserFactory.create() for __ in range(5)]
+        for student in self.students:
+            CourseEnrollmentFactory.create(user=student, course_id=self.course.id)
+
+    def _stored_grades(self):
+        """
+        Return the stored gradesets of the course, keyed by student id
+        """
+        return dict(
+            (ocg.user_id, json.loads(ocg.gradeset))
+            for ocg in OfflineComputedGrade.objects.filter(course_id=self.course.id)
+        )
+
+    def test_grades_stored(self, mock_grade):
+        mock_grade.side_effect = lambda student, *args, **kwargs: {'percent': student.id}
+
+        offline_grade_calculation(self.course.id, chunk_size=2)
+
+        self.assertEqual(
+            self._stored_grades(),
+            dict((student.id, {'percent': student.id}) for student in self.students)
+        )
+        self.assertEqual(OfflineComputedGradeLog.objects.get(course_id=self.course.id).nstudents, 5)
+
+    def test_grades_replaced(self, mock_grade):
+        mock_grade.return_value = {'percent': 0}
+        offline_grade_calculation(self.course.id)
+
+        mock_grade.return_value = {'percent': 1}
+        offline_grade_calculation(self.course.id)
+
+        self.assertEqual(OfflineComputedGrade.objects.filter(course_id=self.course.id).count(), 5)
+        self.assertEqual(set(grade['percent'] for grade in self._stored_grades().values()), set([1]))
+
+    def test_course_loaded_each_run(self, mock_grade):
+        mock_grade.return_value = {'percent': 0}
+        offline_grade_calculation(self.course.id)
+
+        # grading in this process again sees the course as it is now
+        self.course.display_name = 'Changed'
+        self.store.update_item(self.course, self.user.id)
+        offline_grade_calculation(self.course.id)
+
+        self.assertEqual(mock_grade.call_args[0][2].display_name, 'Changed')
+
+    def test_resume(self, mock_grade):
+        mock_grade.return_value = {'percent': 0}
+        # a run that was interrupted after grading the first two students
+        for student in self.students[:2]:
+            OfflineComputedGrade.objects.create(user=student, course_id=self.course.id, gradeset='{}')
+
+        offline_grade_calculation(self.course.id, resume=True)
+
+        self.assertEqual(
+            set(call[0][0].id for call in mock_grade.call_args_list),
+            set(student.id for student in self.students[2:])
+        )
+        self.assertEqual(len(self._stored_grades()), 5)
+
+    def test_offline_gradesets(self, mock_grade):
+        mock_grade.side_effect = lambda student, *args, **kwargs: {'percent': student.id}
+        offline_grade_calculation(self.course.id)
+
+        student_ids = [student.id for student in self.students[:2]] + [-1]
+        with self.assertNumQueries(1):
+            gradesets = offline_gradesets(self.course.id, student_ids)
+
+        self.assertEqual(gradesets, dict((student.id, {'percent': student.id}) for student in self.students[:2]))
@@ -4,6 +4,7 @@ Tests of the instructor dashboard spoc gradebook
 
 from django.test.utils import override_settings
 from django.core.urlresolvers import reverse
+from mock import patch
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -166,3 +167,35 @@ class TestLetterCutoffPolicy(TestGradebook):
         # User 0 has 0 on the class [1]
         # One use at the top of the page [1]
         self.assertEquals(3, self.response.content.count('grade_None'))
+
+
+@patch('instructor.views.api.GRADEBOOK_PAGE_SIZE', 5)
+class TestGradebookPagination(TestGradebook):
+    """
+    Tests that the gradebook shows a page of students at a time
+    """
+    def _get_page(self, page=None):
+        """
+        Return the usernames of the course's students shown on a page of the gradebook,
+        and the content of the page
+        """
+        response = self.client.get(
+            reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),)),
+            {'page': page} if page is not None else {}
+        )
+        content = unicode(response.content, 'utf-8')
+        return set(user.username for user in self.users if user.username in content), content
+
+    def test_first_page(self):
+        usernames, content = self._get_page()
+        self.assertEquals(len(usernames), 5)
+        self.assertIn('?page=2', content)
+
+    def test_last_page(self):
+        usernames, content = self._get_page(3)
+        self.assertEquals(len(usernames), 1)
+        self.assertIn('?page=2', content)
+        self.assertNotIn('?page=4', content)
+
+    def test_page_out_of_range(self):
+        self.assertEquals(self._get_page(30)[0], self._get_page(3)[0])
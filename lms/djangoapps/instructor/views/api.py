@@ -17,6 +17,7 @@ from django.views.decorators.http import require_POST
 from django.views.decorators.cache import cache_control
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.core.mail.message import EmailMessage
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import IntegrityError
 from django.core.urlresolvers import reverse
 from django.core.validators import validate_email
@@ -72,7 +73,7 @@ from instructor.enrollment import (
     unenroll_email,
 )
 from instructor.access import list_with_level, allow_access, revoke_access, update_forum_role
-from instructor.offline_gradecalc import student_grades
+from instructor.offline_gradecalc import student_grades, offline_grades_available, offline_gradesets
 import instructor_analytics.basic
 import instructor_analytics.distributions
 import instructor_analytics.csvs
@@ -566,6 +567,70 @@ def students_update_enrollment(request, course_id):
     return JsonResponse(response_payload)
 
 
+@ensure_csrf_cookie
+@cache_control(no_cache=True, no_store=True, must_revalidate=True)
+@require_POST
+@require_level('staff')
+@require_post_params(action="enroll or unenroll")
+def bulk_update_enrollment(request, course_id):
+    """
+    Enroll or unenroll the students listed in an uploaded CSV file (using key
+    "uploaded-file") in a background task, for rosters too large to update
+    with `students_update_enrollment`. A CSV file with results is provided via
+    data downloads.
+    Requires staff access.
+
+    Query Parameters:
+    - action in ['enroll', 'unenroll']
+    - auto_enroll is a boolean (defaults to false), as for `students_update_enrollment`
+    - email_students is a boolean (defaults to false), as for `students_update_enrollment`
+    """
+    course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
+    action = request.POST.get('action')
+    if action not in ('enroll', 'unenroll'):
+        return HttpResponseBadRequest(strip_tags(
+            "Unrecognized action '{}'".format(action)
+        ))
+    auto_enroll = request.POST.get('auto_enroll') in ['true', 'True', True]
+    email_students = request.POST.get('email_students') in ['true', 'True', True]
+
+    try:
+        def validator(file_storage, file_to_validate):
+            """
+            Verifies that the expected columns are present.
+            """
+            with file_storage.open(file_to_validate) as f:
+                reader = unicodecsv.reader(UniversalNewlineIterator(f), encoding='utf-8')
+                try:
+                    fieldnames = next(reader)
+                except StopIteration:
+                    fieldnames = []
+                if "email" not in fieldnames and "username" not in fieldnames:
+                    raise FileValidationException(
+                        _("The file must contain a 'username' column, an 'email' column, or both.")
+                    )
+
+        __, filename = store_uploaded_file(
+            request, 'uploaded-file', ['.csv'],
+            course_and_time_based_filename_generator(course_key, "enrollment"),
+            max_file_size=2000000,  # limit to 2 MB
+            validator=validator
+        )
+        # The task will assume the default file storage.
+        instructor_task.api.submit_update_enrollment(
+            request, course_key, filename, action, auto_enroll, email_students
+        )
+    except (FileValidationException, PermissionDenied) as err:
+        return JsonResponse({"error": unicode(err)}, status=400)
+    except AlreadyRunningError:
+        return JsonResponse({"error": _(
+            "Enrollments are already being updated. Check the 'Pending Instructor Tasks' "
+            "table for the status of the task."
+        )}, status=400)
+
+    return JsonResponse()
+
+
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('instructor')
@@ -2126,6 +2191,10 @@ def _split_input_list(str_list):
 
 
 #---- Gradebook (shown to small courses only) ----
+# Number of students graded for one page of the gradebook
+GRADEBOOK_PAGE_SIZE = 100
+
+
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
 @require_level('staff')
 def spoc_gradebook(request, course_id):
@@ -2133,6 +2202,8 @@ def spoc_gradebook(request, course_id):
     Show the gradebook for this course:
     - Only shown for courses with enrollment < settings.FEATURES.get("MAX_ENROLLMENT_INSTR_BUTTONS")
     - Only displayed to course staff
+    - Shows GRADEBOOK_PAGE_SIZE students at a time, the page given by the `page` GET parameter
+    - Uses the offline computed grades of the course when there are any
     """
     course_key = SlashSeparatedCourseKey.from_deprecated_string(course_id)
     course = get_course_with_access(request.user, 'staff', course_key, depth=None)
@@ -2142,21 +2213,33 @@ def spoc_gradebook(request, course_id):
         courseenrollment__is_active=1
     ).order_by('username').select_related("profile")
 
-    # possible extension: implement pagination to show to large courses
+    paginator = Paginator(enrolled_students, GRADEBOOK_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get('page', 1))
+    except PageNotAnInteger:
+        page = paginator.page(1)
+    except EmptyPage:
+        page = paginator.page(paginator.num_pages)
+
+    # students enrolled since the offline grades were computed are graded here
+    gradesets = {}
+    if offline_grades_available(course_key):
+        gradesets = offline_gradesets(course_key, [student.id for student in page.object_list])
 
     student_info = [
         {
             'username': student.username,
             'id': student.id,
             'email': student.email,
-            'grade_summary': student_grades(student, request, course),
+            'grade_summary': gradesets.get(student.id) or student_grades(student, request, course),
             'realname': student.profile.name,
         }
-        for student in enrolled_students
+        for student in page.object_list
     ]
 
     return render_to_response('courseware/gradebook.html', {
         'students': student_info,
+        'page': page,
         'course': course,
         'course_id': course_key,
         # Checked above
@@ -7,6 +7,8 @@ from django.conf.urls import patterns, url
 urlpatterns = patterns('',  # nopep8
     url(r'^students_update_enrollment$',
         'instructor.views.api.students_update_enrollment', name="students_update_enrollment"),
+    url(r'^bulk_update_enrollment$',
+        'instructor.views.api.bulk_update_enrollment', name="bulk_update_enrollment"),
     url(r'^register_and_enroll_students$',
         'instructor.views.api.register_and_enroll_students', name="register_and_enroll_students"),
     url(r'^list_course_role_members$',
@@ -37,12 +37,16 @@ from courseware.courses import get_course_with_access, get_cms_course_link
 from courseware.models import StudentModule
 from django_comment_common.models import FORUM_ROLE_ADMINISTRATOR
 from django_comment_client.utils import has_forum_access
-from instructor.offline_gradecalc import student_grades, offline_grades_available
+from instructor.offline_gradecalc import (
+    student_grades, offline_grades_available, offline_gradesets, no_offline_gradeset
+)
 from instructor.views.tools import strip_if_string, bulk_email_is_enabled_for_course, add_block_ids
 from instructor_task.api import (
     get_running_instructor_tasks,
     get_instructor_task_history,
+    submit_compute_offline_grades,
 )
+from instructor_task.api_helper import AlreadyRunningError
 from instructor_task.views import get_task_completion_info
 from edxmako.shortcuts import render_to_response, render_to_string
 from class_dashboard import dashboard_data
@@ -66,6 +70,16 @@ FORUM_ROLE_REMOVE = 'remove'
 # For determining if a shibboleth course
 SHIBBOLETH_DOMAIN_PREFIX = 'shib:'
 
+# Actions that grade every enrolled student
+GRADING_ACTIONS = (
+    'Dump all RAW grades',
+    'Download CSV of all RAW grades',
+    'List assignments available for this course',
+    'Display grades for assignment',
+    'Export grades for assignment to remote gradebook',
+    'Export CSV file of grades for assignment',
+)
+
 
 def split_by_comma_and_whitespace(a_str):
     """
@@ -150,6 +164,13 @@ def instructor_dashboard(request, course_id):
     action = request.POST.get('action', '')
     use_offline = request.POST.get('use_offline_grades', False)
 
+    # Grading every student of a large course would hold up the request for
+    # minutes, so its grades are only served from the offline computed ones
+    max_enrollment_for_buttons = settings.FEATURES.get("MAX_ENROLLMENT_INSTR_BUTTONS")
+    large_course = max_enrollment_for_buttons is not None and enrollment_number > max_enrollment_for_buttons
+    if not use_offline and large_course:
+        use_offline = bool(offline_grades_available(course_key))
+
     if settings.FEATURES['ENABLE_MANUAL_GIT_RELOAD']:
         if 'GIT pull' in action:
             data_dir = course.data_dir
@@ -178,7 +199,13 @@ def instructor_dashboard(request, course_id):
             except Exception as err:  # pylint: disable=broad-except
                 msg += '<br/><p>Error: {0}</p>'.format(escape(err))
 
-    if action == 'Dump list of enrolled students' or action == 'List enrolled students':
+    if action in GRADING_ACTIONS and large_course and not use_offline:
+        msg += "<font color='red'>{text}</font>".format(text=_(
+            "This course has too many students to grade them all here. Compute grades for all "
+            "students in the background first, then try again once the task completes."
+        ))
+
+    elif action == 'Dump list of enrolled students' or action == 'List enrolled students':
         log.debug(action)
         datatable = get_student_grade_summary_data(request, course, get_grades=False, use_offline=use_offline)
         datatable['title'] = _('List of students enrolled in {course_key}').format(course_key=course_key.to_deprecated_string())
@@ -196,6 +223,20 @@ def instructor_dashboard(request, course_id):
         return return_csv('grades_{0}_raw.csv'.format(course_key.to_deprecated_string()),
                           get_student_grade_summary_data(request, course, get_raw_scores=True, use_offline=use_offline))
 
+    elif action == 'Compute grades for all students in the background':
+        try:
+            submit_compute_offline_grades(request, course_key)
+            msg += "<font color='green'>{text}</font>".format(text=_(
+                "Grades are being computed. You can view the status of the task in the "
+                "'Pending Instructor Tasks' section, and use the grades once it completes."
+            ))
+        except AlreadyRunningError:
+            msg += "<font color='red'>{text}</font>".format(text=_(
+                "Grades are already being computed. Check the 'Pending Instructor Tasks' "
+                "section for the status of the task."
+            ))
+        track.views.server_track(request, "compute-offline-grades", {}, page="idashboard")
+
     elif 'Download CSV of answer distributions' in action:
         track.views.server_track(request, "dump-answer-dist-csv", {}, page="idashboard")
         return return_csv('answer_dist_{0}.csv'.format(course_key.to_deprecated_string()), get_answers_distribution(request, course_key))
@@ -440,7 +481,6 @@ def instructor_dashboard(request, course_id):
 
     # disable buttons for large courses
     disable_buttons = False
-    max_enrollment_for_buttons = settings.FEATURES.get("MAX_ENROLLMENT_INSTR_BUTTONS")
     if max_enrollment_for_buttons is not None:
         disable_buttons = enrollment_number > max_enrollment_for_buttons
 
@@ -740,6 +780,10 @@ def get_student_grade_summary_data(request, course, get_grades=True, get_raw_sco
 
     gtab = GradeTable()
 
+    if get_grades and use_offline:
+        # read all the offline gradesets at once, rather than one query per student
+        gradesets = offline_gradesets(course_key, [student.id for student in enrolled_students])
+
     for student in enrolled_students:
         datarow = [student.id, student.username, student.profile.name, student.email]
         try:
@@ -748,7 +792,10 @@ def get_student_grade_summary_data(request, course, get_grades=True, get_raw_sco
             datarow.append('')
 
         if get_grades:
-            gradeset = student_grades(student, request, course, keep_raw_scores=get_raw_scores, use_offline=use_offline)
+            if use_offline:
+                gradeset = gradesets.get(student.id) or no_offline_gradeset(student, course_key)
+            else:
+                gradeset = student_grades(student, request, course, keep_raw_scores=get_raw_scores)
             log.debug('student={0}, gradeset={1}'.format(student, gradeset))
             with gtab.add_row(student.id) as add_grade:
                 if get_raw_scores:
@@ -852,19 +899,30 @@ def _do_enroll_students(course, course_key, students, secure=False, overload=Fal
             'is_shib_course': is_shib_course
         }
 
+    # look up the users, enrollments and pending enrollments of all the students at once,
+    # by lower case email as the database may compare emails case insensitively
+    users = dict(
+        (user.email.lower(), user) for user in User.objects.filter(email__in=new_students).select_related('profile')
+    )
+    enrolled_user_ids = set(CourseEnrollment.objects.filter(
+        course_id=course_key, is_active=True, user__in=users.values()
+    ).values_list('user_id', flat=True))
+    ceas = dict(
+        (cea.email.lower(), cea) for cea in CourseEnrollmentAllowed.objects.filter(email__in=new_students, course_id=course_key)
+    )
+
     for student in new_students:
-        try:
-            user = User.objects.get(email=student)
-        except User.DoesNotExist:
+        user = users.get(student.lower())
+        if user is None:
 
             # Student not signed up yet, put in pending enrollment allowed table
-            cea = CourseEnrollmentAllowed.objects.filter(email=student, course_id=course_key)
+            cea = ceas.get(student.lower())
 
             # If enrollmentallowed already exists, update auto_enroll flag to however it was set in UI
             # Will be 0 or 1 records as there is a unique key on email + course_id
-            if cea:
-                cea[0].auto_enroll = auto_enroll
-                cea[0].save()
+            if cea is not None:
+                cea.auto_enroll = auto_enroll
+                cea.save()
                 status[student] = 'user does not exist, enrollment already allowed, pending with auto enrollment ' \
                     + ('on' if auto_enroll else 'off')
                 continue
@@ -872,6 +930,7 @@ def _do_enroll_students(course, course_key, students, secure=False, overload=Fal
             # EnrollmentAllowed doesn't exist so create it
             cea = CourseEnrollmentAllowed(email=student, course_id=course_key, auto_enroll=auto_enroll)
             cea.save()
+            ceas[student.lower()] = cea
 
             status[student] = 'user does not exist, enrollment allowed, pending with auto enrollment ' \
                 + ('on' if auto_enroll else 'off')
@@ -885,13 +944,14 @@ def _do_enroll_students(course, course_key, students, secure=False, overload=Fal
             continue
 
         # Student has already registered
-        if CourseEnrollment.is_enrolled(user, course_key):
+        if user.id in enrolled_user_ids:
             status[student] = 'already enrolled'
             continue
 
         try:
             # Not enrolled yet
             CourseEnrollment.enroll(user, course_key)
+            enrolled_user_ids.add(user.id)
             status[student] = 'added'
 
             if email_students:
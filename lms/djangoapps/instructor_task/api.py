@@ -19,8 +19,11 @@ from instructor_task.tasks import (
     delete_problem_state,
     send_bulk_course_email,
     calculate_grades_csv,
+    compute_offline_grades,
     calculate_students_features_csv,
     cohort_students,
+    update_enrollment,
+    generate_certificates,
 )
 
 from instructor_task.api_helper import (check_arguments_for_rescoring,
@@ -224,6 +227,21 @@ def submit_calculate_grades_csv(request, course_key):
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
 
 
+def submit_compute_offline_grades(request, course_key):
+    """
+    Submits a task to grade all students of a course and store the results as
+    offline computed grades.
+
+    AlreadyRunningError is raised if the course's offline grades are already being computed.
+    """
+    task_type = 'offline_grades'
+    task_class = compute_offline_grades
+    task_input = {}
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
 def submit_calculate_students_features_csv(request, course_key, features):
     """
     Submits a task to generate a CSV containing student profile info.
@@ -250,3 +268,42 @@ def submit_cohort_students(request, course_key, file_name):
     task_key = ""
 
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_update_enrollment(request, course_key, file_name, action, auto_enroll=False, email_students=False):
+    """
+    Request to have the students listed in an uploaded file enrolled or
+    unenrolled (`action` is 'enroll' or 'unenroll') in bulk.
+
+    Raises AlreadyRunningError if enrollments are currently being updated.
+    """
+    task_type = 'update_enrollment'
+    task_class = update_enrollment
+    task_input = {
+        'file_name': file_name,
+        'action': action,
+        'auto_enroll': auto_enroll,
+        'email_students': email_students,
+        'secure': request.is_secure(),
+    }
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_generate_certificates(request, course_key, statuses=None):
+    """
+    Submits a task to grade the students of a course and request their
+    certificates in batches.
+
+    Only students whose certificate status is in `statuses` are
+    considered; by default, those who have no certificate yet.
+
+    Raises AlreadyRunningError if certificates are already being generated.
+    """
+    task_type = 'generate_certificates'
+    task_class = generate_certificates
+    task_input = {'statuses': statuses} if statuses else {}
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
@@ -27,16 +27,63 @@ from instructor_task.tasks_helper import (
     run_main_task,
     BaseInstructorTask,
     perform_module_state_update,
+    perform_module_state_update_subtask,
     rescore_problem_module_state,
     reset_attempts_module_state,
     delete_problem_module_state,
     upload_grades_csv,
     upload_students_csv,
-    cohort_students_and_upload
+    cohort_students_and_upload,
+    update_enrollment_and_upload,
+    generate_certificates_for_students,
+    compute_offline_grades_for_course,
 )
 from bulk_email.tasks import perform_delegate_email_batches
 
 
+def _filter_done_problems(modules_to_update):
+    """Filter that matches problems which are marked as being done"""
+    return modules_to_update.filter(state__contains='"done": true')
+
+
+# The update and filter functions of the tasks that visit the StudentModule objects of a problem,
+# keyed by the task's name, so that the subtasks of a task can look them up.
+MODULE_STATE_UPDATES = {
+    'rescore_problem': (rescore_problem_module_state, _filter_done_problems),
+    'reset_problem_attempts': (reset_attempts_module_state, None),
+    'delete_problem_state': (delete_problem_module_state, None),
+}
+
+
+def _run_module_state_update(entry_id, xmodule_instance_args, task_name, action_name):
+    """
+    Runs the task named `task_name`, splitting it into `update_problem_module_state` subtasks
+    when it updates many StudentModule objects.
+    """
+    update_fcn, filter_fcn = MODULE_STATE_UPDATES[task_name]
+
+    def create_subtask_fcn(student_id_range, initial_subtask_status):
+        """Creates a subtask to update the problem for the given range of student ids."""
+        return update_problem_module_state.subtask(
+            (
+                entry_id,
+                xmodule_instance_args,
+                task_name,
+                student_id_range,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+        )
+
+    visit_fcn = partial(
+        perform_module_state_update,
+        partial(update_fcn, xmodule_instance_args),
+        filter_fcn,
+        create_subtask_fcn=create_subtask_fcn,
+    )
+    return run_main_task(entry_id, visit_fcn, action_name)
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def rescore_problem(entry_id, xmodule_instance_args):
     """Rescores a problem in a course, for all students or one specific student.
@@ -58,14 +105,7 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
-
-    def filter_fcn(modules_to_update):
-        """Filter that matches problems which are marked as being done"""
-        return modules_to_update.filter(state__contains='"done": true')
-
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
-    return run_main_task(entry_id, visit_fcn, action_name)
+    return _run_module_state_update(entry_id, xmodule_instance_args, 'rescore_problem', action_name)
 
 
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
@@ -85,9 +125,7 @@ def reset_problem_attempts(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('reset')
-    update_fcn = partial(reset_attempts_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
-    return run_main_task(entry_id, visit_fcn, action_name)
+    return _run_module_state_update(entry_id, xmodule_instance_args, 'reset_problem_attempts', action_name)
 
 
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
@@ -107,9 +145,27 @@ def delete_problem_state(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('deleted')
-    update_fcn = partial(delete_problem_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
-    return run_main_task(entry_id, visit_fcn, action_name)
+    return _run_module_state_update(entry_id, xmodule_instance_args, 'delete_problem_state', action_name)
+
+
+@task()  # pylint: disable=not-callable
+def update_problem_module_state(entry_id, xmodule_instance_args, task_name, student_id_range, subtask_status_dict):
+    """Updates the state of a problem for the students in a range of student ids.
+
+    This is a subtask of the task named `task_name`, one of 'rescore_problem', 'reset_problem_attempts'
+    and 'delete_problem_state', whose InstructorTask entry has the id `entry_id`.
+
+    `student_id_range` is a [first, last] list of the ids of the students whose StudentModule
+    objects for the problem are updated, and `subtask_status_dict` is the initial status of
+    the subtask, as created by SubtaskStatus.to_dict().
+
+    `xmodule_instance_args` provides information needed by _get_module_instance_for_task()
+    to instantiate an xmodule instance.
+    """
+    update_fcn, filter_fcn = MODULE_STATE_UPDATES[task_name]
+    return perform_module_state_update_subtask(
+        partial(update_fcn, xmodule_instance_args), filter_fcn, entry_id, student_id_range, subtask_status_dict
+    )
 
 
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
@@ -144,6 +200,17 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def compute_offline_grades(entry_id, xmodule_instance_args):
+    """
+    Grade a course and store the results as offline computed grades.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    task_fn = partial(compute_offline_grades_for_course, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
@@ -166,3 +233,26 @@ def cohort_students(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('cohorted')
     task_fn = partial(cohort_students_and_upload, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask)  # pylint: disable=not-callable
+def update_enrollment(entry_id, xmodule_instance_args):
+    """
+    Enroll or unenroll students in bulk, and upload the results.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    # An example of such a message is: "Progress: {action} {succeeded} of {attempted} so far"
+    action_name = ugettext_noop('updated')
+    task_fn = partial(update_enrollment_and_upload, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask)  # pylint: disable=not-callable
+def generate_certificates(entry_id, xmodule_instance_args):
+    """
+    Grade the students of a course in batches and request their certificates.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('certified')
+    task_fn = partial(generate_certificates_for_students, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
@@ -12,7 +12,9 @@ from celery import Task, current_task
 from celery.utils.log import get_task_logger
 from celery.states import SUCCESS, FAILURE
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.files.storage import DefaultStorage
+from django.core.validators import validate_email
 from django.db import transaction, reset_queries
 import dogstats_wrapper as dog_stats_api
 from pytz import UTC
@@ -21,14 +23,25 @@ from track.views import task_track
 from util.file import course_filename_prefix_generator, UniversalNewlineIterator
 from xmodule.modulestore.django import modulestore
 
+from certificates.models import CertificateStatuses
+from certificates.queue import XQueueCertInterface
 from courseware.courses import get_course_by_id
 from courseware.grades import iterate_grades_for
 from courseware.models import StudentModule
 from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
+from instructor.enrollment import bulk_enroll_emails, bulk_unenroll_emails
+from instructor.offline_gradecalc import offline_grade_calculation
+from instructor.tasks import queue_enrollment_emails
 from instructor_analytics.basic import enrolled_students_features
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -47,6 +60,13 @@ UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
 
+# number of students whose enrollment is changed in one transaction
+ENROLLMENT_CHUNK_SIZE = 500
+
+# maximum number of StudentModule rows updated by one subtask of a task that updates
+# a problem for all students; tasks with fewer rows than this don't use subtasks
+MODULES_PER_SUBTASK = 1000
+
 
 class BaseInstructorTask(Task):
     """
@@ -260,7 +280,8 @@ def run_main_task(entry_id, task_fcn, action_name):
     return task_progress
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name,
+                                create_subtask_fcn=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -278,6 +299,12 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     the update is successful; False indicates the update on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If a `create_subtask_fcn` is not None and more than MODULES_PER_SUBTASK modules of all students
+    are to be updated, the update is split into subtasks by ranges of student ids instead, which
+    `create_subtask_fcn` constructs.  It takes two arguments: a [first, last] list of the student ids
+    of the subtask's modules, and a SubtaskStatus object reflecting its initial status.  The subtasks
+    then each call `perform_module_state_update_subtask`.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -302,7 +329,7 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     module_descriptor = modulestore().get_item(usage_key)
 
     # find the module in question
-    modules_to_update = StudentModule.objects.filter(course_id=course_id, module_state_key=usage_key)
+    modules_to_update = _get_modules_to_update(course_id, usage_key, filter_fcn)
 
     # give the option of updating an individual student. If not specified,
     # then updates all students who have responded to a problem so far
@@ -318,30 +345,127 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     if student is not None:
         modules_to_update = modules_to_update.filter(student_id=student.id)
 
+    total = modules_to_update.count()
+    if student is None and create_subtask_fcn is not None and total > MODULES_PER_SUBTASK:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            # The subtasks were already queued by an earlier run of this task,
+            # which happens when a task is requeued after losing its broker connection.
+            TASK_LOG.warning(u"Task %s has already queued its subtasks!  InstructorTask = %s", entry.task_id, entry)
+            return json.loads(entry.task_output)
+
+        def _create_subtask(modules, initial_subtask_status):
+            """Creates a subtask to update the modules of the range of student ids of `modules`."""
+            return create_subtask_fcn([modules[0]['student_id'], modules[-1]['student_id']], initial_subtask_status)
+
+        return queue_subtasks_for_query(
+            entry,
+            action_name,
+            _create_subtask,
+            modules_to_update.order_by('student_id'),
+            ['student_id'],
+            MODULES_PER_SUBTASK,
+        )
+
+    task_progress = TaskProgress(action_name, total, start_time)
+    task_progress.update_task_state()
+
+    for update_status in _update_modules(update_fcn, module_descriptor, modules_to_update, action_name):
+        task_progress.attempted += 1
+        if update_status == UPDATE_STATUS_SUCCEEDED:
+            task_progress.succeeded += 1
+        elif update_status == UPDATE_STATUS_FAILED:
+            task_progress.failed += 1
+        elif update_status == UPDATE_STATUS_SKIPPED:
+            task_progress.skipped += 1
+
+    return task_progress.update_task_state()
+
+
+def perform_module_state_update_subtask(update_fcn, filter_fcn, entry_id, student_id_range, subtask_status_dict):
+    """
+    Performs the part of the update of `perform_module_state_update` that covers the StudentModule
+    instances of the students whose ids are in the [first, last] list `student_id_range`.
+
+    The problem descriptor is fetched once for all of the subtask's modules.  The subtask's counts
+    are recorded in the InstructorTask entry `entry_id` through `update_subtask_status`, and the
+    subtask's final status is returned as a dict.  As with the main task, an exception raised by
+    `update_fcn` fails the subtask, after its status has been recorded.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(u"Preparing to update modules of students %s as subtask %s for instructor task %d",
+                  student_id_range, current_task_id, entry_id)
+
+    # Check that the requested subtask is actually known to the current InstructorTask entry,
+    # and that it isn't being or hasn't been run already.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    counts = {UPDATE_STATUS_SUCCEEDED: 0, UPDATE_STATUS_FAILED: 0, UPDATE_STATUS_SKIPPED: 0}
+
+    def _subtask_status(state):
+        """Returns the status of this subtask in the given state."""
+        return SubtaskStatus.create(
+            current_task_id,
+            attempted=sum(counts.values()),
+            succeeded=counts[UPDATE_STATUS_SUCCEEDED],
+            failed=counts[UPDATE_STATUS_FAILED],
+            skipped=counts[UPDATE_STATUS_SKIPPED],
+            state=state,
+        )
+
+    try:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        task_input = json.loads(entry.task_input)
+        usage_key = course_id.make_usage_key_from_deprecated_string(task_input.get('problem_url'))
+        module_descriptor = modulestore().get_item(usage_key)
+
+        first_student_id, last_student_id = student_id_range
+        modules_to_update = _get_modules_to_update(course_id, usage_key, filter_fcn).filter(
+            student_id__gte=first_student_id, student_id__lte=last_student_id
+        )
+        action_name = json.loads(entry.task_output).get('action_name')
+        for update_status in _update_modules(update_fcn, module_descriptor, modules_to_update, action_name):
+            counts[update_status] += 1
+    except Exception:
+        TASK_LOG.exception(u"Subtask %s of instructor task %d failed unexpectedly!", current_task_id, entry_id)
+        new_subtask_status = _subtask_status(FAILURE)
+        update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        raise
+
+    new_subtask_status = _subtask_status(SUCCESS)
+    update_subtask_status(entry_id, current_task_id, new_subtask_status)
+    return new_subtask_status.to_dict()
+
+
+def _get_modules_to_update(course_id, usage_key, filter_fcn):
+    """
+    Returns the StudentModule instances of the problem `usage_key`, filtered by `filter_fcn`
+    if it's not None, with their students fetched in the same query.
+    """
+    modules_to_update = StudentModule.objects.filter(
+        course_id=course_id, module_state_key=usage_key
+    ).select_related('student')
     if filter_fcn is not None:
         modules_to_update = filter_fcn(modules_to_update)
+    return modules_to_update
 
-    task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
-    task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
+def _update_modules(update_fcn, module_descriptor, modules_to_update, action_name):
+    """
+    Calls `update_fcn` on each of the StudentModule instances in `modules_to_update`, streaming
+    them from the database rather than caching the whole query, and yields the status of each update.
+    """
+    for module_to_update in modules_to_update.iterator():
         # There is no try here:  if there's an error, we let it throw, and the task will
         # be marked as FAILED, with a stack trace.
         with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
             update_status = update_fcn(module_descriptor, module_to_update)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
-
-    return task_progress.update_task_state()
+        # Logging of failures is left to the update_fcn itself.
+        if update_status not in (UPDATE_STATUS_SUCCEEDED, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED):
+            raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+        yield update_status
 
 
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
@@ -738,3 +862,154 @@ def cohort_students_and_upload(_xmodule_instance_args, _entry_id, course_id, tas
     upload_csv_to_report_store(output_rows, 'cohort_results', course_id, start_date)
 
     return task_progress.update_task_state(extra_meta=current_step)
+
+
+def generate_certificates_for_students(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
+    """
+    For a given `course_id`, request certificates for all enrolled students
+    whose current certificate status is in `task_input['statuses']` (by
+    default, students who have no certificate yet).
+
+    Students are graded and their requests are put on the xqueue in chunks
+    by `XQueueCertInterface.add_certs`, and task progress is updated after
+    each chunk.  Students whose status is not eligible are counted as
+    skipped; students whose request could not be queued are counted as failed.
+    """
+    start_time = time()
+    enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
+    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
+    current_step = {'step': 'Generating Certificates'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    statuses = task_input.get('statuses') or [CertificateStatuses.unavailable]
+    # prefetch all chapters/sequentials by saying depth=2
+    course = modulestore().get_course(course_id, depth=2)
+
+    def update_progress(results):
+        """Fold the results of one chunk of students into the task progress."""
+        for __, cert_status, attempted in results:
+            if not attempted:
+                task_progress.skipped += 1
+                continue
+            task_progress.attempted += 1
+            if cert_status == CertificateStatuses.error:
+                task_progress.failed += 1
+            else:
+                task_progress.succeeded += 1
+        task_progress.update_task_state(extra_meta=current_step)
+
+    XQueueCertInterface().add_certs(
+        enrolled_students.iterator(), course_id, course=course,
+        valid_statuses=statuses, progress_callback=update_progress
+    )
+
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def compute_offline_grades_for_course(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    """
+    For a given `course_id`, grade all enrolled students and store the results
+    as offline computed grades, which the instructor dashboard and gradebook
+    serve instead of grading students during the request.
+
+    Students are graded and their grades saved in chunks by
+    `offline_grade_calculation`, and task progress is updated after each chunk.
+    """
+    start_time = time()
+    task_progress = TaskProgress(action_name, 0, start_time)
+    current_step = {'step': 'Computing Grades'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    def update_progress(ngraded, nstudents):
+        """Record the number of students graded so far in the task progress."""
+        task_progress.total = nstudents
+        task_progress.attempted = task_progress.succeeded = ngraded
+        task_progress.update_task_state(extra_meta=current_step)
+
+    offline_grade_calculation(course_id, progress_callback=update_progress)
+
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def update_enrollment_and_upload(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
+    """
+    Within a given course, enroll or unenroll (`task_input['action']`) the
+    students listed in an uploaded CSV file in bulk, then upload the results
+    using a `ReportStore`.
+
+    Students are identified by the file's 'email' column, or by its 'username'
+    column for students who have registered.  Their enrollments are changed in
+    chunks of ENROLLMENT_CHUNK_SIZE, each in one transaction, and task progress
+    is updated after each chunk.  Notification emails are queued to be sent
+    by a separate task when `task_input['email_students']` is set.
+    """
+    start_time = time()
+    start_date = datetime.now(UTC)
+
+    with DefaultStorage().open(task_input['file_name']) as f:
+        identifiers = [
+            row.get('email') or row.get('username') or ''
+            for row in unicodecsv.DictReader(UniversalNewlineIterator(f), encoding='utf-8')
+        ]
+
+    task_progress = TaskProgress(action_name, len(identifiers), start_time)
+    current_step = {'step': 'Updating Enrollments'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    enrolling = task_input['action'] == 'enroll'
+    auto_enroll = task_input.get('auto_enroll', False)
+    result_names = {
+        'enrolled_enroll': 'enrolled',
+        'allowed_enroll': 'allowed to enroll',
+        'enrolled_unenroll': 'unenrolled',
+        'allowed_unenroll': 'no longer allowed to enroll',
+        None: 'already enrolled' if enrolling else 'not enrolled',
+    }
+
+    rows = [['identifier', 'email', 'result']]
+    for chunk_start in xrange(0, len(identifiers), ENROLLMENT_CHUNK_SIZE):
+        chunk = identifiers[chunk_start:chunk_start + ENROLLMENT_CHUNK_SIZE]
+        usernames = [identifier for identifier in chunk if '@' not in identifier]
+        emails_by_username = dict(User.objects.filter(username__in=usernames).values_list('username', 'email'))
+
+        emails = {}
+        for identifier in chunk:
+            email = emails_by_username.get(identifier, identifier)
+            try:
+                validate_email(email)
+            except ValidationError:
+                rows.append([identifier, '', 'invalid identifier'])
+                task_progress.failed += 1
+            else:
+                emails[identifier] = email
+        task_progress.attempted += len(chunk)
+
+        try:
+            if enrolling:
+                results = bulk_enroll_emails(course_id, emails.values(), auto_enroll)
+            else:
+                results = bulk_unenroll_emails(course_id, emails.values())
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(u"Unable to update the enrollment of %d students in %s", len(emails), course_id)
+            rows.extend([identifier, email, 'error'] for identifier, email in emails.iteritems())
+            task_progress.failed += len(emails)
+        else:
+            messages = {}
+            for email, message, __ in results:
+                messages.setdefault(email, message)
+            for identifier, email in emails.iteritems():
+                rows.append([identifier, email, result_names[messages[email]]])
+                if messages[email] is None:
+                    task_progress.skipped += 1
+                else:
+                    task_progress.succeeded += 1
+            if task_input.get('email_students'):
+                queue_enrollment_emails(course_id, results, auto_enroll, secure=task_input.get('secure', True))
+
+        task_progress.update_task_state(extra_meta=current_step)
+
+    current_step['step'] = 'Uploading CSV'
+    task_progress.update_task_state(extra_meta=current_step)
+    upload_csv_to_report_store(rows, 'enrollment_results', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta=current_step)
@@ -347,6 +347,27 @@ class TestResetAttemptsInstructorTask(TestInstructorTasks):
         # check that entries were reset
         self._assert_num_attempts(students, 0)
 
+    @patch('instructor_task.tasks_helper.MODULES_PER_SUBTASK', 3)
+    def test_reset_with_subtasks(self):
+        initial_attempts = 3
+        input_state = json.dumps({'attempts': initial_attempts})
+        num_students = 10
+        students = self._create_students_with_state(num_students, input_state)
+        task_entry = self._create_input_entry()
+        self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        # the subtasks have recorded their progress in the entry
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        self.assertEquals(entry.task_state, SUCCESS)
+        self.assertEquals(json.loads(entry.subtasks)['total'], 4)
+        self.assertEquals(json.loads(entry.subtasks)['succeeded'], 4)
+        output = json.loads(entry.task_output)
+        self.assertEquals(output.get('attempted'), num_students)
+        self.assertEquals(output.get('succeeded'), num_students)
+        self.assertEquals(output.get('total'), num_students)
+        self.assertEquals(output.get('action_name'), 'reset')
+        # check that entries were reset
+        self._assert_num_attempts(students, 0)
+
     def _test_reset_with_student(self, use_email):
         """Run a reset task for one student, with several StudentModules for the problem defined."""
         num_students = 10
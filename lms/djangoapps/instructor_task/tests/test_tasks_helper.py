@@ -18,7 +18,15 @@ from xmodule.partitions.partitions import Group, UserPartition
 
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
 from instructor_task.models import ReportStore
-from instructor_task.tasks_helper import cohort_students_and_upload, upload_grades_csv, upload_students_csv
+from certificates.models import CertificateStatuses, GeneratedCertificate
+from certificates.tests.factories import GeneratedCertificateFactory
+from instructor_task.tasks_helper import (
+    cohort_students_and_upload,
+    generate_certificates_for_students,
+    upload_grades_csv,
+    upload_students_csv,
+    update_enrollment_and_upload,
+)
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin
 
 
@@ -202,6 +210,45 @@ class TestStudentReport(TestReportMixin, InstructorTaskCourseTestCase):
         self.assertDictContainsSubset({'attempted': num_students, 'succeeded': num_students, 'failed': 0}, result)
 
 
+class TestGenerateCertificates(InstructorTaskCourseTestCase):
+    """
+    Tests that batched certificate generation reports its progress.
+    """
+    def setUp(self):
+        self.course = CourseFactory.create()
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_skips_students_with_certificates(self, _mock_current_task):
+        self.create_student('student', 'student@example.com')
+        certified = self.create_student('certified', 'certified@example.com')
+        GeneratedCertificateFactory.create(
+            user=certified,
+            course_id=self.course.id,
+            status=CertificateStatuses.downloadable,
+        )
+
+        result = generate_certificates_for_students(None, None, self.course.id, {}, 'certified')
+
+        self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'skipped': 1, 'failed': 0}, result)
+        # Nobody passes an empty course
+        cert = GeneratedCertificate.objects.get(user__username='student', course_id=self.course.id)
+        self.assertEqual(cert.status, CertificateStatuses.notpassing)
+
+    @patch('certificates.queue.XQueueCertInterface._send_to_xqueue')
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_queue_failure(self, _mock_current_task, mock_send_to_xqueue):
+        mock_send_to_xqueue.side_effect = Exception('Unable to send queue message')
+        student = self.create_student('student', 'student@example.com')
+
+        with patch('certificates.queue.grades.grade') as mock_grade:
+            mock_grade.return_value = {'grade': 'Pass', 'percent': 1.0}
+            result = generate_certificates_for_students(None, None, self.course.id, {}, 'certified')
+
+        self.assertDictContainsSubset({'attempted': 1, 'succeeded': 0, 'failed': 1}, result)
+        cert = GeneratedCertificate.objects.get(user=student, course_id=self.course.id)
+        self.assertEqual(cert.status, CertificateStatuses.error)
+
+
 class MockDefaultStorage(object):
     """Mock django's DefaultStorage"""
     def __init__(self):
@@ -434,3 +481,63 @@ class TestCohortStudents(TestReportMixin, InstructorTaskCourseTestCase):
             ],
             verify_order=False
         )
+
+
+@patch('instructor_task.tasks_helper.DefaultStorage', new=MockDefaultStorage)
+@patch('instructor_task.tasks_helper.queue_enrollment_emails')
+class TestUpdateEnrollment(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that bulk enrollment works.
+    """
+    def setUp(self):
+        self.course = CourseFactory.create()
+        self.student_1 = self.create_student(username='student_1', email='student_1@example.com')
+        self.student_2 = UserFactory.create(username='student_2', email='student_2@example.com')
+        self.csv_header_row = ['identifier', 'email', 'result']
+
+    def _update_enrollment_and_upload(self, csv_data, action='enroll', email_students=False):
+        """
+        Call `update_enrollment_and_upload` with a file generated from `csv_data`.
+        """
+        with tempfile.NamedTemporaryFile() as temp_file:
+            temp_file.write(csv_data.encode('utf-8'))
+            temp_file.flush()
+            task_input = {'file_name': temp_file.name, 'action': action, 'email_students': email_students}
+            with patch('instructor_task.tasks_helper._get_current_task'):
+                return update_enrollment_and_upload(None, None, self.course.id, task_input, 'updated')
+
+    def test_enroll(self, mock_queue_emails):
+        result = self._update_enrollment_and_upload(
+            u'username,email\n'
+            u'student_1,\n'
+            u',student_2@example.com\n'
+            u',new@example.com\n'
+            u'not an email,'
+        )
+        self.assertDictContainsSubset(
+            {'total': 4, 'attempted': 4, 'succeeded': 2, 'skipped': 1, 'failed': 1}, result
+        )
+        self.assertTrue(CourseEnrollment.is_enrolled(self.student_2, self.course.id))
+        self.verify_rows_in_csv(
+            [
+                dict(zip(self.csv_header_row, ['student_1', 'student_1@example.com', 'already enrolled'])),
+                dict(zip(self.csv_header_row, ['student_2@example.com', 'student_2@example.com', 'enrolled'])),
+                dict(zip(self.csv_header_row, ['new@example.com', 'new@example.com', 'allowed to enroll'])),
+                dict(zip(self.csv_header_row, ['not an email', '', 'invalid identifier'])),
+            ],
+            verify_order=False
+        )
+        self.assertFalse(mock_queue_emails.called)
+
+    def test_unenroll_with_emails(self, mock_queue_emails):
+        result = self._update_enrollment_and_upload(
+            u'email\n'
+            u'student_1@example.com\n'
+            u'student_2@example.com',
+            action='unenroll',
+            email_students=True
+        )
+        self.assertDictContainsSubset({'total': 2, 'attempted': 2, 'succeeded': 1, 'skipped': 1}, result)
+        self.assertFalse(CourseEnrollment.is_enrolled(self.student_1, self.course.id))
+        results = mock_queue_emails.call_args[0][1]
+        self.assertIn(('student_1@example.com', 'enrolled_unenroll', self.student_1.profile.name), results)
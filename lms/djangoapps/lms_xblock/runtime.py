@@ -5,16 +5,26 @@ Module implementing `xblock.runtime.Runtime` functionality for the LMS
 import re
 import xblock.reference.plugins
 
+import dogstats_wrapper as dog_stats_api
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.utils.translation import get_language
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
 from openedx.core.djangoapps.user_api.api import course_tag as user_course_tag_api
-from xmodule.modulestore.django import modulestore
+from xblock.fragment import Fragment, FragmentResource
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore, get_course_publish_stamp
 from xmodule.library_tools import LibraryToolsService
 from xmodule.x_module import ModuleSystem
 from xmodule.partitions.partitions_service import PartitionService
 
 
+# How long the rendered fragment of a cacheable view is kept
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+FRAGMENT_CACHE_METRIC_NAME = 'xblock.fragment_cache'
+
+
 def _quote_slashes(match):
     """
     Helper function for `quote_slashes`
@@ -188,9 +198,42 @@ class UserTagsService(object):
         )
 
 
+def _fragment_to_cache(frag):
+    """
+    Return `frag` as a tuple of plain values that can be stored in the cache.
+    """
+    return (
+        frag.content,
+        [tuple(resource) for resource in frag.resources],
+        frag.js_init_fn,
+        frag.js_init_version,
+        getattr(frag, 'json_init_args', None),
+    )
+
+
+def _fragment_from_cache(cached):
+    """
+    Rebuild a :class:`Fragment` stored by `_fragment_to_cache`.
+    """
+    content, resources, js_init_fn, js_init_version, json_init_args = cached
+    frag = Fragment(content)
+    frag.resources = [FragmentResource(*resource) for resource in resources]
+    frag.js_init_fn = js_init_fn
+    frag.js_init_version = js_init_version
+    frag.json_init_args = json_init_args
+    return frag
+
+
 class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract-method
     """
     ModuleSystem specialized to the LMS
+
+    Wrappers passed as `shared_wrappers` must give the same output for every
+    user; they are applied to rendered fragments before `wrappers`. When
+    `fragment_cache` is set, the output of the views a block lists in its
+    `cacheable_views` is cached after the shared wrappers have been applied,
+    so that later renders of the same version of the block, in the same
+    language, only run `wrappers`.
     """
     def __init__(self, **kwargs):
         services = kwargs.setdefault('services', {})
@@ -203,8 +246,73 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
         services['library_tools'] = LibraryToolsService(modulestore())
         services['fs'] = xblock.reference.plugins.FSService()
         self.request_token = kwargs.pop('request_token', None)
+        self.shared_wrappers = kwargs.pop('shared_wrappers', None) or []
+        self.fragment_cache = kwargs.pop('fragment_cache', False)
         super(LmsModuleSystem, self).__init__(**kwargs)
 
+    def render(self, block, view_name, context=None):
+        """
+        Render a block, serving cacheable views from the fragment cache when possible.
+
+        See :meth:`xblock.runtime.Runtime.render`.
+        """
+        cache_key = self._fragment_cache_key(block, view_name)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            self._increment_fragment_cache_metric(block, view_name, cached is not None)
+            if cached is not None:
+                frag = super(LmsModuleSystem, self).wrap_xblock(
+                    block, view_name, _fragment_from_cache(cached), context
+                )
+                return self.render_asides(block, view_name, frag, context)
+
+        return super(LmsModuleSystem, self).render(block, view_name, context)
+
+    def wrap_xblock(self, block, view, frag, context):
+        """
+        Apply the shared wrappers, caching the result if the view is cacheable,
+        and then the remaining wrappers.
+
+        See :meth:`xblock.runtime.Runtime.wrap_xblock`.
+        """
+        for wrapper in self.shared_wrappers:
+            frag = wrapper(block, view, frag, context)
+
+        cache_key = self._fragment_cache_key(block, view)
+        if cache_key is not None:
+            self.cache.set(cache_key, _fragment_to_cache(frag), FRAGMENT_CACHE_TIMEOUT)
+
+        return super(LmsModuleSystem, self).wrap_xblock(block, view, frag, context)
+
+    def _fragment_cache_key(self, block, view_name):
+        """
+        Return the key the output of `view_name` on `block` is cached under,
+        or None if it should not be cached.
+
+        Fragments are cached for each version of the published course, so
+        nothing is cached while drafts are being previewed.
+        """
+        if not self.fragment_cache or view_name not in getattr(block, 'cacheable_views', ()):
+            return None
+        if modulestore().get_branch_setting() == ModuleStoreEnum.Branch.draft_preferred:
+            return None
+
+        usage_id = block.scope_ids.usage_id
+        return u'lms_xblock.fragment.{}.{}.{}.{}'.format(
+            usage_id, get_course_publish_stamp(usage_id.course_key), get_language(), view_name
+        )
+
+    def _increment_fragment_cache_metric(self, block, view_name, hit):
+        """
+        Count a lookup in the fragment cache.
+        """
+        dog_stats_api.increment(FRAGMENT_CACHE_METRIC_NAME, tags=[
+            u'view_name:{}'.format(view_name),
+            u'action:{}'.format('hit' if hit else 'miss'),
+            u'course_id:{}'.format(self.course_id),
+            u'block_type:{}'.format(block.scope_ids.block_type),
+        ])
+
     def wrap_aside(self, block, aside, view, frag, context):
         """
         Creates a div which identifies the aside, points to the original block,
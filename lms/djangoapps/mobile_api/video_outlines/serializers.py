@@ -1,18 +1,31 @@
 """
 Serializer for video outline
 """
+from functools import partial
+
+from django.core.cache import cache
+from opaque_keys.edx.keys import UsageKey
 from rest_framework.reverse import reverse
 
 from courseware.access import has_access
+from xmodule.modulestore.django import modulestore, get_course_publish_stamp
 
 from edxval.api import (
     get_video_info_for_course_and_profile, ValInternalError
 )
 
+# How long a cached video outline is used for.  The outline is recomputed
+# whenever the course is published, but the video URLs and sizes it holds come
+# from VAL, which can change without a publish.
+VIDEO_OUTLINE_CACHE_TIMEOUT = 60 * 60
+
 
 class BlockOutline(object):
     """
     Serializes course videos, pulling data from VAL and the video modules.
+
+    If `request` is None, the outline is serialized for no user in particular:
+    access to the blocks isn't checked and URLs are relative rather than absolute.
     """
     def __init__(self, course_id, start_block, categories_to_outliner, request):
         """Create a BlockOutline using `start_block` as a starting point."""
@@ -129,7 +142,7 @@ class BlockOutline(object):
                 )
                 return unit_url, section_url
 
-        user = self.request.user
+        user = self.request.user if self.request is not None else None
 
         while stack:
             curr_block = stack.pop()
@@ -144,7 +157,7 @@ class BlockOutline(object):
                 continue
 
             if curr_block.category in self.categories_to_outliner:
-                if not has_access(user, 'load', curr_block, course_key=self.course_id):
+                if user is not None and not has_access(user, 'load', curr_block, course_key=self.course_id):
                     continue
 
                 summary_fn = self.categories_to_outliner[curr_block.category]
@@ -210,3 +223,64 @@ def video_summary(course, course_id, video_descriptor, request, local_cache):
         "category": video_descriptor.category,
         "id": unicode(video_descriptor.scope_ids.usage_id),
     }
+
+
+def _video_outline_cache_key(course_id):
+    """
+    Returns the cache key for the video outline of the current published version of the course.
+    """
+    return u'mobile_api.video_outline.{}.{}'.format(course_id, get_course_publish_stamp(course_id))
+
+
+def get_video_outline(course_id):
+    """
+    Returns the user-independent video outline of the course.
+
+    The outline is a list of (block_id, entry) tuples, one for each video in the
+    course, where each entry is the dict that `BlockOutline` yields for the video
+    with URLs relative to the site root.  It is computed from the course tree once
+    per published version of the course and cached.
+    """
+    cache_key = _video_outline_cache_key(course_id)
+    outline = cache.get(cache_key)
+    if outline is None:
+        course = modulestore().get_course(course_id, depth=None)
+        outline = [
+            (UsageKey.from_string(entry['summary']['id']).block_id, entry)
+            for entry in BlockOutline(course_id, course, {"video": partial(video_summary, course)}, None)
+        ]
+        cache.set(cache_key, outline, VIDEO_OUTLINE_CACHE_TIMEOUT)
+    return outline
+
+
+def video_outline_for_user(course_id, outline, request):
+    """
+    Filters a video outline returned by `get_video_outline` down to the videos that
+    the request's user has access to, and makes its URLs absolute.
+
+    Only the course's video blocks are loaded to check access, rather than the
+    whole course tree.
+    """
+    video_blocks = {
+        block.location.block_id: block
+        for block in modulestore().get_items(course_id, qualifiers={'category': 'video'})
+    }
+
+    user_outline = []
+    for block_id, entry in outline:
+        block = video_blocks.get(block_id)
+        if block is None or not has_access(request.user, 'load', block, course_key=course_id):
+            continue
+
+        summary = dict(entry['summary'])
+        summary['transcripts'] = {
+            lang: request.build_absolute_uri(url) for lang, url in summary['transcripts'].iteritems()
+        }
+        user_entry = dict(entry)
+        user_entry.update({
+            'unit_url': request.build_absolute_uri(entry['unit_url']),
+            'section_url': request.build_absolute_uri(entry['section_url']),
+            'summary': summary,
+        })
+        user_outline.append(user_entry)
+    return user_outline
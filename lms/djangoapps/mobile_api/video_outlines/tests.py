@@ -4,6 +4,7 @@ Tests for video outline API
 # pylint: disable=no-member
 from uuid import uuid4
 from collections import namedtuple
+from mock import patch
 
 from edxval import api
 from xmodule.modulestore.tests.factories import ItemFactory
@@ -402,6 +403,30 @@ class TestVideoSummaryList(TestVideoAPITestCase, MobileAuthTestMixin, MobileEnro
         self.assertEqual(course_outline[2]['summary']['video_url'], self.html5_video_url)
         self.assertEqual(course_outline[2]['summary']['size'], 0)
 
+    def test_outline_is_cached_until_publish(self):
+        self.login_and_enroll()
+        ItemFactory.create(
+            parent_location=self.unit.location,
+            category="video",
+            edx_video_id=self.edx_video_id,
+            display_name=u"test video omega \u03a9",
+        )
+        self.assertEqual(len(self.api_response().data), 1)
+
+        with patch('mobile_api.video_outlines.serializers.BlockOutline') as mock_block_outline:
+            course_outline = self.api_response().data
+        self.assertFalse(mock_block_outline.called)
+        self.assertEqual(len(course_outline), 1)
+
+        # publishing another video gives the course a new outline
+        ItemFactory.create(
+            parent_location=self.other_unit.location,
+            category="video",
+            display_name=u"test video omega 2 \u03a9",
+            html5_sources=[self.html5_video_url]
+        )
+        self.assertEqual(len(self.api_response().data), 2)
+
     def test_with_nameless_unit(self):
         self.login_and_enroll()
         ItemFactory.create(
@@ -1,11 +1,17 @@
 """ Objects and functions related to generating CSV reports """
 
+from collections import defaultdict
+from datetime import datetime
 from decimal import Decimal
+from itertools import chain
+from StringIO import StringIO
 import unicodecsv
 
+from django.db.models import Count, Q, Sum
 from django.utils.translation import ugettext as _
+from opaque_keys.edx.keys import CourseKey
+from pytz import UTC
 
-from courseware.courses import get_course_by_id
 from course_modes.models import CourseMode
 from shoppingcart.models import CertificateItem, OrderItem
 from student.models import CourseEnrollment
@@ -54,6 +60,19 @@ class Report(object):
         for item in items:
             writer.writerow(item)
 
+    def iter_csv(self):
+        """
+        Generates the CSV report one encoded line at a time, so that it can be streamed
+        to the client as the rows are computed instead of being buffered in full.
+        """
+        buf = StringIO()
+        writer = unicodecsv.writer(buf, encoding="utf-8")
+        for item in chain([self.header()], self.rows()):
+            writer.writerow(item)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
 
 class RefundReport(Report):
     """
@@ -150,18 +169,31 @@ class CertificateStatusReport(Report):
     inclusive, (i.e., the letter range H-J includes both Ithaca College and Harvard University), we
     calculate the total enrollment, audit enrollment, honor enrollment, verified enrollment, total
     gross revenue, gross revenue over the minimum, and total dollars refunded.
+
+    The enrollment and certificate figures for all of the courses in the range are computed up front
+    with a handful of grouped queries, rather than a set of queries per course.
     """
     def rows(self):
-        for course_id in course_ids_between(self.start_word, self.end_word):
+        courses = courses_between(self.start_word, self.end_word)
+        course_ids = [course.id for course in courses]
+        enrollment_counts = enrollment_counts_by_course(course_ids)
+        certificate_totals = verified_certificate_totals_by_course(course_ids)
+        min_prices = min_verified_prices_by_course(course_ids, 'usd')
+        unit_cost_counts = verified_purchase_counts_by_unit_cost(course_ids)
+
+        for cur_course in courses:
             # If the first letter of the university is between start_word and end_word, then we include
             # it in the report.  These comparisons are unicode-safe.
-            cur_course = get_course_by_id(course_id)
+            course_id = cur_course.id
             university = cur_course.org
             course = cur_course.number + " " + cur_course.display_name_with_default  # TODO add term (i.e. Fall 2013)?
-            counts = CourseEnrollment.enrollment_counts(course_id)
+            counts = enrollment_counts[course_id]
             total_enrolled = counts['total']
             audit_enrolled = counts['audit']
             honor_enrolled = counts['honor']
+            purchased = certificate_totals[(course_id, 'purchased')]
+            refunded = certificate_totals[(course_id, 'refunded')]
+            min_price = min_prices.get(course_id, 0)
 
             if counts['verified'] == 0:
                 verified_enrolled = 0
@@ -169,17 +201,16 @@ class CertificateStatusReport(Report):
                 gross_rev_over_min = Decimal(0.00)
             else:
                 verified_enrolled = counts['verified']
-                gross_rev = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'unit_cost')
-                gross_rev_over_min = gross_rev - (CourseMode.min_course_price_for_verified_for_currency(course_id, 'usd') * verified_enrolled)
+                gross_rev = purchased['unit_cost']
+                gross_rev_over_min = gross_rev - (min_price * verified_enrolled)
 
-            num_verified_over_the_minimum = CertificateItem.verified_certificates_contributing_more_than_minimum(course_id)
+            num_verified_over_the_minimum = sum(
+                count for unit_cost, count in unit_cost_counts[course_id].iteritems() if unit_cost > min_price
+            )
 
             # should I be worried about is_active here?
-            number_of_refunds = CertificateItem.verified_certificates_count(course_id, 'refunded')
-            if number_of_refunds == 0:
-                dollars_refunded = Decimal(0.00)
-            else:
-                dollars_refunded = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'refunded', 'unit_cost')
+            number_of_refunds = refunded['count']
+            dollars_refunded = refunded['unit_cost']
 
             course_announce_date = ""
             course_reg_start_date = ""
@@ -234,15 +265,19 @@ class UniversityRevenueShareReport(Report):
     total payments collected, service fees, number of refunds, and total amount of refunds.
     """
     def rows(self):
-        for course_id in course_ids_between(self.start_word, self.end_word):
-            cur_course = get_course_by_id(course_id)
+        courses = courses_between(self.start_word, self.end_word)
+        certificate_totals = verified_certificate_totals_by_course([course.id for course in courses])
+
+        for cur_course in courses:
             university = cur_course.org
             course = cur_course.number + " " + cur_course.display_name_with_default
-            total_payments_collected = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'unit_cost')
-            service_fees = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'service_fee')
-            num_refunds = CertificateItem.verified_certificates_count(course_id, "refunded")
-            amount_refunds = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'refunded', 'unit_cost')
-            num_transactions = (num_refunds * 2) + CertificateItem.verified_certificates_count(course_id, "purchased")
+            purchased = certificate_totals[(cur_course.id, 'purchased')]
+            refunded = certificate_totals[(cur_course.id, 'refunded')]
+            total_payments_collected = purchased['unit_cost']
+            service_fees = purchased['service_fee']
+            num_refunds = refunded['count']
+            amount_refunds = refunded['unit_cost']
+            num_transactions = (num_refunds * 2) + purchased['count']
 
             yield [
                 university,
@@ -266,15 +301,103 @@ class UniversityRevenueShareReport(Report):
         ]
 
 
+def courses_between(start_word, end_word):
+    """
+    Returns a list of all courses whose course_id falls alphabetically between start_word and end_word.
+    These comparisons are unicode-safe.
+    """
+    return [
+        course for course in modulestore().get_courses()
+        if start_word.lower() <= course.id.to_deprecated_string().lower() <= end_word.lower()
+    ]
+
+
 def course_ids_between(start_word, end_word):
     """
     Returns a list of all valid course_ids that fall alphabetically between start_word and end_word.
     These comparisons are unicode-safe.
     """
+    return [course.id for course in courses_between(start_word, end_word)]
 
-    valid_courses = []
-    for course in modulestore().get_courses():
-        course_id = course.id.to_deprecated_string()
-        if start_word.lower() <= course_id.lower() <= end_word.lower():
-            valid_courses.append(course.id)
-    return valid_courses
+
+def enrollment_counts_by_course(course_ids):
+    """
+    Grouped version of `CourseEnrollment.enrollment_counts`.
+
+    Returns a dictionary mapping each course_id to a dictionary of its active enrollment count
+    for each mode, plus the total under 'total', using a single query for all of the courses.
+    """
+    counts = defaultdict(lambda: defaultdict(int))
+    query = use_read_replica_if_available(
+        CourseEnrollment.objects.filter(
+            course_id__in=course_ids, is_active=True
+        ).values('course_id', 'mode').order_by().annotate(Count('mode'))
+    )
+    for item in query:
+        course_counts = counts[CourseKey.from_string(item['course_id'])]
+        course_counts[item['mode']] = item['mode__count']
+        course_counts['total'] += item['mode__count']
+    return counts
+
+
+def verified_certificate_totals_by_course(course_ids):
+    """
+    Grouped version of the `CertificateItem.verified_certificates_*` counts and sums.
+
+    Returns a dictionary keyed by (course_id, status) whose values are dictionaries holding
+    the number of verified certificates with that status under 'count', and the sums of
+    their 'unit_cost' and 'service_fee', using a single query for all of the courses.
+    Missing keys map to zero counts and sums.
+    """
+    totals = defaultdict(lambda: {'count': 0, 'unit_cost': Decimal(0.00), 'service_fee': Decimal(0.00)})
+    query = use_read_replica_if_available(
+        CertificateItem.objects.filter(
+            course_id__in=course_ids, mode='verified'
+        ).values('course_id', 'status').order_by().annotate(
+            Count('id'), Sum('unit_cost'), Sum('service_fee')
+        )
+    )
+    for item in query:
+        totals[(CourseKey.from_string(item['course_id']), item['status'])] = {
+            'count': item['id__count'],
+            'unit_cost': item['unit_cost__sum'] or Decimal(0.00),
+            'service_fee': item['service_fee__sum'] or Decimal(0.00),
+        }
+    return totals
+
+
+def verified_purchase_counts_by_unit_cost(course_ids):
+    """
+    Returns a dictionary mapping each course_id to a dictionary of the number of purchased
+    verified certificates at each distinct unit cost, using a single query for all of the courses.
+    """
+    counts = defaultdict(dict)
+    query = use_read_replica_if_available(
+        CertificateItem.objects.filter(
+            course_id__in=course_ids, mode='verified', status='purchased'
+        ).values('course_id', 'unit_cost').order_by().annotate(Count('id'))
+    )
+    for item in query:
+        counts[CourseKey.from_string(item['course_id'])][item['unit_cost']] = item['id__count']
+    return counts
+
+
+def min_verified_prices_by_course(course_ids, currency):
+    """
+    Grouped version of `CourseMode.min_course_price_for_verified_for_currency`.
+
+    Returns a dictionary mapping each course_id that has a non-expired verified mode in the
+    given currency to that mode's minimum price.  Courses without one are left out, and
+    should be treated as having a minimum price of 0.
+    """
+    now = datetime.now(UTC)
+    modes = CourseMode.objects.filter(
+        Q(course_id__in=course_ids) &
+        Q(mode_slug='verified') &
+        Q(currency=currency) &
+        (Q(expiration_datetime__isnull=True) | Q(expiration_datetime__gte=now))
+    ).values_list('course_id', 'min_price')
+    prices = {}
+    for course_id, min_price in modes:
+        prices.setdefault(CourseKey.from_string(course_id), min_price)
+    return prices
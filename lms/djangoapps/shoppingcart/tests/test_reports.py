@@ -178,6 +178,24 @@ class ReportTypeTests(ModuleStoreTestCase):
         csv = csv_file.getvalue()
         self.assertEqual(csv.replace('\r\n', '\n').strip(), self.CORRECT_UNI_REVENUE_SHARE_CSV.strip())
 
+    def test_streamed_cert_status_csv(self):
+        report = initialize_report("certificate_status", self.now - self.FIVE_MINS, self.now + self.FIVE_MINS, 'A', 'Z')
+        lines = list(report.iter_csv())
+        # one line for the header, and one for the course
+        self.assertEqual(len(lines), 2)
+        csv = ''.join(lines)
+        self.assertEqual(csv.replace('\r\n', '\n').strip(), self.CORRECT_CERT_STATUS_CSV.strip())
+
+    def test_cert_status_queries_do_not_scale_with_courses(self):
+        for number in range(3):
+            CourseFactory.create(org='MITx', number='10{}'.format(number), display_name=u'Other Course')
+        report = initialize_report("certificate_status", self.now - self.FIVE_MINS, self.now + self.FIVE_MINS, 'A', 'Z')
+        # one grouped query each for enrollments, certificate totals,
+        # certificate unit costs and verified course modes
+        with self.assertNumQueries(4):
+            rows = list(report.rows())
+        self.assertEqual(len(rows), 4)
+
 
 @override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
 class ItemizedPurchaseReportTest(ModuleStoreTestCase):
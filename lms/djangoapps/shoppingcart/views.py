@@ -939,12 +939,11 @@ def csv_report(request):
             return _render_report_form(start_date, end_date, start_letter, end_letter, report_type, date_fmt_error=True)
 
         report = initialize_report(report_type, start_date, end_date, start_letter, end_letter)
-        items = report.rows()
 
-        response = HttpResponse(mimetype='text/csv')
+        # Stream the rows out as they are computed rather than building the whole report in memory
+        response = HttpResponse(report.iter_csv(), mimetype='text/csv')
         filename = "purchases_report_{}.csv".format(datetime.datetime.now(pytz.UTC).strftime("%Y-%m-%d-%H-%M-%S"))
         response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
-        report.write_csv(response)
         return response
 
     elif request.method == 'GET':
@@ -208,6 +208,9 @@ BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get('BULK_EMAIL_RETRY_DELAY_BE
 # routing key that points to it.  At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
 BULK_EMAIL_ROUTING_KEY = HIGH_PRIORITY_QUEUE
+XQUEUE_SUBMISSION_ROUTING_KEY = HIGH_PRIORITY_QUEUE
+XQUEUE_SUBMISSION_MAX_RETRIES = ENV_TOKENS.get('XQUEUE_SUBMISSION_MAX_RETRIES', XQUEUE_SUBMISSION_MAX_RETRIES)
+XQUEUE_SUBMISSION_RETRY_DELAY = ENV_TOKENS.get('XQUEUE_SUBMISSION_RETRY_DELAY', XQUEUE_SUBMISSION_RETRY_DELAY)
 
 # Theme overrides
 THEME_NAME = ENV_TOKENS.get('THEME_NAME', None)
@@ -198,6 +198,18 @@ FEATURES = {
     # Toggle to enable certificates of courses on dashboard
     'ENABLE_VERIFIED_CERTIFICATES': False,
 
+    # Deliver xqueue submissions and certificate requests from celery tasks
+    # rather than within the request or command that makes them
+    'ENABLE_XQUEUE_SUBMISSION_QUEUE': False,
+
+    # Cache the rendered output of the views that blocks declare cacheable,
+    # for each version of the published course
+    'ENABLE_XBLOCK_FRAGMENT_CACHE': False,
+
+    # Look up the store of every course when the process starts, rather than
+    # on the first request for each course
+    'WARM_MODULESTORE_MAPPINGS': False,
+
     # Allow use of the hint managment instructor view.
     'ENABLE_HINTER_INSTRUCTOR_VIEW': False,
 
@@ -349,6 +361,13 @@ GENERATE_PROFILE_SCORES = False
 # Used with XQueue
 XQUEUE_WAITTIME_BETWEEN_REQUESTS = 5  # seconds
 
+# Submissions to xqueue without files are delivered by a celery task when
+# FEATURES['ENABLE_XQUEUE_SUBMISSION_QUEUE'] is set. A failed delivery is
+# retried up to XQUEUE_SUBMISSION_MAX_RETRIES times, waiting
+# XQUEUE_SUBMISSION_RETRY_DELAY seconds and doubling the wait each time.
+XQUEUE_SUBMISSION_MAX_RETRIES = 5
+XQUEUE_SUBMISSION_RETRY_DELAY = 5  # seconds
+
 
 ############################# SET PATH INFORMATION #############################
 PROJECT_ROOT = path(__file__).abspath().dirname().dirname()  # /edx-platform/lms
@@ -1448,6 +1467,9 @@ BULK_EMAIL_INFINITE_RETRY_CAP = 1000
 # routing key that points to it.  At the moment, the name is the same.
 BULK_EMAIL_ROUTING_KEY = HIGH_PRIORITY_QUEUE
 
+# Queued xqueue submissions and certificate requests also run on the high-priority queue.
+XQUEUE_SUBMISSION_ROUTING_KEY = HIGH_PRIORITY_QUEUE
+
 # Flag to indicate if individual email addresses should be logged as they are sent
 # a bulk email message.
 BULK_EMAIL_LOG_SENT_EMAILS = False
@@ -33,6 +33,9 @@ def run():
     if settings.FEATURES.get('USE_CUSTOM_THEME', False):
         enable_theme()
 
+    if settings.FEATURES.get('WARM_MODULESTORE_MAPPINGS', False):
+        warm_modulestore_mappings()
+
     if settings.FEATURES.get('USE_MICROSITES', False):
         enable_microsites()
 
@@ -51,6 +54,18 @@ def run():
         keyword_substitution.add_keyword_function_map = lambda x: None
 
 
+def warm_modulestore_mappings():
+    """
+    Look up the store of every course up front, if the modulestore routes
+    courses between several stores.
+    """
+    from xmodule.modulestore.django import modulestore
+
+    store = modulestore()
+    if hasattr(store, 'warm_mappings'):
+        store.warm_mappings()
+
+
 def add_mimetypes():
     """
     Add extra mimetypes. Used in xblock_resource.
@@ -5,7 +5,15 @@ just in-process.  Exposes global and per-course key-value pairs for users.
 Implementation note:
 Stores global metadata using the UserPreference model, and per-course metadata using the
 UserCourseTag model.
+
+Within a request, all of a user's tags for a course are read with a single query the first
+time one of them is needed, and kept in the request cache.  Tags that are set are written
+through to that cache, so partition schemes, the partition service and split tests can all
+look up group assignments without querying for each block.
 """
+from crum import get_current_request
+
+from request_cache.middleware import RequestCache
 
 from ..models import UserCourseTag
 
@@ -14,6 +22,44 @@ from ..models import UserCourseTag
 # global tags (e.g. using the existing UserPreferences table))
 COURSE_SCOPE = 'course'
 
+# Key of the course tags loaded during a request in the request cache
+REQUEST_CACHE_KEY = 'user_api.course_tags'
+
+
+def _request_course_tags():
+    """
+    Returns the dict of course tags loaded during the current request, keyed by
+    (user id, course id), or None outside of a request.
+    """
+    if get_current_request() is None:
+        return None
+    return RequestCache.get_request_cache().data.setdefault(REQUEST_CACHE_KEY, {})
+
+
+def get_course_tags(user, course_id):
+    """
+    Gets all of the user's course tags in the specified course_id.
+
+    Args:
+        user: the User object for the course tags
+        course_id: course identifier (string)
+
+    Returns:
+        dict mapping each key to its string value
+    """
+    request_tags = _request_course_tags()
+    if request_tags is not None:
+        tags = request_tags.get((user.id, unicode(course_id)))
+        if tags is not None:
+            return tags
+
+    tags = dict(
+        UserCourseTag.objects.filter(user=user, course_id=course_id).values_list('key', 'value')
+    )
+    if request_tags is not None:
+        request_tags[(user.id, unicode(course_id))] = tags
+    return tags
+
 
 def get_course_tag(user, course_id, key):
     """
@@ -28,15 +74,7 @@ def get_course_tag(user, course_id, key):
     Returns:
         string value, or None if there is no value saved
     """
-    try:
-        record = UserCourseTag.objects.get(
-            user=user,
-            course_id=course_id,
-            key=key)
-
-        return record.value
-    except UserCourseTag.DoesNotExist:
-        return None
+    return get_course_tags(user, course_id).get(key)
 
 
 def set_course_tag(user, course_id, key, value):
@@ -65,3 +103,7 @@ def set_course_tag(user, course_id, key, value):
 
     record.value = value
     record.save()
+
+    request_tags = _request_course_tags()
+    if request_tags is not None and (user.id, unicode(course_id)) in request_tags:
+        request_tags[(user.id, unicode(course_id))][key] = value
@@ -2,7 +2,9 @@
 Test the user course tag API.
 """
 from django.test import TestCase
+from mock import patch, sentinel
 
+from request_cache.middleware import RequestCache
 from student.tests.factories import UserFactory
 from openedx.core.djangoapps.user_api.api import course_tag as course_tag_api
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -33,3 +35,20 @@ class TestCourseTagAPI(TestCase):
         course_tag_api.set_course_tag(self.user, self.course_id, self.test_key, test_value)
         tag = course_tag_api.get_course_tag(self.user, self.course_id, self.test_key)
         self.assertEqual(tag, test_value)
+
+    @patch('openedx.core.djangoapps.user_api.api.course_tag.get_current_request', return_value=sentinel.request)
+    def test_course_tags_cached_in_request(self, _mock_request):
+        RequestCache().clear_request_cache()
+        self.addCleanup(RequestCache().clear_request_cache)
+        course_tag_api.set_course_tag(self.user, self.course_id, self.test_key, 'value')
+        course_tag_api.set_course_tag(self.user, self.course_id, 'other_key', 'other_value')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(course_tag_api.get_course_tag(self.user, self.course_id, self.test_key), 'value')
+            self.assertEqual(course_tag_api.get_course_tag(self.user, self.course_id, 'other_key'), 'other_value')
+            self.assertIsNone(course_tag_api.get_course_tag(self.user, self.course_id, 'missing_key'))
+
+        # set tags are written through to the request cache
+        course_tag_api.set_course_tag(self.user, self.course_id, self.test_key, 'value2')
+        with self.assertNumQueries(0):
+            self.assertEqual(course_tag_api.get_course_tag(self.user, self.course_id, self.test_key), 'value2')